@@ -3,6 +3,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import Optional
+import re
 import uvicorn
 from person import guesser
 from city import city_guesser
@@ -13,9 +14,30 @@ from invention import invention_guesser
 from movie import movie_guesser
 from tvshow import tvshow_guesser
 from settings import settings_manager
+from concurrency import run_blocking
+from geocoding import geocoder
+from gazetteer import gazetteer
+from tts_cache import audio_cache
+from media_store import media_store, parse_range
+from prefetch import guess_prefetcher
+from streaming import stream_guess
+from http_client import http_client
+from image_extractor import image_extractor
+from financial_cache import financial_cache
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from odd_pool import odd_situation_pool
+from image_jobs import image_jobs
 
 app = FastAPI(title="Multi-Game App", version="1.0.0")
 
+@app.on_event("startup")
+async def start_odd_situation_pool():
+    """Keep a few Odd Situations illustrated ahead of time once the server is up (importing the app starts nothing)."""
+    odd_situation_pool.start(odd_game._produce_situation)
+
 # TTS Helper Functions
 async def generate_tts_audio(text: str, voice: str, prompt: str = "Say the following in a natural way") -> bytes:
     """
@@ -44,6 +66,12 @@ async def generate_tts_audio(text: str, voice: str, prompt: str = "Say the follo
     if not settings_manager.is_valid_voice(voice):
         raise HTTPException(status_code=400, detail=f"Invalid voice: {voice}")
     
+    # Identical (voice, prompt, text) requests reuse previously synthesized audio
+    audio_key = audio_cache.key_for(voice, prompt, text)
+    cached_audio = await run_blocking(audio_cache.get, audio_key)
+    if cached_audio is not None:
+        return cached_audio
+    
     # Initialize client
     try:
         client = texttospeech.TextToSpeechClient()
@@ -73,11 +101,13 @@ async def generate_tts_audio(text: str, voice: str, prompt: str = "Say the follo
     
     # Perform synthesis
     try:
-        response = client.synthesize_speech(
+        response = await run_blocking(
+            client.synthesize_speech,
             input=synthesis_input,
             voice=voice_params,
             audio_config=audio_config
         )
+        await run_blocking(audio_cache.put, audio_key, response.audio_content)
         return response.audio_content
     except Exception as e:
         error_message = str(e)
@@ -102,6 +132,34 @@ async def generate_tts_audio(text: str, voice: str, prompt: str = "Say the follo
                 detail=f"Text-to-Speech synthesis failed: {error_message}"
             )
 
+def tts_audio_response(audio_content: bytes, audio_key: str, filename: str) -> Response:
+    """
+    Build an MP3 response that browsers and proxies may cache indefinitely.
+    
+    Args:
+        audio_content: MP3 bytes
+        audio_key: Content address of the audio, used as a strong ETag
+        filename: Suggested filename for the Content-Disposition header
+        
+    Returns:
+        FastAPI Response with ETag and immutable cache headers
+    """
+    return Response(
+        content=audio_content,
+        media_type="audio/mpeg",
+        headers={
+            "Content-Disposition": f"inline; filename={filename}",
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{audio_key}"',
+            "Content-Location": f"/api/tts/{audio_key}"
+        }
+    )
+
+def etag_matches(request: Request, content_key: str) -> bool:
+    """Check whether the client already holds this content (If-None-Match)."""
+    if_none_match = request.headers.get("if-none-match", "")
+    return f'"{content_key}"' in if_none_match or if_none_match.strip() == "*"
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -174,6 +232,10 @@ class TVShowFeedback(BaseModel):
     session_id: int
     is_correct: bool
 
+class LeaveSession(BaseModel):
+    game: str
+    session_id: int
+
 class VoiceSettings(BaseModel):
     voice: str
 
@@ -243,7 +305,7 @@ async def start_guess(user_input: UserInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting guess: {str(e)}")
@@ -252,13 +314,25 @@ async def start_guess(user_input: UserInput):
 async def submit_feedback(feedback: Feedback):
     """Submit feedback for the current guess."""
     try:
-        result = guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting feedback: {str(e)}")
 
+@app.post("/api/start-guess/stream")
+async def start_guess_stream(user_input: UserInput):
+    """Start a new guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-feedback/stream")
+async def submit_feedback_stream(feedback: Feedback):
+    """Submit feedback for the current guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/session/{session_id}")
 async def get_session_status(session_id: int):
     """Get the current status of a session."""
@@ -278,7 +352,7 @@ async def start_city_guess(user_input: CityInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = city_guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(city_guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting city guess: {str(e)}")
@@ -287,13 +361,25 @@ async def start_city_guess(user_input: CityInput):
 async def submit_city_feedback(feedback: CityFeedback):
     """Submit feedback for the current city guess."""
     try:
-        result = city_guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(city_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting city feedback: {str(e)}")
 
+@app.post("/api/start-city-guess/stream")
+async def start_city_guess_stream(user_input: CityInput):
+    """Start a new city guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(city_guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-city-feedback/stream")
+async def submit_city_feedback_stream(feedback: CityFeedback):
+    """Submit feedback for the current city guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(city_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/city-session/{session_id}")
 async def get_city_session(session_id: int):
     """Get city guessing session information."""
@@ -310,7 +396,7 @@ async def get_city_session(session_id: int):
 async def start_odd_game():
     """Start a new odd situation game."""
     try:
-        result = odd_game.start_new_game()
+        result = await run_blocking(odd_game.start_new_game)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting odd game: {str(e)}")
@@ -319,7 +405,7 @@ async def start_odd_game():
 async def submit_odd_guess(guess: OddGuess):
     """Submit a guess for the odd situation game."""
     try:
-        result = odd_game.submit_guess(guess.session_id, guess.guess)
+        result = await run_blocking(odd_game.submit_guess, guess.session_id, guess.guess)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
@@ -356,7 +442,7 @@ async def start_event_guess(user_input: EventInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = event_guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(event_guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting event guess: {str(e)}")
@@ -365,13 +451,25 @@ async def start_event_guess(user_input: EventInput):
 async def submit_event_feedback(feedback: EventFeedback):
     """Submit feedback for the current event guess."""
     try:
-        result = event_guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(event_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting event feedback: {str(e)}")
 
+@app.post("/api/start-event-guess/stream")
+async def start_event_guess_stream(user_input: EventInput):
+    """Start a new event guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(event_guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-event-feedback/stream")
+async def submit_event_feedback_stream(feedback: EventFeedback):
+    """Submit feedback for the current event guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(event_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/event-session/{session_id}")
 async def get_event_session(session_id: int):
     """Get event guessing session information."""
@@ -391,7 +489,7 @@ async def start_business_guess(user_input: BusinessInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = business_guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(business_guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting business guess: {str(e)}")
@@ -400,13 +498,25 @@ async def start_business_guess(user_input: BusinessInput):
 async def submit_business_feedback(feedback: BusinessFeedback):
     """Submit feedback for the current business guess."""
     try:
-        result = business_guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(business_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting business feedback: {str(e)}")
 
+@app.post("/api/start-business-guess/stream")
+async def start_business_guess_stream(user_input: BusinessInput):
+    """Start a new business guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(business_guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-business-feedback/stream")
+async def submit_business_feedback_stream(feedback: BusinessFeedback):
+    """Submit feedback for the current business guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(business_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/business-session/{session_id}")
 async def get_business_session(session_id: int):
     """Get business guessing session information."""
@@ -426,7 +536,7 @@ async def start_invention_guess(user_input: InventionInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = invention_guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(invention_guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting invention guess: {str(e)}")
@@ -435,13 +545,25 @@ async def start_invention_guess(user_input: InventionInput):
 async def submit_invention_feedback(feedback: InventionFeedback):
     """Submit feedback for the current invention guess."""
     try:
-        result = invention_guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(invention_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting invention feedback: {str(e)}")
 
+@app.post("/api/start-invention-guess/stream")
+async def start_invention_guess_stream(user_input: InventionInput):
+    """Start a new invention guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(invention_guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-invention-feedback/stream")
+async def submit_invention_feedback_stream(feedback: InventionFeedback):
+    """Submit feedback for the current invention guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(invention_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/invention-session/{session_id}")
 async def get_invention_session(session_id: int):
     """Get invention guessing session information."""
@@ -461,7 +583,7 @@ async def start_movie_guess(user_input: MovieInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = movie_guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(movie_guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting movie guess: {str(e)}")
@@ -470,13 +592,25 @@ async def start_movie_guess(user_input: MovieInput):
 async def submit_movie_feedback(feedback: MovieFeedback):
     """Submit feedback for the current movie guess."""
     try:
-        result = movie_guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(movie_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting movie feedback: {str(e)}")
 
+@app.post("/api/start-movie-guess/stream")
+async def start_movie_guess_stream(user_input: MovieInput):
+    """Start a new movie guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(movie_guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-movie-feedback/stream")
+async def submit_movie_feedback_stream(feedback: MovieFeedback):
+    """Submit feedback for the current movie guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(movie_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/movie-session/{session_id}")
 async def get_movie_session(session_id: int):
     """Get movie guessing session information."""
@@ -496,7 +630,7 @@ async def start_tvshow_guess(user_input: TVShowInput):
         if not user_input.text.strip():
             raise HTTPException(status_code=400, detail="Input text cannot be empty")
         
-        result = tvshow_guesser.start_new_session(user_input.text.strip())
+        result = await run_blocking(tvshow_guesser.start_new_session, user_input.text.strip())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error starting TV show guess: {str(e)}")
@@ -505,13 +639,25 @@ async def start_tvshow_guess(user_input: TVShowInput):
 async def submit_tvshow_feedback(feedback: TVShowFeedback):
     """Submit feedback for the current TV show guess."""
     try:
-        result = tvshow_guesser.submit_feedback(feedback.session_id, feedback.is_correct)
+        result = await run_blocking(tvshow_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
         if 'error' in result:
             raise HTTPException(status_code=400, detail=result['error'])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error submitting TV show feedback: {str(e)}")
 
+@app.post("/api/start-tvshow-guess/stream")
+async def start_tvshow_guess_stream(user_input: TVShowInput):
+    """Start a new TV show guessing session, streaming the guess and each enrichment as Server-Sent Events."""
+    if not user_input.text.strip():
+        raise HTTPException(status_code=400, detail="Input text cannot be empty")
+    return stream_guess(tvshow_guesser.start_new_session, user_input.text.strip())
+
+@app.post("/api/submit-tvshow-feedback/stream")
+async def submit_tvshow_feedback_stream(feedback: TVShowFeedback):
+    """Submit feedback for the current TV show guess, streaming the next guess as Server-Sent Events."""
+    return stream_guess(tvshow_guesser.submit_feedback, feedback.session_id, feedback.is_correct)
+
 @app.get("/api/tvshow-session/{session_id}")
 async def get_tvshow_session(session_id: int):
     """Get TV show guessing session information."""
@@ -523,6 +669,59 @@ async def get_tvshow_session(session_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting TV show session: {str(e)}")
 
+# Each guessing game's guesser, by the slug used in its page URL
+GAME_GUESSERS = {
+    "person": guesser,
+    "city": city_guesser,
+    "event": event_guesser,
+    "business": business_guesser,
+    "invention": invention_guesser,
+    "movie": movie_guesser,
+    "tvshow": tvshow_guesser
+}
+
+@app.get("/api/{game}/entity/{name:path}")
+async def lookup_entity(game: str, name: str, response: Response):
+    """Start a session whose first guess is a named entity followed from another game's link."""
+    entity_guesser = GAME_GUESSERS.get(game)
+    if entity_guesser is None:
+        raise HTTPException(status_code=404, detail=f"Unknown game: {game}")
+    if not name.strip():
+        raise HTTPException(status_code=400, detail="Entity name cannot be empty")
+    # The entity is cached server-side; each response carries a new session ID
+    response.headers["Cache-Control"] = "no-store"
+    try:
+        return await run_blocking(entity_guesser.start_new_session, name.strip(), known_entity=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error looking up {game} entity: {str(e)}")
+
+@app.post("/api/leave-session")
+async def leave_session(leave: LeaveSession):
+    """Cancel background work (linked-entity warming, speculative next guess, waiting image jobs) for a page the player left."""
+    game_guesser = GAME_GUESSERS.get(leave.game)
+    if game_guesser is None:
+        raise HTTPException(status_code=404, detail=f"Unknown game: {leave.game}")
+
+    def cancel_background_work() -> None:
+        with game_guesser.sessions.locked(leave.session_id) as session:
+            if session:
+                entity_warmer.cancel(session)
+                guess_prefetcher.discard(session)
+        image_jobs.cancel((leave.game, leave.session_id))
+
+    await run_blocking(cancel_background_work)
+    return {"status": "ok"}
+
+@app.get("/api/image-jobs/{job_id}")
+async def get_image_job(job_id: str, response: Response):
+    """Report a deferred image job; image_url is set once its status is "done" (or "failed", as a placeholder)."""
+    job = await run_blocking(image_jobs.status, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    # Polled until the image is ready, so never served from a cache
+    response.headers["Cache-Control"] = "no-store"
+    return job
+
 # Settings API Routes
 @app.get("/api/get-settings")
 async def get_user_settings(request: Request, response: Response):
@@ -581,6 +780,11 @@ async def test_voice(voice_test: VoiceTestRequest, request: Request):
         # Create a friendly prompt for testing
         prompt = "Say the following in a friendly and natural way"
         
+        # Skip synthesis entirely if the client already has this exact audio
+        audio_key = audio_cache.key_for(voice_test.voice, prompt, voice_test.text)
+        if etag_matches(request, audio_key) and audio_cache.contains(audio_key):
+            return Response(status_code=304, headers={"ETag": f'"{audio_key}"'})
+        
         # Generate audio using the helper function
         audio_content = await generate_tts_audio(
             text=voice_test.text,
@@ -589,14 +793,7 @@ async def test_voice(voice_test: VoiceTestRequest, request: Request):
         )
         
         # Return the audio content
-        return Response(
-            content=audio_content,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f"inline; filename={voice_test.voice}_test.mp3",
-                "Cache-Control": "no-cache"
-            }
-        )
+        return tts_audio_response(audio_content, audio_key, f"{voice_test.voice}_test.mp3")
         
     except HTTPException:
         raise
@@ -621,22 +818,23 @@ async def generate_tts(tts_request: TTSRequest, request: Request):
         
         print(f"TTS Request: voice={voice}, text_length={len(tts_request.text)}, prompt={tts_request.prompt}")
         
+        text = tts_request.text.strip()
+        prompt = tts_request.prompt or "Say the following in a natural way"
+        
+        # Skip synthesis entirely if the client already has this exact audio
+        audio_key = audio_cache.key_for(voice, prompt, text)
+        if etag_matches(request, audio_key) and audio_cache.contains(audio_key):
+            return Response(status_code=304, headers={"ETag": f'"{audio_key}"'})
+        
         # Generate audio using the helper function
         audio_content = await generate_tts_audio(
-            text=tts_request.text.strip(),
+            text=text,
             voice=voice,
-            prompt=tts_request.prompt or "Say the following in a natural way"
+            prompt=prompt
         )
         
         # Return the audio content
-        return Response(
-            content=audio_content,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f"inline; filename=tts_output.mp3",
-                "Cache-Control": "no-cache"
-            }
-        )
+        return tts_audio_response(audio_content, audio_key, "tts_output.mp3")
         
     except HTTPException:
         raise
@@ -644,11 +842,97 @@ async def generate_tts(tts_request: TTSRequest, request: Request):
         print(f"TTS Generation Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Unexpected error during TTS generation: {str(e)}")
 
+@app.get("/media/{media_key}")
+async def get_media(media_key: str, request: Request):
+    """Serve stored media by content hash with ETag validation and byte-range support."""
+    media = media_store.lookup(media_key)
+    if media is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    path, media_type, size = media
+    
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{media_key}"',
+        "Accept-Ranges": "bytes"
+    }
+    if etag_matches(request, media_key):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        # No Range header, or one that is not a single byte range: serve the whole file
+        return FileResponse(path, media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    def read_range() -> bytes:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+    
+    try:
+        content = await run_blocking(read_range)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return Response(
+        content=content,
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+    )
+
+@app.get("/api/tts/{audio_key}")
+async def get_cached_tts(audio_key: str, request: Request):
+    """Serve previously synthesized audio by its content address."""
+    if not re.fullmatch(r"[0-9a-f]{64}", audio_key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    if etag_matches(request, audio_key) and audio_cache.contains(audio_key):
+        return Response(status_code=304, headers={"ETag": f'"{audio_key}"'})
+    
+    audio_content = await run_blocking(audio_cache.get, audio_key)
+    if audio_content is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    return tts_audio_response(audio_content, audio_key, f"{audio_key}.mp3")
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "message": "Guess the Famous Person API is running"}
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Report session, cache and upstream counters for monitoring."""
+    return {
+        "sessions": {
+            "person": guesser.sessions.stats(),
+            "city": city_guesser.sessions.stats(),
+            "odd": odd_game.sessions.stats(),
+            "event": event_guesser.sessions.stats(),
+            "business": business_guesser.sessions.stats(),
+            "invention": invention_guesser.sessions.stats(),
+            "movie": movie_guesser.sessions.stats(),
+            "tvshow": tvshow_guesser.sessions.stats()
+        },
+        "geocode": geocoder.stats(),
+        "gazetteer": gazetteer.stats(),
+        "tts_cache": audio_cache.stats(),
+        "media": media_store.stats(),
+        "prefetch": guess_prefetcher.stats(),
+        "http": http_client.stats(),
+        "image_extractor": image_extractor.stats(),
+        "financial": financial_cache.stats(),
+        "guess_cache": guess_cache.stats(),
+        "solved_index": solved_index.stats(),
+        "entities": entity_describer.stats(),
+        "entity_warmer": entity_warmer.stats(),
+        "odd_pool": odd_situation_pool.stats(),
+        "image_jobs": image_jobs.stats()
+    }
+
 @app.get("/api/maps-key")
 async def get_maps_key():
     """Get Google Maps API key for frontend use."""
@@ -0,0 +1,60 @@
+"""
+Concurrent start-guess throughput benchmark.
+
+Replaces the person guesser's start_new_session with a stub that sleeps for a fixed
+"Gemini" latency, then fires N concurrent /api/start-guess handler calls and reports
+throughput. The old inline call is measured alongside for comparison: it stays flat at
+one request per latency period, while the executor path scales with in-flight requests.
+
+Run from the repository root (config.py must be importable, no upstream calls are made):
+    python benchmarks/bench_concurrent_guesses.py --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from person import guesser
+
+
+def fake_start_new_session(user_input: str):
+    """Stand-in for a guess that spends its time waiting on Gemini."""
+    time.sleep(LATENCY)
+    return {'session_id': 1, 'guess': {'name': user_input}, 'is_correct': None, 'game_over': False}
+
+
+async def inline_start_guess(user_input: app_module.UserInput):
+    """The pre-executor handler: calls the guesser directly on the event loop."""
+    return guesser.start_new_session(user_input.text.strip())
+
+
+async def measure(handler, concurrency: int) -> float:
+    """Return requests per second for one burst of concurrent calls."""
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(app_module.UserInput(text=f"clue {i}")) for i in range(concurrency)))
+    return concurrency / (time.perf_counter() - start)
+
+
+async def main(levels):
+    print(f"Simulated Gemini latency: {LATENCY * 1000:.0f} ms")
+    print(f"{'in-flight':>10} {'inline req/s':>14} {'executor req/s':>16}")
+    for concurrency in levels:
+        inline = await measure(inline_start_guess, concurrency)
+        pooled = await measure(app_module.start_guess, concurrency)
+        print(f"{concurrency:>10} {inline:>14.1f} {pooled:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated Gemini latency in seconds')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    LATENCY = args.latency
+    guesser.start_new_session = fake_start_new_session
+    asyncio.run(main(args.levels))
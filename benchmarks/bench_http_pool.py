@@ -0,0 +1,86 @@
+"""
+Repeat-host fetch latency benchmark.
+
+Serves a Wikipedia-sized page from a local keep-alive HTTP server and fetches it repeatedly,
+once with a fresh connection per call (the old module-level requests.get) and once through
+the shared pooled client. Every new connection is delayed by --handshake seconds on the server
+to stand in for the TCP and TLS round trips a real remote host costs.
+
+Run from the repository root (no upstream calls are made):
+    python benchmarks/bench_http_pool.py --handshake 0.05 --fetches 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import HTTPClient
+
+PAGE = b"<html><body><table class='infobox'><img src='//upload.wikimedia.org/x.jpg'></table>" + b"x" * 200_000 + b"</body></html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that charges a fixed delay once per connection."""
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        time.sleep(HANDSHAKE)
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(fetch, url: str, fetches: int):
+    """Return per-fetch latencies in milliseconds."""
+    latencies = []
+    for _ in range(fetches):
+        started = time.perf_counter()
+        fetch(url).raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main(fetches: int):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/wiki/Ada_Lovelace"
+
+    client = HTTPClient()
+    results = {
+        'requests.get': measure(lambda u: requests.get(u, timeout=10), url, fetches),
+        'pooled client': measure(client.get, url, fetches)
+    }
+    server.shutdown()
+
+    print(f"Simulated handshake: {HANDSHAKE * 1000:.0f} ms per new connection, {fetches} fetches")
+    print(f"{'client':>14} {'median ms':>10} {'p95 ms':>8} {'connections':>12}")
+    for name, latencies in results.items():
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        connections = client.stats()['connections_opened'] if name == 'pooled client' else fetches
+        print(f"{name:>14} {statistics.median(latencies):>10.1f} {p95:>8.1f} {connections:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--handshake', type=float, default=0.05, help='Simulated connection setup cost in seconds')
+    parser.add_argument('--fetches', type=int, default=50)
+    args = parser.parse_args()
+
+    HANDSHAKE = args.handshake
+    main(args.fetches)
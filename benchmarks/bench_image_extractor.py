@@ -0,0 +1,103 @@
+"""
+Page image extraction microbenchmark.
+
+Compares the old approach (whole page through BeautifulSoup, then infobox / find_all('img'))
+with the shared streaming extractor on recorded pages, reporting CPU time per page, how many
+bytes each needed, and whether both picked the same image.
+
+Record pages once, e.g.
+    curl -s https://en.wikipedia.org/wiki/Ada_Lovelace -o pages/Ada_Lovelace.html
+then run from the repository root (no upstream calls are made):
+    python benchmarks/bench_image_extractor.py pages/*.html --runs 20
+Without page arguments a synthetic Wikipedia-shaped article is used.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_extractor import DEFAULT_IMAGE_KEYWORDS, IMAGE_CHUNK_BYTES, absolute_image_url, scan_for_image
+
+
+def synthetic_page() -> bytes:
+    """An article with Wikipedia's layout: header logo, infobox near the top, long body."""
+    body = "".join(
+        f"<p>Paragraph {i} with <a href='/wiki/Link_{i}'>a link</a> and some prose. " * 4 + "</p>"
+        + (f"<figure><img src='//upload.wikimedia.org/thumb/{i}.jpg' width='220' height='160'></figure>" if i % 25 == 0 else "")
+        for i in range(1500)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Article</title></head><body>"
+        "<header><img class='mw-logo-icon' src='/static/images/icons/wikipedia.png' width='50' height='50'></header>"
+        "<main><table class='infobox vcard'><tr><td><span><img src='//upload.wikimedia.org/thumb/Portrait.jpg'"
+        " width='250' height='320'></span></td></tr><tr><th>Born</th><td>1815</td></tr></table>"
+        f"{body}</main></body></html>"
+    ).encode('utf-8')
+
+
+def legacy_extract(html: bytes, url: str, keywords, min_size: int):
+    """The pre-streaming extractor: parse everything, then search the tree."""
+    soup = BeautifulSoup(html, 'html.parser')
+    if 'wikipedia.org' in url:
+        infobox = soup.find('table', class_='infobox')
+        if infobox:
+            img = infobox.find('img')
+            if img and img.get('src'):
+                return absolute_image_url(img.get('src'), url)
+    for img in soup.find_all('img'):
+        src = img.get('src')
+        if src:
+            width, height = img.get('width'), img.get('height')
+            if width and height:
+                try:
+                    if int(width) >= min_size and int(height) >= min_size:
+                        return absolute_image_url(src, url)
+                except ValueError:
+                    continue
+            if any(keyword in src.lower() for keyword in keywords):
+                return absolute_image_url(src, url)
+    return "N/A"
+
+
+def streaming_extract(html: bytes, url: str, keywords, min_size: int):
+    """The shared extractor's parsing step, fed the page in network-sized chunks."""
+    chunks = (html[i:i + IMAGE_CHUNK_BYTES] for i in range(0, len(html), IMAGE_CHUNK_BYTES))
+    src, consumed = scan_for_image(chunks, url, 'utf-8', keywords, min_size)
+    return (absolute_image_url(src, url) if src else "N/A"), consumed
+
+
+def cpu_ms(func, runs: int) -> float:
+    """Average CPU milliseconds per call."""
+    started = time.process_time()
+    for _ in range(runs):
+        func()
+    return (time.process_time() - started) * 1000 / runs
+
+
+def main(paths, runs: int, min_size: int):
+    pages = [(os.path.basename(path), open(path, 'rb').read()) for path in paths] or [('synthetic', synthetic_page())]
+    url = 'https://en.wikipedia.org/wiki/Article'
+    keywords = DEFAULT_IMAGE_KEYWORDS
+
+    print(f"{'page':>24} {'KB':>7} {'legacy ms':>10} {'stream ms':>10} {'KB read':>8} {'same':>5}")
+    for name, html in pages:
+        legacy_image = legacy_extract(html, url, keywords, min_size)
+        stream_image, consumed = streaming_extract(html, url, keywords, min_size)
+        legacy_ms = cpu_ms(lambda: legacy_extract(html, url, keywords, min_size), runs)
+        stream_ms = cpu_ms(lambda: streaming_extract(html, url, keywords, min_size), runs)
+        print(f"{name[:24]:>24} {len(html) / 1024:>7.0f} {legacy_ms:>10.1f} {stream_ms:>10.1f} "
+              f"{consumed / 1024:>8.0f} {'yes' if legacy_image == stream_image else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='Recorded HTML pages')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--min-size', type=int, default=0, help='Minimum sized-image dimension (100 for events and inventions)')
+    args = parser.parse_args()
+    main(args.pages, args.runs, args.min_size)
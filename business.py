@@ -6,12 +6,88 @@ This game allows users to provide information about a business and the AI tries
 import google.generativeai as genai
 from typing import Optional, Dict, Any, List
 import json
-import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import googlemaps
+from urllib.parse import urlparse
 import re
-from config import GEMINI_API_KEY, GOOGLE_MAPS_API_KEY
+import os
+from functools import partial
+from config import GEMINI_API_KEY
+from geocoding import geocoder
+from http_client import http_client
+from image_extractor import image_extractor
+from sessions import SessionStore
+from candidates import candidates_instruction, next_candidate, parse_candidates, queue_candidates
+from prefetch import guess_prefetcher
+from streaming import emit
+from concurrency import EarlyTasks
+from json_stream import generate_json
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from financial_cache import financial_cache
+from enrichment import Enrich, EnrichmentGraph
+
+# Timeout, in seconds, for each individual financial source request
+FINANCIAL_SOURCE_TIMEOUT = float(os.getenv('FINANCIAL_SOURCE_TIMEOUT', '6'))
+
+# Overall budget, in seconds, for a public company's enrichment (all financial sources included)
+FINANCIAL_BUDGET = float(os.getenv('FINANCIAL_BUDGET', '8'))
+
+# Macrotrends chart slug for each financial metric
+MACROTRENDS_METRICS = {
+    'net_income': 'net-income',
+    'total_equity': 'total-share-holder-equity',
+    'revenue': 'revenue',
+    'total_assets': 'total-assets',
+    'operating_income': 'operating-income'
+}
+
+# Financial metrics fetched for a public company, each from its own source
+FINANCIAL_METRICS = ['stock_price', 'market_cap'] + list(MACROTRENDS_METRICS)
+
+# Fields returned for a business, shared by the guessing prompt and the known-entity lookup
+BUSINESS_FIELDS = """- name: The business name
+- type: The business type (public, private, subsidiary, etc.)
+- stock_exchange: The stock exchange where the company is listed (if public, otherwise "N/A")
+- ticker: An array of the company's stock ticker symbols (if public, otherwise empty array)
+- industry: An array of industries the business operates in
+- predecessors: An array of predecessor companies (if any, otherwise empty array)
+- previous_names: An array of previous company names (if any, otherwise empty array)
+- city_founded: The city where the company was founded, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States")
+- year_founded: The year the company was founded
+- founders: An array of founder names (if known, otherwise empty array)
+- current_headquarters: The current headquarters location, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States")
+- areas_served: An array of geographic areas where the company operates
+- number_of_locations: The number of locations the company has
+- current_status: Extant or Defunct (if known, otherwise null)
+- year_defunct: The year the company went out of business (if defunct and known, otherwise null)
+- fate: The fate of the company (if defunct and known, otherwise null)
+- successors: The successor companies (if defunct and known, otherwise null)
+- chairman: The current chairman (if known, otherwise null)
+- ceo: The current CEO (if known, otherwise null)
+- products: An array of main products (if any, otherwise empty array)
+- services: An array of main services (if any, otherwise empty array)
+- technologies: An array of main technologies (if any, otherwise empty array), specifically the type rather than brand name (e.g., smartphone, not iPhone)
+- subsidiaries: An array of subsidiary companies (if any, otherwise empty array)
+- owner: The owner of the company (if known, otherwise null)
+- owner_equity_percentage: The owner's equity percentage (if owner known, otherwise null)
+- number_of_employees: Number of employees (if known, otherwise null)
+- parent: The parent company (if any, otherwise null)
+- website: The company's website URL (if known, otherwise null)
+- business_insider_markets: markets.businessinsider.com URL for the business (if available, otherwise null) - used for stock price data
+- wikipedia_url: Wikipedia URL for the business (if available, otherwise null)
+- overview: A concise 50-75 word overview of the business's history, significance, and notable features"""
+
+# Enrichment of a business guess: which fields feed which enrichers
+BUSINESS_ENRICHMENT = [
+    Enrich('image_url', 'wikipedia_url', 'wiki_image'),
+    Enrich('founding', 'city_founded', 'geocode', group='coordinates'),
+    Enrich('headquarters', 'current_headquarters', 'geocode', group='coordinates')
+] + [
+    # Each financial source needs the ticker and the company name, and whatever arrives within the budget is kept
+    Enrich(metric, 'ticker', metric, also=('name',), timeout=FINANCIAL_BUDGET) for metric in FINANCIAL_METRICS
+]
 
 class BusinessGuesser:
     def __init__(self):
@@ -22,31 +98,45 @@ class BusinessGuesser:
         
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-        self.current_session = None
+        self.sessions = SessionStore()
+        self.enrichment = EnrichmentGraph(BUSINESS_ENRICHMENT, {
+            'wiki_image': self._extract_image_from_url,
+            'geocode': self._get_place_coordinates,
+            **{metric: partial(self._financial_metric, metric) for metric in FINANCIAL_METRICS}
+        }, batch={'geocode': geocoder.get_coordinates_batch})
     
-    def start_new_session(self, user_input: str) -> Dict[str, Any]:
+    def start_new_session(self, user_input: str, known_entity: bool = False) -> Dict[str, Any]:
         """Start a new business guessing session with user input."""
-        self.current_session = {
+        session = {
             'user_input': user_input,
             'guesses': [],
-            'incorrect_businesses': [],  # Track businesses that were marked as incorrect
-            'session_id': len(str(hash(user_input + str(len(user_input)))))
+            'incorrect_businesses': []  # Track businesses that were marked as incorrect
         }
+        self.sessions.create(session)
         
         # Make the first guess
-        first_guess = self._make_guess(user_input)
-        self.current_session['guesses'].append(first_guess)
+        if known_entity:
+            # A name followed from another game's link is described directly instead of guessed
+            first_guess = entity_describer.describe('business', user_input)
+        else:
+            # A paraphrase of a clue players already solved is answered with the confirmed entity
+            first_guess = solved_index.lookup('business', user_input, session)
+        if first_guess is None:
+            first_guess = self._make_guess(user_input, session=session)
+        session['guesses'].append(first_guess)
+        if not known_entity:
+            self._prefetch_next_guess(session)
+        entity_warmer.schedule('business', session, first_guess)
         
         return {
-            'session_id': self.current_session['session_id'],
+            'session_id': session['session_id'],
             'guess': first_guess,
             'is_correct': None,
             'game_over': False
         }
     
-    def _make_guess(self, context: str, incorrect_businesses: List[str] = None) -> Dict[str, Any]:
-        """Make a business guess using Gemini API."""
+    def _make_guess(self, context: str, incorrect_businesses: List[str] = None, session: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a business guess, using the next queued candidate before calling the Gemini API."""
         if incorrect_businesses is None:
             incorrect_businesses = []
         
@@ -60,211 +150,97 @@ class BusinessGuesser:
 {context}{exclusion_text}
 
 Please respond with a JSON object containing the following fields:
-- name: The business name
-- type: The business type (public, private, subsidiary, etc.)
-- stock_exchange: The stock exchange where the company is listed (if public, otherwise "N/A")
-- ticker: An array of the company's stock ticker symbols (if public, otherwise empty array)
-- industry: An array of industries the business operates in
-- predecessors: An array of predecessor companies (if any, otherwise empty array)
-- previous_names: An array of previous company names (if any, otherwise empty array)
-- city_founded: The city where the company was founded, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States")
-- year_founded: The year the company was founded
-- founders: An array of founder names (if known, otherwise empty array)
-- current_headquarters: The current headquarters location, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States")
-- areas_served: An array of geographic areas where the company operates
-- number_of_locations: The number of locations the company has
-- current_status: Extant or Defunct (if known, otherwise null)
-- year_defunct: The year the company went out of business (if defunct and known, otherwise null)
-- fate: The fate of the company (if defunct and known, otherwise null)
-- successors: The successor companies (if defunct and known, otherwise null)
-- chairman: The current chairman (if known, otherwise null)
-- ceo: The current CEO (if known, otherwise null)
-- products: An array of main products (if any, otherwise empty array)
-- services: An array of main services (if any, otherwise empty array)
-- technologies: An array of main technologies (if any, otherwise empty array), specifically the type rather than brand name (e.g., smartphone, not iPhone)
-- subsidiaries: An array of subsidiary companies (if any, otherwise empty array)
-- owner: The owner of the company (if known, otherwise null)
-- owner_equity_percentage: The owner's equity percentage (if owner known, otherwise null)
-- number_of_employees: Number of employees (if known, otherwise null)
-- parent: The parent company (if any, otherwise null)
-- website: The company's website URL (if known, otherwise null)
-- business_insider_markets: markets.businessinsider.com URL for the business (if available, otherwise null) - used for stock price data
-- wikipedia_url: Wikipedia URL for the business (if available, otherwise null)
-- overview: A concise 50-75 word overview of the business's history, significance, and notable features
+{BUSINESS_FIELDS}
 - reasoning: Your reasoning for why you think this is the correct business
 
-Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object."""
+Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object.{candidates_instruction('businesses')}"""
 
+        cache_key = guess_cache.key('business', context, incorrect_businesses, self.model.model_name)
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            print(f"=== GEMINI RESPONSE DEBUG ===")
-            print(f"Full response: {response_text}")
-            print(f"Response length: {len(response_text)}")
-            print("=== END GEMINI RESPONSE ===")
-            
-            # Try to parse the JSON response
+            # The same clue with the same exclusions was already answered
+            cached = guess_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached guess: {cached.get('name', 'N/A')}")
+                return cached
+            
+            # A ranked candidate left over from an earlier call needs no new Gemini request
+            queued = next_candidate(session, incorrect_businesses)
+            if queued is not None:
+                print(f"Using queued candidate: {queued.get('name', 'N/A')}")
+                guess = self._enrich_guess(queued)
+                guess_cache.put(cache_key, guess)
+                return guess
+            
+            # Stream the response so the financial scrapes, geocodes and image scrape start as soon as their fields arrive
+            early = EarlyTasks()
             try:
-                # Remove any markdown code blocks if present
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                if response_text.startswith('```'):
-                    response_text = response_text[3:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
-                
-                business_data = json.loads(response_text)
-                print(f"=== JSON PARSED SUCCESSFULLY ===")
-                print(f"Name: {business_data.get('name', 'N/A')}")
-                print(f"Type: {business_data.get('type', 'N/A')}")
-                print(f"Industry: {business_data.get('industry', 'N/A')}")
-                print(f"Founded: {business_data.get('year_founded', 'N/A')}")
-                print(f"Headquarters: {business_data.get('current_headquarters', 'N/A')}")
-                print(f"Wikipedia URL: {business_data.get('wikipedia_url', 'N/A')}")
-                print(f"Reasoning: {business_data.get('reasoning', 'N/A')[:100]}...")
-                print("=== END JSON PARSING ===")
-                
-                # Validate required fields
-                if not business_data.get('name'):
-                    raise ValueError("Missing required field: name")
-                if not business_data.get('reasoning'):
-                    raise ValueError("Missing required field: reasoning")
-                
-                # Add overview if missing
-                if not business_data.get('overview'):
-                    business_data['overview'] = f"{business_data['name']} is a business in the {business_data.get('industry', 'unknown')} industry."
-                
-                # If we have a Wikipedia URL, try to extract an image
-                image_url = "N/A"
-                wikipedia_url = business_data.get('wikipedia_url')
-                if wikipedia_url and wikipedia_url.lower() != 'n/a':
-                    image_url = self._extract_image_from_url(wikipedia_url)
-                
-                # Get coordinates for founding city and headquarters
-                coordinates = {}
-                founding_city = business_data.get('city_founded')
-                if founding_city and founding_city.lower() != 'n/a':
-                    founding_coords = self._get_place_coordinates(founding_city)
-                    if founding_coords:
-                        coordinates['founding'] = founding_coords
-                
-                headquarters = business_data.get('current_headquarters')
-                if headquarters and headquarters.lower() != 'n/a':
-                    headquarters_coords = self._get_place_coordinates(headquarters)
-                    if headquarters_coords:
-                        coordinates['headquarters'] = headquarters_coords
-                
-                # Get financial data from Business Insider (stock price), CNBC (market cap), and Macrotrends for publicly traded companies
-                ticker = business_data.get('ticker')
-                company_name = business_data.get('name')
-                macrotrends_data = {}
-                business_insider_data = {}
-                cnbc_market_cap = None
-                if ticker and company_name:
-                    # Check if ticker is valid (not empty)
-                    is_valid_ticker = False
-                    if isinstance(ticker, list):
-                        is_valid_ticker = len(ticker) > 0
-                    elif isinstance(ticker, str):
-                        is_valid_ticker = len(ticker.strip()) > 0
-                    
-                    if is_valid_ticker:
-                        # Get stock price from Business Insider
-                        first_ticker = ticker[0] if isinstance(ticker, list) else ticker
-                        business_insider_data = self._scrape_business_insider_data(first_ticker)
-                        
-                        # Get market cap from CNBC
-                        cnbc_market_cap = self._scrape_cnbc_market_cap(first_ticker)
-                        
-                        # Get other financial data from Macrotrends
-                        macrotrends_data = self._scrape_macrotrends_financial_data(ticker, company_name)
-                
-                # Build the final response as JSON (matching other games structure)
-                final_response = {
-                    "name": business_data.get('name'),
-                    "type": business_data.get('type'),
-                    "stock_exchange": business_data.get('stock_exchange'),
-                    "ticker": business_data.get('ticker'),
-                    "industry": business_data.get('industry'),
-                    "predecessors": business_data.get('predecessors', []),
-                    "previous_names": business_data.get('previous_names', []),
-                    "city_founded": business_data.get('city_founded'),
-                    "year_founded": business_data.get('year_founded'),
-                    "founders": business_data.get('founders', []),
-                    "current_headquarters": business_data.get('current_headquarters'),
-                    "areas_served": business_data.get('areas_served'),
-                    "number_of_locations": business_data.get('number_of_locations'),
-                    "current_status": business_data.get('current_status'),
-                    "year_defunct": business_data.get('year_defunct'),
-                    "fate": business_data.get('fate'),
-                    "successors": business_data.get('successors'),
-                    "chairman": business_data.get('chairman'),
-                    "ceo": business_data.get('ceo'),
-                    "products": business_data.get('products', []),
-                    "services": business_data.get('services', []),
-                    "technologies": business_data.get('technologies', []),
-                    "subsidiaries": business_data.get('subsidiaries', []),
-                    "stock_price": business_insider_data.get('stock_price'),
-                    "market_cap": cnbc_market_cap,
-                    "revenue": macrotrends_data.get('revenue'),
-                    "operating_income": macrotrends_data.get('operating_income'),
-                    "net_income": macrotrends_data.get('net_income'),
-                    "total_assets": macrotrends_data.get('total_assets'),
-                    "total_equity": macrotrends_data.get('total_equity'),
-                    "owner": business_data.get('owner'),
-                    "owner_equity_percentage": business_data.get('owner_equity_percentage'),
-                    "number_of_employees": business_data.get('number_of_employees'),
-                    "parent": business_data.get('parent'),
-                    "website": business_data.get('website'),
-                    "wikipedia_url": business_data.get('wikipedia_url'),
-                    "reasoning": business_data.get('reasoning'),
-                    "overview": business_data.get('overview'),
-                    "image_url": image_url if image_url != "N/A" else None,
-                    "coordinates": coordinates
-                }
-                
-                return final_response
-                
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, return a fallback response
-                return {
-                    "name": "Unable to parse response",
-                    "type": None,
-                    "stock_exchange": None,
-                    "ticker": None,
-                    "industry": None,
-                    "predecessors": [],
-                    "previous_names": [],
-                    "city_founded": None,
-                    "year_founded": None,
-                    "founders": [],
-                    "current_headquarters": None,
-                    "areas_served": None,
-                    "chairman": None,
-                    "ceo": None,
-                    "products": [],
-                    "services": [],
-                    "technologies": [],
-                    "subsidiaries": [],
-                    "stock_price": None,
-                    "market_cap": None,
-                    "revenue": None,
-                    "operating_income": None,
-                    "net_income": None,
-                    "total_assets": None,
-                    "total_equity": None,
-                    "owner": None,
-                    "owner_equity_percentage": None,
-                    "number_of_employees": None,
-                    "parent": None,
-                    "website": None,
-                    "wikipedia_url": None,
-                    "image_url": None,
-                    "reasoning": f"Error parsing AI response: {str(e)}",
-                    "overview": "There was an error processing the AI response."
-                }
+                response_text = generate_json(self.model, prompt, partial(self._start_early_enrichment, early)).strip()
+                print(f"=== GEMINI RESPONSE DEBUG ===")
+                print(f"Full response: {response_text}")
+                print(f"Response length: {len(response_text)}")
+                print("=== END GEMINI RESPONSE ===")
+            
+                # Try to parse the JSON response
+                try:
+                    # Accepts a single object or a ranked array of candidates, with or without code fences
+                    candidates = parse_candidates(response_text)
+                    queue_candidates(session, candidates)
+                    business_data = candidates[0]
+                    print(f"=== JSON PARSED SUCCESSFULLY ===")
+                    print(f"Name: {business_data.get('name', 'N/A')}")
+                    print(f"Type: {business_data.get('type', 'N/A')}")
+                    print(f"Industry: {business_data.get('industry', 'N/A')}")
+                    print(f"Founded: {business_data.get('year_founded', 'N/A')}")
+                    print(f"Headquarters: {business_data.get('current_headquarters', 'N/A')}")
+                    print(f"Wikipedia URL: {business_data.get('wikipedia_url', 'N/A')}")
+                    print(f"Reasoning: {business_data.get('reasoning', 'N/A')[:100]}...")
+                    print("=== END JSON PARSING ===")
                 
+                except json.JSONDecodeError as e:
+                    # If JSON parsing fails, return a fallback response
+                    return {
+                        "name": "Unable to parse response",
+                        "type": None,
+                        "stock_exchange": None,
+                        "ticker": None,
+                        "industry": None,
+                        "predecessors": [],
+                        "previous_names": [],
+                        "city_founded": None,
+                        "year_founded": None,
+                        "founders": [],
+                        "current_headquarters": None,
+                        "areas_served": None,
+                        "chairman": None,
+                        "ceo": None,
+                        "products": [],
+                        "services": [],
+                        "technologies": [],
+                        "subsidiaries": [],
+                        "stock_price": None,
+                        "market_cap": None,
+                        "revenue": None,
+                        "operating_income": None,
+                        "net_income": None,
+                        "total_assets": None,
+                        "total_equity": None,
+                        "owner": None,
+                        "owner_equity_percentage": None,
+                        "number_of_employees": None,
+                        "parent": None,
+                        "website": None,
+                        "wikipedia_url": None,
+                        "image_url": None,
+                        "reasoning": f"Error parsing AI response: {str(e)}",
+                        "overview": "There was an error processing the AI response."
+                    }
+            
+                guess = self._enrich_guess(business_data, early)
+                guess_cache.put(cache_key, guess)
+                return guess
+            finally:
+                # Steps started for a response that falls back to the old format or fails are not needed
+                early.cancel_rest()
         except Exception as e:
             return {
                 "name": "Error occurred",
@@ -303,203 +279,195 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
                 "overview": "There was an error processing your request."
             }
     
+    def _start_early_enrichment(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """Start the scrapes and geocodes for the leading candidate while the rest of it streams in."""
+        self.enrichment.start_early(early, field, value)
+    
+    def _enrich_guess(self, business_data: Dict[str, Any], early: Optional[EarlyTasks] = None) -> Dict[str, Any]:
+        """Validate a parsed business candidate and add its image, coordinates and financial data."""
+        # Validate required fields
+        if not business_data.get('name'):
+            raise ValueError("Missing required field: name")
+        if not business_data.get('reasoning'):
+            raise ValueError("Missing required field: reasoning")
+        
+        # Add overview if missing
+        if not business_data.get('overview'):
+            business_data['overview'] = f"{business_data['name']} is a business in the {business_data.get('industry', 'unknown')} industry."
+        
+        # Stream the parsed guess before the slower enrichment steps
+        emit('guess', dict(business_data))
+        
+        # The image scrape, geocodes and financial scrapes are independent, so the enrichment graph runs them concurrently
+        enrichment, timings = self.enrichment.run(business_data, early)
+        print(f"Enrichment timings (ms): {timings}")
+
+        # Build the final response as JSON (matching other games structure)
+        final_response = {
+            "name": business_data.get('name'),
+            "type": business_data.get('type'),
+            "stock_exchange": business_data.get('stock_exchange'),
+            "ticker": business_data.get('ticker'),
+            "industry": business_data.get('industry'),
+            "predecessors": business_data.get('predecessors', []),
+            "previous_names": business_data.get('previous_names', []),
+            "city_founded": business_data.get('city_founded'),
+            "year_founded": business_data.get('year_founded'),
+            "founders": business_data.get('founders', []),
+            "current_headquarters": business_data.get('current_headquarters'),
+            "areas_served": business_data.get('areas_served'),
+            "number_of_locations": business_data.get('number_of_locations'),
+            "current_status": business_data.get('current_status'),
+            "year_defunct": business_data.get('year_defunct'),
+            "fate": business_data.get('fate'),
+            "successors": business_data.get('successors'),
+            "chairman": business_data.get('chairman'),
+            "ceo": business_data.get('ceo'),
+            "products": business_data.get('products', []),
+            "services": business_data.get('services', []),
+            "technologies": business_data.get('technologies', []),
+            "subsidiaries": business_data.get('subsidiaries', []),
+            "stock_price": enrichment['stock_price'],
+            "market_cap": enrichment['market_cap'],
+            "revenue": enrichment['revenue'],
+            "operating_income": enrichment['operating_income'],
+            "net_income": enrichment['net_income'],
+            "total_assets": enrichment['total_assets'],
+            "total_equity": enrichment['total_equity'],
+            "owner": business_data.get('owner'),
+            "owner_equity_percentage": business_data.get('owner_equity_percentage'),
+            "number_of_employees": business_data.get('number_of_employees'),
+            "parent": business_data.get('parent'),
+            "website": business_data.get('website'),
+            "wikipedia_url": business_data.get('wikipedia_url'),
+            "reasoning": business_data.get('reasoning'),
+            "overview": business_data.get('overview'),
+            "image_url": enrichment['image_url'],
+            "coordinates": enrichment['coordinates'],
+            "enrichment_timings": timings
+        }
+        
+        return final_response
+    
+    def _prefetch_next_guess(self, session: Dict[str, Any]) -> None:
+        """Start computing, in the background, the guess that follows if the latest business guess is marked incorrect."""
+        last_guess = session['guesses'][-1]
+        if not isinstance(last_guess, dict) or not last_guess.get('name'):
+            return
+        user_input = session['user_input']
+        incorrect_businesses = session['incorrect_businesses'] + [last_guess['name']]
+        guess_prefetcher.schedule(session, lambda scratch: self._make_guess(user_input, incorrect_businesses, scratch))
+    
     def submit_feedback(self, session_id: int, is_correct: bool) -> Dict[str, Any]:
         """Submit feedback for a guess and get the next guess if incorrect."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {"error": "Session not found"}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {"error": "Session not found"}
         
-        if is_correct:
-            # Game is over, user confirmed the guess was correct
-            return {
-                'session_id': session_id,
-                'game_over': True,
-                'message': 'Congratulations! The business was guessed correctly.'
-            }
-        else:
-            # Add the incorrect business to the list and make another guess
-            last_guess = self.current_session['guesses'][-1]
-            if isinstance(last_guess, dict) and 'name' in last_guess:
-                self.current_session['incorrect_businesses'].append(last_guess['name'])
-            
-            # Make another guess with the updated context
-            new_guess = self._make_guess(
-                self.current_session['user_input'], 
-                self.current_session['incorrect_businesses']
-            )
-            self.current_session['guesses'].append(new_guess)
+            # Score a reused answer and remember newly solved clues
+            solved_index.feedback('business', session, is_correct)
+            if is_correct:
+                # Game is over, user confirmed the guess was correct
+                guess_prefetcher.discard(session)
+                return {
+                    'session_id': session_id,
+                    'game_over': True,
+                    'message': 'Congratulations! The business was guessed correctly.'
+                }
+            else:
+                # Add the incorrect business to the list and make another guess
+                last_guess = session['guesses'][-1]
+                if isinstance(last_guess, dict) and 'name' in last_guess:
+                    session['incorrect_businesses'].append(last_guess['name'])
+            
+                # Make another guess, reusing the one prefetched while the player was deciding
+                new_guess = guess_prefetcher.take(session)
+                if new_guess is None:
+                    new_guess = self._make_guess(
+                        session['user_input'], 
+                        session['incorrect_businesses'],
+                        session
+                    )
+                session['guesses'].append(new_guess)
+                self._prefetch_next_guess(session)
+                entity_warmer.schedule('business', session, new_guess)
             
-            return {
-                'session_id': session_id,
-                'guess': new_guess,
-                'game_over': False,
-                'incorrect_businesses': self.current_session['incorrect_businesses']
-            }
+                return {
+                    'session_id': session_id,
+                    'guess': new_guess,
+                    'game_over': False,
+                    'incorrect_businesses': session['incorrect_businesses']
+                }
     
     def get_session_status(self, session_id: int) -> Dict[str, Any]:
         """Get session information."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {"error": "Session not found"}
         
         return {
             'session_id': session_id,
-            'user_input': self.current_session['user_input'],
-            'guesses': self.current_session['guesses'],
-            'incorrect_businesses': self.current_session['incorrect_businesses']
+            'user_input': session['user_input'],
+            'guesses': session['guesses'],
+            'incorrect_businesses': session['incorrect_businesses']
         }
     
     def _extract_image_from_url(self, url: str) -> str:
         """Extract the best image URL from a given webpage URL."""
-        try:
-            # Add headers to mimic a real browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the main image (usually the first large image or infobox image)
-            image_url = None
-            
-            # For Wikipedia pages, look for infobox images first
-            if 'wikipedia.org' in url:
-                infobox = soup.find('table', class_='infobox')
-                if infobox:
-                    img = infobox.find('img')
-                    if img and img.get('src'):
-                        image_url = img.get('src')
-                        # Convert to full URL if it's a relative path
-                        if image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                        elif image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        return image_url
-            
-            # Look for the first large image in the content
-            images = soup.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Skip small images, icons, and decorative elements
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    # Accept any image with size attributes as potentially valid
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            # Remove pixel limits - accept any reasonably sized image
-                            image_url = src
-                            break
-                        except ValueError:
-                            continue
-                    
-                    # If no size attributes, check the src for common patterns
-                    if not image_url and any(keyword in src.lower() for keyword in ['logo', 'image', 'company', 'business', 'corporate', 'jpg', 'jpeg', 'png']):
-                        image_url = src
-                        break
-            
-            if image_url:
-                # Convert to full URL if it's a relative path
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    image_url = urljoin(url, image_url)
-                return image_url
-            
-            return "N/A"
-            
-        except Exception as e:
-            print(f"Error extracting image from {url}: {str(e)}")
-            return "N/A"
+        return image_extractor.extract(url, ['logo', 'image', 'company', 'business', 'corporate', 'jpg', 'jpeg', 'png'])
     
     def _get_place_coordinates(self, place_name: str) -> Optional[Dict[str, float]]:
-        """Get coordinates for a place using Google Maps Geocoding API."""
-        try:
-            if not place_name or place_name.lower() in ['n/a', 'unknown', '']:
-                return None
-            
-            # Use Google Maps Geocoding API
-            geocode_result = self.gmaps.geocode(place_name)
-            
-            if geocode_result:
-                location = geocode_result[0]['geometry']['location']
-                return {
-                    'lat': location['lat'],
-                    'lng': location['lng']
-                }
-            return None
-            
-        except Exception as e:
-            print(f"Error getting coordinates for {place_name}: {str(e)}")
+        """Get coordinates for a place using the shared geocode cache, falling back to Google Maps Geocoding API."""
+        return geocoder.get_coordinates(place_name)
+    
+    def _financial_tasks(self, ticker: str, company_name: str) -> Dict[str, Any]:
+        """Build one independent fetch task per financial source so they can run concurrently; each is served from the financial cache when possible."""
+        scrapes = {
+            'stock_price': lambda: self._scrape_business_insider_data(ticker).get('stock_price'),
+            'market_cap': partial(self._scrape_cnbc_market_cap, ticker)
+        }
+        for metric, url in self._macrotrends_urls(ticker, company_name).items():
+            scrapes[metric] = partial(self._scrape_macrotrends_metric, ticker, metric, url)
+        return {metric: partial(financial_cache.get, ticker, metric, scrape) for metric, scrape in scrapes.items()}
+    
+    def _financial_metric(self, metric: str, ticker: Any, company_name: str) -> Optional[str]:
+        """Fetch one financial metric for the first of a company's tickers."""
+        first_ticker = ticker[0] if isinstance(ticker, list) else ticker
+        if not isinstance(first_ticker, str) or not first_ticker.strip():
             return None
+        return self._financial_tasks(first_ticker, company_name)[metric]()
     
-    def _scrape_macrotrends_financial_data(self, ticker, company_name: str) -> Dict[str, Optional[str]]:
-        """Scrape financial data from Macrotrends for a given ticker and company name."""
-        # Handle ticker as either string or array
-        if isinstance(ticker, list):
-            if not ticker or len(ticker) == 0:
-                return {
-                    'revenue': None,
-                    'operating_income': None,
-                    'net_income': None,
-                    'total_assets': None,
-                    'total_equity': None
-                }
-            # Use the first ticker for financial data
-            ticker = ticker[0]
-        
+    def _macrotrends_urls(self, ticker: str, company_name: str) -> Dict[str, str]:
+        """Build the Macrotrends chart URL for each financial metric."""
         if not ticker or len(ticker.strip()) == 0:
-            return {
-                'revenue': None,
-                'operating_income': None,
-                'net_income': None,
-                'total_assets': None,
-                'total_equity': None
-            }
+            return {}
         
         # Convert company name to URL format (spaces to dashes, lowercase)
         name_formatted = company_name.lower().replace(' ', '-').replace('.', '').replace(',', '')
         
-        financial_data = {
-            'revenue': None,
-            'operating_income': None,
-            'net_income': None,
-            'total_assets': None,
-            'total_equity': None
-        }
-        
         # URLs for different financial metrics in priority order: net income, total equity, revenue, total assets, operating income
-        urls = {
-            'net_income': f"https://macrotrends.net/stocks/charts/{ticker}/{name_formatted}/net-income",
-            'total_equity': f"https://macrotrends.net/stocks/charts/{ticker}/{name_formatted}/total-share-holder-equity",
-            'revenue': f"https://macrotrends.net/stocks/charts/{ticker}/{name_formatted}/revenue",
-            'total_assets': f"https://macrotrends.net/stocks/charts/{ticker}/{name_formatted}/total-assets",
-            'operating_income': f"https://macrotrends.net/stocks/charts/{ticker}/{name_formatted}/operating-income"
+        return {
+            metric: f"https://macrotrends.net/stocks/charts/{ticker}/{name_formatted}/{slug}"
+            for metric, slug in MACROTRENDS_METRICS.items()
         }
-        
-        for metric, url in urls.items():
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
+    
+    def _scrape_macrotrends_metric(self, ticker: str, metric: str, url: str) -> Optional[str]:
+        """Scrape a single financial metric from its Macrotrends chart page."""
+        try:
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            }
+            response = http_client.get(url, headers=headers, timeout=FINANCIAL_SOURCE_TIMEOUT)
+            response.raise_for_status()
+            
+            soup = BeautifulSoup(response.content, 'html.parser')
+            
+            # Look for the financial data in various possible locations
+            return self._extract_financial_value(soup, metric)
                 
-                # Look for the financial data in various possible locations
-                value = self._extract_financial_value(soup, metric)
-                if value:
-                    financial_data[metric] = value
-                    
-            except Exception as e:
-                print(f"Error scraping {metric} for {ticker}: {str(e)}")
-                continue
-        
-        return financial_data
+        except Exception as e:
+            print(f"Error scraping {metric} for {ticker}: {str(e)}")
+            return None
     
     def _scrape_cnbc_market_cap(self, ticker: str) -> Optional[str]:
         """Scrape market cap from CNBC."""
@@ -514,7 +482,7 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_client.get(url, headers=headers, timeout=FINANCIAL_SOURCE_TIMEOUT)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -586,7 +554,7 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_client.get(url, headers=headers, timeout=FINANCIAL_SOURCE_TIMEOUT)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -672,4 +640,5 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
             return None
 
 # Create a global instance for the API to use
-business_guesser = BusinessGuesser()
\ No newline at end of file
+business_guesser = BusinessGuesser()
+entity_describer.register('business', business_guesser, 'business', BUSINESS_FIELDS)
@@ -0,0 +1,100 @@
+"""
+Ranked candidate lists for the guessers.
+One Gemini call can return several ranked answers; the rest are queued in the session so an
+"incorrect" click only has to enrich the next candidate instead of asking the model again.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+# Number of ranked candidates requested per Gemini call; 1 keeps the one-guess-per-call behavior
+GUESS_CANDIDATES = int(os.getenv('GUESS_CANDIDATES', '1'))
+
+
+def candidates_instruction(noun: str, count: int = GUESS_CANDIDATES) -> str:
+    """
+    Build the prompt suffix that asks for a ranked list instead of a single object.
+
+    Args:
+        noun: Plural name of what is being guessed (e.g. "people", "cities")
+        count: Number of candidates to request
+
+    Returns:
+        Text to append to the guess prompt, or an empty string when only one candidate is wanted
+    """
+    if count <= 1:
+        return ""
+    return (
+        f"\n\nInstead of a single JSON object, return a JSON array of the {count} most likely different {noun}, "
+        f"each a JSON object with exactly the keys described above, ordered from most likely to least likely."
+    )
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code fences the model sometimes wraps around JSON."""
+    cleaned_text = text.strip()
+    if cleaned_text.startswith('```json'):
+        cleaned_text = cleaned_text[7:]
+    if cleaned_text.startswith('```'):
+        cleaned_text = cleaned_text[3:]
+    if cleaned_text.endswith('```'):
+        cleaned_text = cleaned_text[:-3]
+    return cleaned_text.strip()
+
+
+def parse_candidates(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse a model response holding either one JSON object or a ranked array of objects.
+
+    Args:
+        text: Raw response text, optionally wrapped in markdown code fences
+
+    Returns:
+        Candidate dictionaries, most likely first
+
+    Raises:
+        json.JSONDecodeError: If the response is not JSON or contains no candidate objects
+    """
+    cleaned_text = strip_code_fences(text)
+    data = json.loads(cleaned_text)
+    candidates = data if isinstance(data, list) else [data]
+    candidates = [candidate for candidate in candidates if isinstance(candidate, dict)]
+    if not candidates:
+        raise json.JSONDecodeError("No candidate objects in response", cleaned_text, 0)
+    return candidates
+
+
+def queue_candidates(session: Optional[Dict[str, Any]], candidates: List[Dict[str, Any]]) -> None:
+    """
+    Keep the runner-up candidates in the session for later "incorrect" rounds.
+
+    Args:
+        session: Session dictionary, or None when there is nowhere to keep them
+        candidates: Parsed candidates; the first one is the guess being shown now
+    """
+    if session is not None:
+        session['candidates'] = list(candidates[1:])
+
+
+def next_candidate(session: Optional[Dict[str, Any]], excluded: List[str], key: str = 'name') -> Optional[Dict[str, Any]]:
+    """
+    Pop the next queued candidate that has not already been rejected.
+
+    Args:
+        session: Session dictionary holding the 'candidates' queue
+        excluded: Names already marked incorrect
+        key: Candidate field holding the name compared against the exclusions
+
+    Returns:
+        The next candidate, or None when the queue is empty and Gemini must be asked again
+    """
+    if not session:
+        return None
+    rejected = {str(name).casefold() for name in excluded or []}
+    queue = session.get('candidates') or []
+    while queue:
+        candidate = queue.pop(0)
+        if str(candidate.get(key, '')).casefold() not in rejected:
+            return candidate
+    return None
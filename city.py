@@ -6,11 +6,63 @@ This game allows users to provide information about a city and the AI tries to g
 import google.generativeai as genai
 from typing import Optional, Dict, Any, List
 import json
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import googlemaps
-from config import GEMINI_API_KEY, GOOGLE_MAPS_API_KEY
+from urllib.parse import urlparse
+from functools import partial
+from config import GEMINI_API_KEY
+from geocoding import geocoder
+from gazetteer import gazetteer
+from image_extractor import image_extractor
+from sessions import SessionStore
+from candidates import candidates_instruction, next_candidate, parse_candidates, queue_candidates
+from prefetch import guess_prefetcher
+from streaming import emit
+from concurrency import EarlyTasks
+from json_stream import generate_json
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from enrichment import Enrich, EnrichmentGraph
+
+# Fields returned for a city, shared by the guessing prompt and the known-entity lookup
+CITY_FIELDS = """- name: The city name, including administrative divisions and country, separated by commas (e.g., "Dallas, Texas, United States")
+- county: County (if applicable, otherwise null)
+- parish: Parish (if applicable, otherwise null)
+- borough: Borough (if applicable, otherwise null)
+- state: State (if applicable, otherwise null)
+- prefecture: Prefecture (if applicable, otherwise null)
+- province: Province (if applicable, otherwise null)
+- department: Department (if applicable, otherwise null)
+- region: Region (if applicable, otherwise null)
+- territory: Territory (if applicable, otherwise null)
+- canton: Canton (if applicable, otherwise null)
+- voivodeship: Voivodeship (if applicable, otherwise null)
+- autonomous_community: Autonomous community (if applicable, otherwise null)
+- other_administrative_division: Other administrative division (if applicable, otherwise null)
+- country: The country where the city is located
+- population: The population of the city (if known, otherwise null)
+- latitude: The latitude of the city (if known, otherwise null)
+- longitude: The longitude of the city (if known, otherwise null)
+- area_mi: The total area of the city (land and water) in square miles (if known, otherwise null)
+- population_density: The population density of the city in people per square mile (if known, otherwise null)
+- elevation: The elevation of the city in feet (if known, otherwise null)
+- year_founded: Year the city was founded (if known, otherwise null)
+- notable_attractions: An array of strings with names of notable attractions within the city, or empty array [] if unknown
+- notable_people: An array of strings with names of notable residents of the city (past and present), or empty array [] if unknown
+- notable_events: An array of strings with names of notable historical events within the city, or empty array [] if unknown
+- notable_businesses: An array of strings with names of notable businesses founded or headquartered in the city, or empty array [] if unknown
+- notable_technologies: An array of strings with names of notable technologies there were invented or improved in the city, or have currently or historically been designed, manufactured, or operated in the city, or empty array [] if unknown
+- wikipedia_url: Wikipedia URL for the city (if available, otherwise null)
+- overview: A concise 50-75 word overview of the city's history, significance, and notable features"""
+
+# Enrichment of a city guess: which fields feed which enrichers
+CITY_ENRICHMENT = [
+    Enrich('image_url', 'wikipedia_url', 'wiki_image'),
+    # The model's own latitude and longitude are kept when the gazetteer has this city at that spot
+    Enrich('reported_coordinates', 'name', 'confirm_coordinates', also=('latitude', 'longitude')),
+    # The name includes its administrative division and country, so it is geocoded directly
+    Enrich('coordinates', 'name', 'geocode', fallback_for=('reported_coordinates',))
+]
 
 class CityGuesser:
     def __init__(self):
@@ -21,31 +73,45 @@ class CityGuesser:
         
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-        self.current_session = None
+        self.sessions = SessionStore()
+        self.enrichment = EnrichmentGraph(CITY_ENRICHMENT, {
+            'wiki_image': self._extract_image_from_url,
+            'geocode': self._get_place_coordinates,
+            'confirm_coordinates': gazetteer.confirm
+        }, batch={'geocode': geocoder.get_coordinates_batch})
     
-    def start_new_session(self, user_input: str) -> Dict[str, Any]:
+    def start_new_session(self, user_input: str, known_entity: bool = False) -> Dict[str, Any]:
         """Start a new city guessing session with user input."""
-        self.current_session = {
+        session = {
             'user_input': user_input,
             'guesses': [],
-            'incorrect_cities': [],  # Track cities that were marked as incorrect
-            'session_id': len(str(hash(user_input + str(len(user_input)))))
+            'incorrect_cities': []  # Track cities that were marked as incorrect
         }
+        self.sessions.create(session)
         
         # Make the first guess
-        first_guess = self._make_guess(user_input)
-        self.current_session['guesses'].append(first_guess)
+        if known_entity:
+            # A name followed from another game's link is described directly instead of guessed
+            first_guess = entity_describer.describe('city', user_input)
+        else:
+            # A paraphrase of a clue players already solved is answered with the confirmed entity
+            first_guess = solved_index.lookup('city', user_input, session)
+        if first_guess is None:
+            first_guess = self._make_guess(user_input, session=session)
+        session['guesses'].append(first_guess)
+        if not known_entity:
+            self._prefetch_next_guess(session)
+        entity_warmer.schedule('city', session, first_guess)
         
         return {
-            'session_id': self.current_session['session_id'],
+            'session_id': session['session_id'],
             'guess': first_guess,
             'is_correct': None,
             'game_over': False
         }
     
-    def _make_guess(self, context: str, incorrect_cities: List[str] = None) -> Dict[str, Any]:
-        """Make a city guess using Gemini API."""
+    def _make_guess(self, context: str, incorrect_cities: List[str] = None, session: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a city guess, using the next queued candidate before calling the Gemini API."""
         if incorrect_cities is None:
             incorrect_cities = []
         
@@ -59,171 +125,95 @@ class CityGuesser:
 {context}{exclusion_text}
 
 Please respond with a JSON object containing the following fields:
-- name: The city name, including administrative divisions and country, separated by commas (e.g., "Dallas, Texas, United States")
-- county: County (if applicable, otherwise null)
-- parish: Parish (if applicable, otherwise null)
-- borough: Borough (if applicable, otherwise null)
-- state: State (if applicable, otherwise null)
-- prefecture: Prefecture (if applicable, otherwise null)
-- province: Province (if applicable, otherwise null)
-- department: Department (if applicable, otherwise null)
-- region: Region (if applicable, otherwise null)
-- territory: Territory (if applicable, otherwise null)
-- canton: Canton (if applicable, otherwise null)
-- voivodeship: Voivodeship (if applicable, otherwise null)
-- autonomous_community: Autonomous community (if applicable, otherwise null)
-- other_administrative_division: Other administrative division (if applicable, otherwise null)
-- country: The country where the city is located
-- population: The population of the city (if known, otherwise null)
-- latitude: The latitude of the city (if known, otherwise null)
-- longitude: The longitude of the city (if known, otherwise null)
-- area_mi: The total area of the city (land and water) in square miles (if known, otherwise null)
-- population_density: The population density of the city in people per square mile (if known, otherwise null)
-- elevation: The elevation of the city in feet (if known, otherwise null)
-- year_founded: Year the city was founded (if known, otherwise null)
-- notable_attractions: An array of strings with names of notable attractions within the city, or empty array [] if unknown
-- notable_people: An array of strings with names of notable residents of the city (past and present), or empty array [] if unknown
-- notable_events: An array of strings with names of notable historical events within the city, or empty array [] if unknown
-- notable_businesses: An array of strings with names of notable businesses founded or headquartered in the city, or empty array [] if unknown
-- notable_technologies: An array of strings with names of notable technologies there were invented or improved in the city, or have currently or historically been designed, manufactured, or operated in the city, or empty array [] if unknown
-- wikipedia_url: Wikipedia URL for the city (if available, otherwise null)
+{CITY_FIELDS}
 - reasoning: Your reasoning for why you think this is the correct city
-- overview: A concise 50-75 word overview of the city's history, significance, and notable features
 
-Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object."""
+Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object.{candidates_instruction('cities')}"""
 
+        cache_key = guess_cache.key('city', context, incorrect_cities, self.model.model_name)
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            print(f"=== GEMINI RESPONSE DEBUG ===")
-            print(f"Full response: {response_text}")
-            print(f"Response length: {len(response_text)}")
-            print("=== END GEMINI RESPONSE ===")
+            # The same clue with the same exclusions was already answered
+            cached = guess_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached guess: {cached.get('name', 'N/A')}")
+                return cached
+            
+            # A ranked candidate left over from an earlier call needs no new Gemini request
+            queued = next_candidate(session, incorrect_cities)
+            if queued is not None:
+                print(f"Using queued candidate: {queued.get('name', 'N/A')}")
+                guess = self._enrich_guess(queued)
+                guess_cache.put(cache_key, guess)
+                return guess
             
-            # Try to parse the JSON response
+            # Stream the response so the geocode and image scrape start as soon as their fields arrive
+            early = EarlyTasks()
             try:
-                # Remove any markdown code blocks if present
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
-                
-                city_data = json.loads(response_text)
-                print(f"=== JSON PARSED SUCCESSFULLY ===")
-                print(f"Name: {city_data.get('name', 'N/A')}")
-                print(f"Country: {city_data.get('country', 'N/A')}")
-                print(f"State/Province: {city_data.get('state', city_data.get('province', 'N/A'))}")
-                print(f"Population: {city_data.get('population', 'N/A')}")
-                print(f"Year Founded: {city_data.get('year_founded', 'N/A')}")
-                print(f"Wikipedia URL: {city_data.get('wikipedia_url', 'N/A')}")
-                print(f"Reasoning: {city_data.get('reasoning', 'N/A')[:100]}...")
-                print("=== END JSON PARSING ===")
-                
-                # Validate required fields
-                if not city_data.get('name'):
-                    raise ValueError("Missing required field: name")
-                if not city_data.get('country'):
-                    raise ValueError("Missing required field: country")
-                if not city_data.get('reasoning'):
-                    raise ValueError("Missing required field: reasoning")
-                
-                # Add overview if missing
-                if not city_data.get('overview'):
-                    city_data['overview'] = f"{city_data['name']} is a city in {city_data['country']}."
-                
-                # If we have a Wikipedia URL, try to extract an image
-                image_url = "N/A"
-                wikipedia_url = city_data.get('wikipedia_url')
-                if wikipedia_url and wikipedia_url.lower() != 'n/a':
-                    image_url = self._extract_image_from_url(wikipedia_url)
-                
-                # Get coordinates for the city
-                coordinates = None
-                city_name = city_data.get('name')
-                if city_name:
-                    # The name field now includes geographical context (e.g., "Portland, Oregon, United States")
-                    # Use it directly for coordinate search
-                    city_coords = self._get_place_coordinates(city_name)
-                    if city_coords:
-                        coordinates = city_coords
-                
-                # Build the final response as JSON (matching person game structure)
-                final_response = {
-                    "name": city_data.get('name'),
-                    "county": city_data.get('county'),
-                    "parish": city_data.get('parish'),
-                    "borough": city_data.get('borough'),
-                    "state": city_data.get('state'),
-                    "prefecture": city_data.get('prefecture'),
-                    "province": city_data.get('province'),
-                    "department": city_data.get('department'),
-                    "region": city_data.get('region'),
-                    "territory": city_data.get('territory'),
-                    "canton": city_data.get('canton'),
-                    "voivodeship": city_data.get('voivodeship'),
-                    "autonomous_community": city_data.get('autonomous_community'),
-                    "other_administrative_division": city_data.get('other_administrative_division'),
-                    "country": city_data.get('country'),
-                    "population": city_data.get('population'),
-                    "latitude": city_data.get('latitude'),
-                    "longitude": city_data.get('longitude'),
-                    "area_mi": city_data.get('area_mi'),
-                    "area_km": city_data.get('area_km'),
-                    "population_density": city_data.get('population_density'),
-                    "elevation": city_data.get('elevation'),
-                    "year_founded": city_data.get('year_founded'),
-                    "notable_attractions": city_data.get('notable_attractions', []),
-                    "notable_people": city_data.get('notable_people', []),
-                    "notable_events": city_data.get('notable_events', []),
-                    "notable_businesses": city_data.get('notable_businesses', []),
-                    "notable_technologies": city_data.get('notable_technologies', []),
-                    "wikipedia_url": city_data.get('wikipedia_url'),
-                    "reasoning": city_data.get('reasoning'),
-                    "overview": city_data.get('overview'),
-                    "image_url": image_url if image_url != "N/A" else None,
-                    "coordinates": coordinates
-                }
-                
-                return final_response
-                
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, return a fallback response
-                return {
-                    "name": "Unable to parse response",
-                    "county": None,
-                    "parish": None,
-                    "borough": None,
-                    "state": None,
-                    "prefecture": None,
-                    "province": None,
-                    "department": None,
-                    "region": None,
-                    "territory": None,
-                    "canton": None,
-                    "voivodeship": None,
-                    "autonomous_community": None,
-                    "other_administrative_division": None,
-                    "country": "Unknown",
-                    "population": None,
-                    "latitude": None,
-                    "longitude": None,
-                    "area_mi": None,
-                    "area_km": None,
-                    "population_density": None,
-                    "elevation": None,
-                    "year_founded": None,
-                    "notable_attractions": [],
-                    "notable_people": [],
-                    "notable_events": [],
-                    "notable_businesses": [],
-                    "notable_technologies": [],
-                    "wikipedia_url": None,
-                    "image_url": None,
-                    "reasoning": f"Error parsing AI response: {str(e)}",
-                    "overview": "There was an error processing the AI response."
-                }
+                response_text = generate_json(self.model, prompt, partial(self._start_early_enrichment, early)).strip()
+                print(f"=== GEMINI RESPONSE DEBUG ===")
+                print(f"Full response: {response_text}")
+                print(f"Response length: {len(response_text)}")
+                print("=== END GEMINI RESPONSE ===")
+            
+                # Try to parse the JSON response
+                try:
+                    # Accepts a single object or a ranked array of candidates, with or without code fences
+                    candidates = parse_candidates(response_text)
+                    queue_candidates(session, candidates)
+                    city_data = candidates[0]
+                    print(f"=== JSON PARSED SUCCESSFULLY ===")
+                    print(f"Name: {city_data.get('name', 'N/A')}")
+                    print(f"Country: {city_data.get('country', 'N/A')}")
+                    print(f"State/Province: {city_data.get('state', city_data.get('province', 'N/A'))}")
+                    print(f"Population: {city_data.get('population', 'N/A')}")
+                    print(f"Year Founded: {city_data.get('year_founded', 'N/A')}")
+                    print(f"Wikipedia URL: {city_data.get('wikipedia_url', 'N/A')}")
+                    print(f"Reasoning: {city_data.get('reasoning', 'N/A')[:100]}...")
+                    print("=== END JSON PARSING ===")
                 
+                except json.JSONDecodeError as e:
+                    # If JSON parsing fails, return a fallback response
+                    return {
+                        "name": "Unable to parse response",
+                        "county": None,
+                        "parish": None,
+                        "borough": None,
+                        "state": None,
+                        "prefecture": None,
+                        "province": None,
+                        "department": None,
+                        "region": None,
+                        "territory": None,
+                        "canton": None,
+                        "voivodeship": None,
+                        "autonomous_community": None,
+                        "other_administrative_division": None,
+                        "country": "Unknown",
+                        "population": None,
+                        "latitude": None,
+                        "longitude": None,
+                        "area_mi": None,
+                        "area_km": None,
+                        "population_density": None,
+                        "elevation": None,
+                        "year_founded": None,
+                        "notable_attractions": [],
+                        "notable_people": [],
+                        "notable_events": [],
+                        "notable_businesses": [],
+                        "notable_technologies": [],
+                        "wikipedia_url": None,
+                        "image_url": None,
+                        "reasoning": f"Error parsing AI response: {str(e)}",
+                        "overview": "There was an error processing the AI response."
+                    }
+            
+                guess = self._enrich_guess(city_data, early)
+                guess_cache.put(cache_key, guess)
+                return guess
+            finally:
+                # Steps started for a response that falls back to the old format or fails are not needed
+                early.cancel_rest()
         except Exception as e:
             return {
                 "name": "Error occurred",
@@ -260,138 +250,141 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
                 "overview": "There was an error processing your request."
             }
     
+    def _start_early_enrichment(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """Start the geocode and image scrape for the leading candidate while the rest of it streams in."""
+        self.enrichment.start_early(early, field, value)
+    
+    def _enrich_guess(self, city_data: Dict[str, Any], early: Optional[EarlyTasks] = None) -> Dict[str, Any]:
+        """Validate a parsed city candidate and add its Wikipedia image and coordinates."""
+        # Validate required fields
+        if not city_data.get('name'):
+            raise ValueError("Missing required field: name")
+        if not city_data.get('country'):
+            raise ValueError("Missing required field: country")
+        if not city_data.get('reasoning'):
+            raise ValueError("Missing required field: reasoning")
+        
+        # Add overview if missing
+        if not city_data.get('overview'):
+            city_data['overview'] = f"{city_data['name']} is a city in {city_data['country']}."
+        
+        # Stream the parsed guess before the slower enrichment steps
+        emit('guess', dict(city_data))
+        
+        enrichment, timings = self.enrichment.run(city_data, early)
+        print(f"Enrichment timings (ms): {timings}")
+        
+        # Build the final response as JSON (matching person game structure)
+        final_response = {
+            "name": city_data.get('name'),
+            "county": city_data.get('county'),
+            "parish": city_data.get('parish'),
+            "borough": city_data.get('borough'),
+            "state": city_data.get('state'),
+            "prefecture": city_data.get('prefecture'),
+            "province": city_data.get('province'),
+            "department": city_data.get('department'),
+            "region": city_data.get('region'),
+            "territory": city_data.get('territory'),
+            "canton": city_data.get('canton'),
+            "voivodeship": city_data.get('voivodeship'),
+            "autonomous_community": city_data.get('autonomous_community'),
+            "other_administrative_division": city_data.get('other_administrative_division'),
+            "country": city_data.get('country'),
+            "population": city_data.get('population'),
+            "latitude": city_data.get('latitude'),
+            "longitude": city_data.get('longitude'),
+            "area_mi": city_data.get('area_mi'),
+            "area_km": city_data.get('area_km'),
+            "population_density": city_data.get('population_density'),
+            "elevation": city_data.get('elevation'),
+            "year_founded": city_data.get('year_founded'),
+            "notable_attractions": city_data.get('notable_attractions', []),
+            "notable_people": city_data.get('notable_people', []),
+            "notable_events": city_data.get('notable_events', []),
+            "notable_businesses": city_data.get('notable_businesses', []),
+            "notable_technologies": city_data.get('notable_technologies', []),
+            "wikipedia_url": city_data.get('wikipedia_url'),
+            "reasoning": city_data.get('reasoning'),
+            "overview": city_data.get('overview'),
+            "image_url": enrichment['image_url'],
+            "coordinates": enrichment['reported_coordinates'] or enrichment['coordinates'],
+            "enrichment_timings": timings
+        }
+        
+        return final_response
+    
+    def _prefetch_next_guess(self, session: Dict[str, Any]) -> None:
+        """Start computing, in the background, the guess that follows if the latest city guess is marked incorrect."""
+        last_guess = session['guesses'][-1]
+        if not isinstance(last_guess, dict) or not last_guess.get('name'):
+            return
+        user_input = session['user_input']
+        incorrect_cities = session['incorrect_cities'] + [last_guess['name']]
+        guess_prefetcher.schedule(session, lambda scratch: self._make_guess(user_input, incorrect_cities, scratch))
+    
     def submit_feedback(self, session_id: int, is_correct: bool) -> Dict[str, Any]:
         """Submit feedback for a guess and get the next guess if incorrect."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {"error": "Session not found"}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {"error": "Session not found"}
         
-        if is_correct:
-            # Game is over, user confirmed the guess was correct
-            return {
-                'session_id': session_id,
-                'game_over': True,
-                'message': 'Congratulations! The city was guessed correctly.'
-            }
-        else:
-            # Add the incorrect city to the list and make another guess
-            last_guess = self.current_session['guesses'][-1]
-            if isinstance(last_guess, dict) and 'name' in last_guess:
-                self.current_session['incorrect_cities'].append(last_guess['name'])
+            # Score a reused answer and remember newly solved clues
+            solved_index.feedback('city', session, is_correct)
+            if is_correct:
+                # Game is over, user confirmed the guess was correct
+                guess_prefetcher.discard(session)
+                return {
+                    'session_id': session_id,
+                    'game_over': True,
+                    'message': 'Congratulations! The city was guessed correctly.'
+                }
+            else:
+                # Add the incorrect city to the list and make another guess
+                last_guess = session['guesses'][-1]
+                if isinstance(last_guess, dict) and 'name' in last_guess:
+                    session['incorrect_cities'].append(last_guess['name'])
             
-            # Make another guess with the updated context
-            new_guess = self._make_guess(
-                self.current_session['user_input'], 
-                self.current_session['incorrect_cities']
-            )
-            self.current_session['guesses'].append(new_guess)
+                # Make another guess, reusing the one prefetched while the player was deciding
+                new_guess = guess_prefetcher.take(session)
+                if new_guess is None:
+                    new_guess = self._make_guess(
+                        session['user_input'], 
+                        session['incorrect_cities'],
+                        session
+                    )
+                session['guesses'].append(new_guess)
+                self._prefetch_next_guess(session)
+                entity_warmer.schedule('city', session, new_guess)
             
-            return {
-                'session_id': session_id,
-                'guess': new_guess,
-                'game_over': False,
-                'incorrect_cities': self.current_session['incorrect_cities']
-            }
+                return {
+                    'session_id': session_id,
+                    'guess': new_guess,
+                    'game_over': False,
+                    'incorrect_cities': session['incorrect_cities']
+                }
     
     def get_session(self, session_id: int) -> Dict[str, Any]:
         """Get session information."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {"error": "Session not found"}
         
         return {
             'session_id': session_id,
-            'user_input': self.current_session['user_input'],
-            'guesses': self.current_session['guesses'],
-            'incorrect_cities': self.current_session['incorrect_cities']
+            'user_input': session['user_input'],
+            'guesses': session['guesses'],
+            'incorrect_cities': session['incorrect_cities']
         }
     
     def _extract_image_from_url(self, url: str) -> str:
         """Extract the best image URL from a given webpage URL."""
-        try:
-            # Add headers to mimic a real browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the main image (usually the first large image or infobox image)
-            image_url = None
-            
-            # For Wikipedia pages, look for infobox images first
-            if 'wikipedia.org' in url:
-                infobox = soup.find('table', class_='infobox')
-                if infobox:
-                    img = infobox.find('img')
-                    if img and img.get('src'):
-                        image_url = img.get('src')
-                        # Convert to full URL if it's a relative path
-                        if image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                        elif image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        return image_url
-            
-            # Look for the first large image in the content
-            images = soup.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Skip small images, icons, and decorative elements
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    # Accept any image with size attributes as potentially valid
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            # Remove pixel limits - accept any reasonably sized image
-                            image_url = src
-                            break
-                        except ValueError:
-                            continue
-                    
-                    # If no size attributes, check the src for common patterns
-                    if not image_url and any(keyword in src.lower() for keyword in ['photo', 'image', 'skyline', 'view', 'city', 'downtown', 'center', 'jpg', 'jpeg', 'png']):
-                        image_url = src
-                        break
-            
-            if image_url:
-                # Convert to full URL if it's a relative path
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    image_url = urljoin(url, image_url)
-                return image_url
-            
-            return "N/A"
-            
-        except Exception as e:
-            print(f"Error extracting image from {url}: {str(e)}")
-            return "N/A"
+        return image_extractor.extract(url, ['photo', 'image', 'skyline', 'view', 'city', 'downtown', 'center', 'jpg', 'jpeg', 'png'])
     
     def _get_place_coordinates(self, place_name: str) -> Optional[Dict[str, float]]:
-        """Get coordinates for a place using Google Maps Geocoding API."""
-        try:
-            if not place_name or place_name.lower() in ['n/a', 'unknown', '']:
-                return None
-            
-            # Use Google Maps Geocoding API
-            geocode_result = self.gmaps.geocode(place_name)
-            
-            if geocode_result:
-                location = geocode_result[0]['geometry']['location']
-                return {
-                    'lat': location['lat'],
-                    'lng': location['lng']
-                }
-            return None
-            
-        except Exception as e:
-            print(f"Error getting coordinates for {place_name}: {str(e)}")
-            return None
+        """Get coordinates for a place using the shared geocode cache, falling back to Google Maps Geocoding API."""
+        return geocoder.get_coordinates(place_name)
 
 # Create a global instance for the API to use
-city_guesser = CityGuesser()
\ No newline at end of file
+city_guesser = CityGuesser()
+entity_describer.register('city', city_guesser, 'city', CITY_FIELDS)
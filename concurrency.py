@@ -0,0 +1,126 @@
+"""
+Shared concurrency helpers.
+Runs blocking Gemini, scraping and geocoding work on bounded thread pools so the
+FastAPI event loop stays free to serve other players while upstream calls are in flight.
+"""
+
+import asyncio
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+# Maximum number of guesses (LLM call plus enrichment) that can be in flight at once
+GUESS_WORKERS = int(os.getenv('GUESS_WORKERS', '32'))
+
+# Maximum number of enrichment steps (scrapes, geocodes) running at once across all guesses
+ENRICHMENT_WORKERS = int(os.getenv('ENRICHMENT_WORKERS', '64'))
+
+# Seconds an enrichment step (a scrape or geocode) may take before it is dropped from the guess
+ENRICHMENT_DEADLINE = float(os.getenv('ENRICHMENT_DEADLINE', '12'))
+
+# Bounded pool used by the API handlers for every blocking guess call
+guess_executor = ThreadPoolExecutor(max_workers=GUESS_WORKERS, thread_name_prefix='guess')
+
+# Separate pool for enrichment so guess workers waiting on their fan-out can never starve it
+enrichment_executor = ThreadPoolExecutor(max_workers=ENRICHMENT_WORKERS, thread_name_prefix='enrich')
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the guess executor without stalling the event loop.
+
+    Args:
+        func: Blocking callable (e.g. a guesser's start_new_session)
+        *args: Positional arguments for the callable
+        **kwargs: Keyword arguments for the callable
+
+    Returns:
+        Whatever the callable returns; exceptions are re-raised in the caller
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(guess_executor, partial(func, *args, **kwargs))
+
+
+def _timed(timings: Dict[str, float], name: str, func: Callable[[], Any]) -> Any:
+    """Run a task and record its duration in milliseconds."""
+    started = time.perf_counter()
+    try:
+        return func()
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+class EarlyTasks:
+    """Enrichment steps started before the full guess is known, e.g. while the model is still streaming."""
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, func: Callable[[], Any]) -> None:
+        """
+        Start a named enrichment step on the enrichment pool unless it is already running.
+
+        Args:
+            name: Task name, matching the name the guesser later asks for
+            func: Zero-argument callable
+        """
+        with self._lock:
+            if name not in self._futures:
+                self._futures[name] = enrichment_executor.submit(_timed, self.timings, name, func)
+
+    def start_batch(self, items: Dict[str, Any], func: Callable[[List[Any]], Dict[Any, Any]]) -> None:
+        """
+        Start several named steps as one call on the enrichment pool, skipping any already running.
+
+        Each step still gets its own future (resolved when the batch finishes) and the batch's duration.
+
+        Args:
+            items: Step name to the value it is for
+            func: Callable taking the list of values and returning a dictionary keyed by value
+        """
+        with self._lock:
+            todo = {name: value for name, value in items.items() if name not in self._futures}
+            members = {name: Future() for name in todo}
+            self._futures.update(members)
+        if not todo:
+            return
+
+        def run() -> Dict[Any, Any]:
+            started = time.perf_counter()
+            try:
+                return func(list(todo.values()))
+            finally:
+                elapsed = round((time.perf_counter() - started) * 1000, 1)
+                for name in todo:
+                    self.timings[name] = elapsed
+
+        def resolve(batch: Future) -> None:
+            for name, member in members.items():
+                # Steps cancelled while the batch ran are left cancelled
+                if not member.set_running_or_notify_cancel():
+                    continue
+                if batch.exception() is not None:
+                    member.set_exception(batch.exception())
+                else:
+                    member.set_result(batch.result().get(todo[name]))
+
+        enrichment_executor.submit(run).add_done_callback(resolve)
+
+    def pop(self, name: str) -> Optional[Future]:
+        """Take the future of a step started early, or None if it was never started."""
+        with self._lock:
+            return self._futures.pop(name, None)
+
+    def cancel_rest(self) -> None:
+        """Cancel early steps the final guess turned out not to need."""
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            future.cancel()
+
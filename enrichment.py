@@ -0,0 +1,260 @@
+"""
+Declarative enrichment shared by the guessing games.
+Each game declares which fields of a parsed guess feed which enrichers (a geocode, a Wikipedia
+image scrape, a financial source, a generated image) and the response field each fills. The
+engine turns a guess into a graph of steps: every step whose inputs are known runs at once on the
+enrichment pool, identical steps (the same place in two lists) run once, the pending steps of a
+batched enricher (every place to geocode) go out as one call, steps started while the guess was
+still streaming are reused, fallbacks wait only for the outputs they stand in for, and
+each enricher has its own timeout. Step durations are returned for the response metadata.
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from concurrency import ENRICHMENT_DEADLINE, EarlyTasks
+from streaming import emit_enrichment
+
+# Values the models and scrapers return instead of something to enrich or show
+EMPTY_VALUES = {'', 'n/a', 'na', 'null', 'none', 'unknown'}
+
+
+def is_empty(value: Any) -> bool:
+    """Whether a field value or enricher result carries nothing; numbers, including 0, are values."""
+    if isinstance(value, str):
+        return value.strip().lower() in EMPTY_VALUES
+    return value is None or (isinstance(value, (list, dict, tuple, set)) and not value)
+
+
+class Enrich:
+    """Declares one enrichment: the guess field it reads, the enricher it feeds and the output it fills."""
+
+    def __init__(self, output: str, field: Union[str, Tuple[str, ...]], enricher: str, each: bool = False,
+                 also: Tuple[str, ...] = (), group: Optional[str] = None, label: str = 'city',
+                 extra: Optional[Dict[str, Any]] = None, fallback_for: Tuple[str, ...] = (),
+                 skip: Tuple[str, ...] = (), early: bool = True, timeout: Optional[float] = ENRICHMENT_DEADLINE):
+        """
+        Declare an enrichment.
+
+        Args:
+            output: Name of the result (streamed under this name)
+            field: Guess field fed to the enricher; a tuple uses the first non-empty one
+            enricher: Name of the enricher, as registered with the graph
+            each: The field is a list; every item is enriched and the output lists
+                {label: item, 'coordinates': result, **extra} for the items that produced a result
+            also: Further guess fields passed to the enricher; the step is skipped unless they are set
+            group: Collect the output under this key of a dictionary instead (e.g. 'coordinates')
+            label: Key naming the item in each entry of a list output
+            extra: Constant keys added to each entry of a list output
+            fallback_for: Outputs this one stands in for; it waits for them and runs only if all came back empty
+            skip: Further lowercase field values that mean there is nothing to enrich (e.g. 'alive')
+            early: Whether the step may start while the guess is still streaming
+            timeout: Seconds the step may take, or None to wait until it finishes
+        """
+        self.output = output
+        self.fields = field if isinstance(field, tuple) else (field,)
+        self.enricher = enricher
+        self.each = each
+        self.also = also
+        self.group = group
+        self.label = label
+        self.extra = extra or {}
+        self.fallback_for = fallback_for
+        self.skip = set(skip)
+        self.early = early
+        self.timeout = timeout
+
+    def inputs(self, guess: Dict[str, Any]) -> List[Any]:
+        """List the values to enrich: the list items, the single field value, or nothing."""
+        if any(is_empty(guess.get(name)) for name in self.also):
+            return []
+        for name in self.fields:
+            value = guess.get(name)
+            if self.each:
+                values = [item for item in (value if isinstance(value, list) else []) if not self._skipped(item)]
+            else:
+                values = [] if self._skipped(value) else [value]
+            if values:
+                return values
+        return []
+
+    def args(self, value: Any, guess: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Positional arguments for the enricher."""
+        return (value,) + tuple(guess.get(name) for name in self.also)
+
+    def _skipped(self, value: Any) -> bool:
+        return is_empty(value) or (isinstance(value, str) and value.strip().lower() in self.skip)
+
+
+def step_name(enricher: str, args: Tuple[Any, ...]) -> str:
+    """Name the step running an enricher on its arguments; identical steps share the name."""
+    parts = [arg if isinstance(arg, str) else json.dumps(arg, default=str) for arg in args]
+    return f"{enricher}:{'|'.join(parts)}"
+
+
+class EnrichmentGraph:
+    """Runs a game's declared enrichments as a dependency graph with maximal concurrency."""
+
+    def __init__(self, plan: List[Enrich], enrichers: Dict[str, Callable[..., Any]],
+                 batch: Optional[Dict[str, Callable[[List[Any]], Dict[Any, Any]]]] = None):
+        """
+        Initialize the graph.
+
+        Args:
+            plan: The game's declarations, in response order
+            enrichers: Enricher name to blocking callable taking the field value (then any 'also' fields)
+            batch: Enricher name to a callable taking a list of field values and returning a dictionary
+                keyed by value; the steps of that enricher that are ready together run as one call
+        """
+        self.plan = plan
+        self.enrichers = enrichers
+        self.batch = batch or {}
+
+    def start_early(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """
+        Start the steps a streamed field feeds while the rest of the guess arrives.
+
+        Args:
+            early: Steps started for the guess being streamed
+            field: Field that just completed
+            value: Its value
+        """
+        early.fields[field] = value
+        ready: Dict[str, Tuple[str, Tuple[Any, ...]]] = {}
+        for enrich in self.plan:
+            # A step that also needs other fields starts once those have streamed before this one
+            if not enrich.early or enrich.fields[0] != field or any(name not in early.fields for name in enrich.also):
+                continue
+            for item in enrich.inputs(early.fields):
+                args = enrich.args(item, early.fields)
+                ready[step_name(enrich.enricher, args)] = (enrich.enricher, args)
+        self._launch(early, ready, self.enrichers, self.batch)
+
+    def run(self, guess: Dict[str, Any], early: Optional[EarlyTasks] = None,
+            enrichers: Optional[Dict[str, Callable[..., Any]]] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Enrich a parsed guess.
+
+        Args:
+            guess: The parsed candidate
+            early: Steps started while it streamed; they are reused, and ones it no longer needs are cancelled
+            enrichers: Enrichers for this guess only, replacing the registered ones (e.g. bound to a player session)
+
+        Returns:
+            Tuple of (outputs, timings). Outputs holds every declared output (None or an empty list if it
+            produced nothing; grouped outputs are collected in their group's dictionary). Timings holds
+            each finished step's duration in milliseconds.
+        """
+        early = early if early is not None else EarlyTasks()
+        # An enricher replaced for this guess is no longer the one its batch call stands for
+        batch = {name: func for name, func in self.batch.items() if name not in (enrichers or {})}
+        enrichers = dict(self.enrichers, **(enrichers or {}))
+        futures: Dict[str, Future] = {}
+        deadlines: Dict[str, Optional[float]] = {}
+        results: Dict[str, Any] = {}
+        steps: Dict[str, List[Tuple[Any, str]]] = {}
+        values: Dict[str, Any] = {}
+
+        def schedule(plan: List[Enrich]) -> None:
+            ready: Dict[str, Tuple[str, Tuple[Any, ...]]] = {}
+            timeouts: Dict[str, Optional[float]] = {}
+            for enrich in plan:
+                steps[enrich.output] = []
+                for item in enrich.inputs(guess):
+                    args = enrich.args(item, guess)
+                    name = step_name(enrich.enricher, args)
+                    steps[enrich.output].append((item, name))
+                    if name not in futures and name not in results:
+                        ready[name] = (enrich.enricher, args)
+                        timeouts[name] = enrich.timeout
+            # Reuses the runs started while the guess streamed, if there are any
+            self._launch(early, ready, enrichers, batch)
+            for name in ready:
+                futures[name] = early.pop(name)
+                deadlines[name] = None if timeouts[name] is None else time.monotonic() + timeouts[name]
+
+        blocked = [enrich for enrich in self.plan if enrich.fallback_for]
+        schedule([enrich for enrich in self.plan if not enrich.fallback_for])
+
+        while True:
+            progressed = False
+            for enrich in self.plan:
+                entries = steps.get(enrich.output)
+                if enrich.output in values or entries is None or any(name not in results for _, name in entries):
+                    continue
+                values[enrich.output] = self._shape(enrich, entries, results)
+                progressed = True
+                if entries:
+                    emit_enrichment(enrich.output, values[enrich.output])
+            for enrich in list(blocked):
+                if all(output in values for output in enrich.fallback_for):
+                    blocked.remove(enrich)
+                    progressed = True
+                    if all(is_empty(values[output]) for output in enrich.fallback_for):
+                        schedule([enrich])
+                    else:
+                        steps[enrich.output] = []
+            if not futures:
+                if not progressed:
+                    break
+                continue
+
+            now = time.monotonic()
+            remaining = [deadline - now for name, deadline in deadlines.items() if name in futures and deadline is not None]
+            wait(list(futures.values()), timeout=max(0.0, min(remaining)) if remaining else None, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for name, future in list(futures.items()):
+                if future.done():
+                    del futures[name]
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        print(f"Enrichment step '{name}' failed: {str(e)}")
+                        results[name] = None
+                elif deadlines[name] is not None and deadlines[name] <= now:
+                    del futures[name]
+                    future.cancel()
+                    results[name] = None
+                    print(f"Enrichment step '{name}' missed its deadline")
+
+        # Steps started for fields the final candidate no longer has are not needed
+        early.cancel_rest()
+
+        outputs: Dict[str, Any] = {}
+        for enrich in self.plan:
+            if enrich.group is None:
+                outputs[enrich.output] = values.get(enrich.output)
+            else:
+                group = outputs.setdefault(enrich.group, {})
+                if not is_empty(values.get(enrich.output)):
+                    group[enrich.output] = values[enrich.output]
+        timings = {name: early.timings[name] for name in results if name in early.timings}
+        return outputs, timings
+
+    @staticmethod
+    def _launch(early: EarlyTasks, ready: Dict[str, Tuple[str, Tuple[Any, ...]]],
+                enrichers: Dict[str, Callable[..., Any]], batch: Dict[str, Callable[[List[Any]], Dict[Any, Any]]]) -> None:
+        """Start steps on the enrichment pool, one call per batched enricher and one per other step."""
+        batches: Dict[str, Dict[str, Any]] = {}
+        for name, (enricher, args) in ready.items():
+            if enricher in batch and len(args) == 1 and isinstance(args[0], str):
+                batches.setdefault(enricher, {})[name] = args[0]
+            else:
+                early.start(name, partial(enrichers[enricher], *args))
+        for enricher, items in batches.items():
+            early.start_batch(items, batch[enricher])
+
+    @staticmethod
+    def _shape(enrich: Enrich, entries: List[Tuple[Any, str]], results: Dict[str, Any]) -> Any:
+        """Build an output from its steps' results."""
+        if enrich.each:
+            return [
+                {enrich.label: item, 'coordinates': results[name], **enrich.extra}
+                for item, name in entries if not is_empty(results[name])
+            ]
+        if not entries or is_empty(results[entries[0][1]]):
+            return None
+        return results[entries[0][1]]
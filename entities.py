@@ -0,0 +1,161 @@
+"""
+Direct lookup of a known entity.
+A name followed from another game's link (a person's birthplace, a city's notable business) is
+already an answer, not a clue, so it is described with a short prompt that asks for the game's
+fields without reasoning, exclusions or ranked candidates. Results are cached far longer than
+guesses, since a named entity's description rarely changes, and concurrent lookups of the same
+entity (a player's click racing a background warm-up) share one Gemini call. Background warm-ups
+may defer image generation, leaving it to the player who opens the entity.
+"""
+
+import copy
+import os
+import threading
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+from candidates import parse_candidates
+from concurrency import EarlyTasks
+from guess_cache import GuessCache
+from json_stream import generate_json
+
+# Set to 0 to describe every followed link with a fresh Gemini call
+ENTITY_CACHE = os.getenv('ENTITY_CACHE', '1') == '1'
+
+# Seconds a described entity is served
+ENTITY_CACHE_TTL = float(os.getenv('ENTITY_CACHE_TTL', str(30 * 24 * 3600)))
+
+# Approximate bytes of described entities kept in memory
+ENTITY_CACHE_MEMORY_BYTES = int(os.getenv('ENTITY_CACHE_MEMORY_BYTES', str(32 * 1024 * 1024)))
+
+# SQLite file backing the entity cache
+ENTITY_CACHE_PATH = os.getenv('ENTITY_CACHE_PATH', os.path.join('cache', 'entities.sqlite3'))
+
+
+class EntityDescriber:
+    """Describes named entities for every game through one cache, with one lookup per entity in flight."""
+
+    def __init__(self, cache: GuessCache):
+        """
+        Initialize the describer.
+
+        Args:
+            cache: Cache of described entities
+        """
+        self.cache = cache
+        self._games: Dict[str, Tuple[Any, str, str, bool]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._joined = 0
+
+    def register(self, game: str, guesser: Any, noun: str, fields: str, images: bool = False) -> None:
+        """
+        Make a game's entities describable.
+
+        Args:
+            game: Game name (e.g. 'city')
+            guesser: The game's guesser (provides model, _start_early_enrichment and _enrich_guess)
+            noun: What the game identifies, as used in the prompt (e.g. 'famous person')
+            fields: The game's field list for the prompt
+            images: Whether the game's enrichment queues image jobs (its _enrich_guess takes an owner and defer_image)
+        """
+        self._games[game] = (guesser, noun, fields, images)
+
+    def supports(self, game: str) -> bool:
+        """Whether the game has registered."""
+        return game in self._games
+
+    def key(self, game: str, name: str) -> str:
+        """Cache key of a game's entity."""
+        guesser = self._games[game][0]
+        return GuessCache.key(game, name, None, guesser.model.model_name)
+
+    def is_cached(self, game: str, name: str) -> bool:
+        """Whether the entity is already described in the cache."""
+        return self.cache.contains(self.key(game, name))
+
+    def describe(self, game: str, name: str, owner: Any = None, defer_image: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Describe a named entity with the game's fields and enrichment.
+
+        Args:
+            game: Registered game name
+            name: Entity name as shown in the linking game
+            owner: Player session image jobs are queued for (see image_jobs)
+            defer_image: Only name the entity's image job; whoever serves the entity resumes it
+
+        Returns:
+            The enriched entity, or None if it could not be described (the caller falls back to guessing)
+        """
+        key = self.key(game, name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"Using cached entity: {cached.get('name', 'N/A')}")
+            return cached
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = Future()
+            else:
+                self._joined += 1
+        if not leader:
+            # Another request or a background warm-up is already describing this entity
+            return copy.deepcopy(pending.result())
+
+        entity = None
+        try:
+            entity = self._describe(game, name, owner, defer_image)
+            if entity is not None:
+                self.cache.put(key, entity)
+            return entity
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_result(copy.deepcopy(entity))
+
+    def _describe(self, game: str, name: str, owner: Any, defer_image: bool) -> Optional[Dict[str, Any]]:
+        guesser, noun, fields, images = self._games[game]
+        prompt = f"""Describe the {noun} named below. Source information from Wikipedia.
+
+Name: {name}
+
+Please respond with a single JSON object containing the following fields:
+{fields}
+
+Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object."""
+
+        early = EarlyTasks()
+        try:
+            text = generate_json(guesser.model, prompt, partial(guesser._start_early_enrichment, early))
+            data = parse_candidates(text)[0]
+            # Guess validation expects an explanation; a followed link is its own
+            data.setdefault('reasoning', f"Followed a link to this {noun}.")
+            if images:
+                entity = guesser._enrich_guess(data, early, owner, defer_image)
+            else:
+                entity = guesser._enrich_guess(data, early)
+        except Exception as e:
+            early.cancel_rest()
+            print(f"Error describing {game} entity {name}: {str(e)}")
+            return None
+
+        if not isinstance(entity, dict) or 'error' in entity:
+            return None
+        return entity
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters and how many lookups joined one already in flight."""
+        counters = self.cache.stats()
+        with self._lock:
+            counters['joined_in_flight'] = self._joined
+            counters['in_flight'] = len(self._inflight)
+        return counters
+
+
+# Global instance
+entity_describer = EntityDescriber(
+    GuessCache(ENTITY_CACHE_PATH, ENTITY_CACHE_TTL, ENTITY_CACHE_MEMORY_BYTES, ENTITY_CACHE)
+)
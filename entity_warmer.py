@@ -0,0 +1,185 @@
+"""
+Background warming of linked entities.
+Every guess lists the entities a player is most likely to open next (a person's birthplace and
+companies, a city's notable events, a movie's filming cities). After a guess is shown, the first
+few of them are described into the entity cache on a small background pool, so following a link
+to another game usually finds its answer ready. Illustrations are not generated while warming;
+the image job is only named, and starts when a player actually opens the entity. Each session has a budget of lookups; pending
+lookups are cancelled when a newer guess replaces the one they were for, or the player leaves.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from enrichment import is_empty
+from entities import entity_describer
+from guess_cache import normalize_clue
+
+# Set to 1 to describe a guess's linked entities in the background while the player reads it
+ENTITY_WARMING = os.getenv('ENTITY_WARMING', '0') == '1'
+
+# Linked entities described at once across all sessions, kept apart from the request pools
+ENTITY_WARM_WORKERS = int(os.getenv('ENTITY_WARM_WORKERS', '4'))
+
+# Names taken from each linked field of a guess (e.g. the first 2 notable businesses)
+ENTITY_WARM_PER_FIELD = int(os.getenv('ENTITY_WARM_PER_FIELD', '2'))
+
+# Upstream lookups one session may spend on warming over its lifetime
+ENTITY_WARM_BUDGET = int(os.getenv('ENTITY_WARM_BUDGET', '6'))
+
+# Fields each game's page turns into links, and the game each link opens
+LINKED_FIELDS: Dict[str, List[Tuple[str, str]]] = {
+    'person': [
+        ('place_of_birth', 'city'), ('businesses', 'business'), ('technologies', 'invention'),
+        ('events', 'event'), ('place_of_death', 'city'), ('place_of_residence', 'city'), ('place_of_burial', 'city')
+    ],
+    'city': [
+        ('notable_people', 'person'), ('notable_businesses', 'business'), ('notable_events', 'event'),
+        ('notable_technologies', 'invention')
+    ],
+    'event': [('key_figures', 'person'), ('key_cities', 'city'), ('key_technologies', 'invention')],
+    'business': [
+        ('founders', 'person'), ('city_founded', 'city'), ('current_headquarters', 'city'), ('ceo', 'person'),
+        ('technologies', 'invention'), ('chairman', 'person')
+    ],
+    'invention': [
+        ('inventors', 'person'), ('businesses', 'business'), ('design_hubs', 'city'), ('historical_events', 'event'),
+        ('manufacturing_hubs', 'city')
+    ],
+    'movie': [
+        ('starring', 'person'), ('cities', 'city'), ('events', 'event'), ('directed_by', 'person'),
+        ('production_company', 'business'), ('people', 'person')
+    ],
+    'tvshow': [
+        ('starring', 'person'), ('cities', 'city'), ('events', 'event'), ('created_by', 'person'),
+        ('production_companies', 'business'), ('people', 'person')
+    ]
+}
+
+
+def linked_entities(game: str, guess: Dict[str, Any], per_field: int = ENTITY_WARM_PER_FIELD) -> List[Tuple[str, str]]:
+    """
+    List the entities a guess links to, most likely clicks first.
+
+    Args:
+        game: Game the guess belongs to
+        guess: Enriched guess as shown to the player
+        per_field: Names taken from each linked field
+
+    Returns:
+        (target game, name) pairs: the first name of every field, then the second, and so on
+    """
+    columns = []
+    for field, target in LINKED_FIELDS.get(game, []):
+        value = guess.get(field)
+        names = value if isinstance(value, list) else [value]
+        names = [name.strip() for name in names if isinstance(name, str) and not is_empty(name)]
+        columns.append([(target, name) for name in names[:per_field]])
+
+    linked, seen = [], set()
+    for rank in range(per_field):
+        for column in columns:
+            if rank < len(column):
+                target, name = column[rank]
+                if (target, normalize_clue(name)) not in seen:
+                    seen.add((target, normalize_clue(name)))
+                    linked.append(column[rank])
+    return linked
+
+
+class EntityWarmer:
+    """Describes guesses' linked entities in the background under per-session budgets."""
+
+    def __init__(self, enabled: bool = ENTITY_WARMING, max_workers: int = ENTITY_WARM_WORKERS,
+                 per_field: int = ENTITY_WARM_PER_FIELD, session_budget: int = ENTITY_WARM_BUDGET):
+        """
+        Initialize the warmer.
+
+        Args:
+            enabled: Whether linked entities are warmed at all
+            max_workers: Size of the background pool
+            per_field: Names taken from each linked field
+            session_budget: Upstream lookups one session may spend
+        """
+        self.enabled = enabled
+        self.per_field = per_field
+        self.session_budget = session_budget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='entity-warm') if enabled else None
+        self._lock = threading.Lock()
+        self._counters = {'scheduled': 0, 'warmed': 0, 'failed': 0, 'cancelled': 0, 'already_cached': 0, 'over_budget': 0}
+        self._seconds = 0.0
+
+    def schedule(self, game: str, session: Dict[str, Any], guess: Any) -> None:
+        """
+        Start describing the entities a newly shown guess links to.
+
+        Args:
+            game: Game the guess belongs to
+            session: Session the guess was shown in; warming state is kept under '_warm'
+            guess: The guess just shown
+        """
+        if not self.enabled or not isinstance(guess, dict) or 'error' in guess:
+            return
+        # Lookups still queued for the previous guess are no longer the likeliest clicks
+        self.cancel(session)
+        state = session.setdefault('_warm', {'spent': 0, 'futures': []})
+        for target, name in linked_entities(game, guess, self.per_field):
+            if not entity_describer.supports(target):
+                continue
+            if state['spent'] >= self.session_budget:
+                self._count('over_budget')
+                break
+            if entity_describer.is_cached(target, name):
+                self._count('already_cached')
+                continue
+            state['spent'] += 1
+            state['futures'].append(self._executor.submit(self._warm, target, name, (game, session.get('session_id'))))
+            self._count('scheduled')
+
+    def cancel(self, session: Dict[str, Any]) -> None:
+        """
+        Cancel a session's queued lookups; ones already running finish and are cached.
+
+        Args:
+            session: Session dictionary
+        """
+        state = session.get('_warm')
+        if not state:
+            return
+        futures, state['futures'] = state['futures'], []
+        for future in futures:
+            if future.cancel():
+                # Never started, so it does not count against the session's budget
+                state['spent'] -= 1
+                self._count('cancelled')
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup counters and the upstream time spent warming."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['seconds'] = round(self._seconds, 3)
+        counters['enabled'] = self.enabled
+        return counters
+
+    def _warm(self, game: str, name: str, owner: Any) -> None:
+        started = time.perf_counter()
+        try:
+            # An entity nobody opens should not cost an image generation
+            entity = entity_describer.describe(game, name, owner, defer_image=True)
+        except Exception as e:
+            print(f"Error warming {game} entity {name}: {str(e)}")
+            entity = None
+        with self._lock:
+            self._seconds += time.perf_counter() - started
+            self._counters['warmed' if entity is not None else 'failed'] += 1
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+
+# Global instance
+entity_warmer = EntityWarmer()
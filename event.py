@@ -1,11 +1,50 @@
 import google.generativeai as genai
 from typing import Optional, Dict, Any
 import json
-import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import googlemaps
-from config import GEMINI_API_KEY, GOOGLE_MAPS_API_KEY
+from urllib.parse import urlparse
+from functools import partial
+from config import GEMINI_API_KEY
+from geocoding import geocoder
+from http_client import http_client
+from image_extractor import image_extractor
+from sessions import SessionStore
+from candidates import candidates_instruction, next_candidate, parse_candidates, queue_candidates
+from prefetch import guess_prefetcher
+from streaming import emit
+from concurrency import EarlyTasks
+from json_stream import generate_json
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from image_jobs import image_jobs
+from enrichment import Enrich, EnrichmentGraph
+from media_store import media_store
+
+# Fields returned for a event, shared by the guessing prompt and the known-entity lookup
+EVENT_FIELDS = """- name: The event name
+- start: Start date of the event (if known, otherwise null)
+- end: End date of the event (if known, otherwise null)
+- location: The primary location where the event took place (if known, otherwise null)
+- key_cities: An array of key cities involved in the event (if known, otherwise empty array), entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States")
+- key_figures: An array of key figures involved in the event (if known, otherwise empty array)
+- key_technologies: An array of key technologies used in the event (if known, otherwise empty array)
+- causes: The main causes or triggers of the event (if known, otherwise null), answered as a complete sentence
+- key_developments: Key developments or phases of the event (if known, otherwise null), answered as a complete sentence
+- results: The main results or outcomes of the event (if known, otherwise null), answered as a complete sentence
+- wikipedia_url: Wikipedia URL for the event (if available, otherwise null)
+- overview: A concise 50-75 word overview of the event's significance and key details"""
+
+# Enrichment of an event guess: which fields feed which enrichers
+EVENT_ENRICHMENT = [
+    # A queued image job is only submitted for the final candidate, never while it streams
+    Enrich('generated_image', 'name', 'generated_image', early=not image_jobs.enabled, timeout=None),
+    Enrich('wikipedia_image_url', 'wikipedia_url', 'wiki_image'),
+    Enrich('city_coordinates', 'key_cities', 'geocode', each=True),
+    # The event's location stands in when none of its key cities could be placed
+    Enrich('coordinates', 'location', 'geocode', fallback_for=('city_coordinates',))
+]
 
 class EventGuesser:
     def __init__(self):
@@ -13,31 +52,48 @@ class EventGuesser:
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
         self.image_model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-        self.current_session = None
+        self.sessions = SessionStore()
+        self.enrichment = EnrichmentGraph(EVENT_ENRICHMENT, {
+            'generated_image': partial(image_jobs.image, 'event', generate=self._generate_event_image),
+            'wiki_image': self._extract_image_from_url,
+            'geocode': self._get_location_coordinates
+        }, batch={'geocode': geocoder.get_coordinates_batch})
     
-    def start_new_session(self, user_input: str) -> Dict[str, Any]:
+    def start_new_session(self, user_input: str, known_entity: bool = False) -> Dict[str, Any]:
         """Start a new event guessing session with user input."""
-        self.current_session = {
+        session = {
             'user_input': user_input,
             'guesses': [],
-            'incorrect_events': [],  # Track events that were marked as incorrect
-            'session_id': len(str(hash(user_input + str(len(user_input)))))
+            'incorrect_events': []  # Track events that were marked as incorrect
         }
+        self.sessions.create(session)
         
         # Make the first guess
-        first_guess = self._make_guess(user_input)
-        self.current_session['guesses'].append(first_guess)
+        if known_entity:
+            # A name followed from another game's link is described directly instead of guessed
+            first_guess = entity_describer.describe('event', user_input, ('event', session['session_id']))
+        else:
+            # A paraphrase of a clue players already solved is answered with the confirmed entity
+            first_guess = solved_index.lookup('event', user_input, session)
+        if first_guess is None:
+            first_guess = self._make_guess(user_input, session=session)
+        else:
+            # A reused guess may name an image job that failed or was lost since it was first served
+            image_jobs.resume('event', first_guess, self._generate_event_image, ('event', session['session_id']))
+        session['guesses'].append(first_guess)
+        if not known_entity:
+            self._prefetch_next_guess(session)
+        entity_warmer.schedule('event', session, first_guess)
         
         return {
-            'session_id': self.current_session['session_id'],
+            'session_id': session['session_id'],
             'guess': first_guess,
             'is_correct': None,
             'game_over': False
         }
     
-    def _make_guess(self, context: str, incorrect_events: list = None) -> str:
-        """Make an event guess using Gemini API."""
+    def _make_guess(self, context: str, incorrect_events: list = None, session: Optional[Dict[str, Any]] = None) -> str:
+        """Make an event guess, using the next queued candidate before calling the Gemini API."""
         if incorrect_events is None:
             incorrect_events = []
         
@@ -51,117 +107,89 @@ class EventGuesser:
 {context}{exclusion_text}
 
 Please respond with a JSON object containing the following fields:
-- name: The event name
-- start: Start date of the event (if known, otherwise null)
-- end: End date of the event (if known, otherwise null)
-- location: The primary location where the event took place (if known, otherwise null)
-- key_cities: An array of key cities involved in the event (if known, otherwise empty array), entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States")
-- key_figures: An array of key figures involved in the event (if known, otherwise empty array)
-- key_technologies: An array of key technologies used in the event (if known, otherwise empty array)
-- causes: The main causes or triggers of the event (if known, otherwise null), answered as a complete sentence
-- key_developments: Key developments or phases of the event (if known, otherwise null), answered as a complete sentence
-- results: The main results or outcomes of the event (if known, otherwise null), answered as a complete sentence
-- wikipedia_url: Wikipedia URL for the event (if available, otherwise null)
+{EVENT_FIELDS}
 - reasoning: Your reasoning for why you think this is the correct event
-- overview: A concise 50-75 word overview of the event's significance and key details
 
-Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object."""
+Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object.{candidates_instruction('events')}"""
 
+        cache_key = guess_cache.key('event', context, incorrect_events, self.model.model_name)
+        # Image jobs are capped per player session; prefetches and link lookups have none
+        image_owner = ('event', session['session_id']) if session and 'session_id' in session else None
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            print(f"=== GEMINI RESPONSE DEBUG ===")
-            print(f"Full response: {response_text}")
-            print(f"Response length: {len(response_text)}")
-            print("=== END GEMINI RESPONSE ===")
+            # The same clue with the same exclusions was already answered
+            cached = guess_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached guess: {cached.get('name', 'N/A')}")
+                image_jobs.resume('event', cached, self._generate_event_image, image_owner)
+                return cached
             
-            # Try to parse the JSON response
+            # A ranked candidate left over from an earlier call needs no new Gemini request
+            queued = next_candidate(session, incorrect_events)
+            if queued is not None:
+                print(f"Using queued candidate: {queued.get('name', 'N/A')}")
+                guess = self._enrich_guess(queued, owner=image_owner)
+                guess_cache.put(cache_key, guess)
+                return guess
+            
+            # Stream the response so image generation and geocodes start as soon as their fields arrive
+            early = EarlyTasks()
             try:
-                # Remove any markdown code blocks if present
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                if response_text.startswith('```'):
-                    response_text = response_text[3:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-                response_text = response_text.strip()
-                
-                event_data = json.loads(response_text)
-                print(f"=== JSON PARSED SUCCESSFULLY ===")
-                print(f"Name: {event_data.get('name', 'N/A')}")
-                print(f"Start: {event_data.get('start', 'N/A')}")
-                print(f"End: {event_data.get('end', 'N/A')}")
-                print(f"Location: {event_data.get('location', 'N/A')}")
-                print(f"Key Figures: {event_data.get('key_figures', [])}")
-                print(f"Causes: {event_data.get('causes', 'N/A')}")
-                print(f"Results: {event_data.get('results', 'N/A')}")
-                print(f"Wikipedia URL: {event_data.get('wikipedia_url', 'N/A')}")
-                print(f"Reasoning: {event_data.get('reasoning', 'N/A')[:100]}...")
-                print("=== END JSON PARSING ===")
-                
-                # Generate image using Gemini 2.5 Flash Image Preview
-                generated_image_url = self._generate_event_image(event_data.get('name', ''))
-                
-                # Get Wikipedia image if URL is available (as fallback)
-                wikipedia_image_url = "N/A"
-                if event_data.get('wikipedia_url') and event_data['wikipedia_url'].lower() != 'n/a':
-                    wikipedia_image_url = self._extract_image_from_url(event_data['wikipedia_url'])
-                
-                # Get coordinates for all key cities
-                city_coordinates = []
-                if event_data.get('key_cities'):
-                    for city in event_data['key_cities']:
-                        coords = self._get_location_coordinates(city)
-                        if coords:
-                            city_coordinates.append({
-                                'city': city,
-                                'coordinates': coords
-                            })
-                
-                # Fallback to single location if no key cities or no coordinates found
-                coordinates = None
-                if not city_coordinates:
-                    if event_data.get('location'):
-                        coordinates = self._get_location_coordinates(event_data['location'])
-                
-                # Add images and coordinates to the response
-                event_data['image_url'] = generated_image_url
-                event_data['wikipedia_image_url'] = wikipedia_image_url
-                event_data['coordinates'] = coordinates
-                event_data['city_coordinates'] = city_coordinates
-                
-                # Ensure key_technologies is included in the response
-                if 'key_technologies' not in event_data:
-                    event_data['key_technologies'] = []
-                
-                return event_data
-                
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, return a fallback response
-                print(f"=== JSON PARSING FAILED ===")
-                print(f"Error: {str(e)}")
-                print(f"Cleaned response text: {response_text}")
-                print("=== END JSON PARSING ERROR ===")
-                return {
-                    'name': 'Unable to parse response',
-                    'start': None,
-                    'end': None,
-                    'location': None,
-                    'key_cities': [],
-                    'key_figures': [],
-                    'key_technologies': [],
-                    'causes': None,
-                    'key_developments': None,
-                    'results': None,
-                    'wikipedia_url': None,
-                    'reasoning': f'Failed to parse AI response as valid JSON. Error: {str(e)}',
-                    'overview': 'The AI response could not be properly parsed.',
-                    'image_url': "https://via.placeholder.com/400x400/EF4444/FFFFFF?text=Parse+Error",
-                    'wikipedia_image_url': None,
-                    'coordinates': None,
-                    'city_coordinates': []
-                }
+                response_text = generate_json(self.model, prompt, partial(self._start_early_enrichment, early)).strip()
+                print(f"=== GEMINI RESPONSE DEBUG ===")
+                print(f"Full response: {response_text}")
+                print(f"Response length: {len(response_text)}")
+                print("=== END GEMINI RESPONSE ===")
+            
+                # Try to parse the JSON response
+                try:
+                    # Accepts a single object or a ranked array of candidates, with or without code fences
+                    candidates = parse_candidates(response_text)
+                    queue_candidates(session, candidates)
+                    event_data = candidates[0]
+                    print(f"=== JSON PARSED SUCCESSFULLY ===")
+                    print(f"Name: {event_data.get('name', 'N/A')}")
+                    print(f"Start: {event_data.get('start', 'N/A')}")
+                    print(f"End: {event_data.get('end', 'N/A')}")
+                    print(f"Location: {event_data.get('location', 'N/A')}")
+                    print(f"Key Figures: {event_data.get('key_figures', [])}")
+                    print(f"Causes: {event_data.get('causes', 'N/A')}")
+                    print(f"Results: {event_data.get('results', 'N/A')}")
+                    print(f"Wikipedia URL: {event_data.get('wikipedia_url', 'N/A')}")
+                    print(f"Reasoning: {event_data.get('reasoning', 'N/A')[:100]}...")
+                    print("=== END JSON PARSING ===")
                 
+                except json.JSONDecodeError as e:
+                    # If JSON parsing fails, return a fallback response
+                    print(f"=== JSON PARSING FAILED ===")
+                    print(f"Error: {str(e)}")
+                    print(f"Cleaned response text: {response_text}")
+                    print("=== END JSON PARSING ERROR ===")
+                    return {
+                        'name': 'Unable to parse response',
+                        'start': None,
+                        'end': None,
+                        'location': None,
+                        'key_cities': [],
+                        'key_figures': [],
+                        'key_technologies': [],
+                        'causes': None,
+                        'key_developments': None,
+                        'results': None,
+                        'wikipedia_url': None,
+                        'reasoning': f'Failed to parse AI response as valid JSON. Error: {str(e)}',
+                        'overview': 'The AI response could not be properly parsed.',
+                        'image_url': "https://via.placeholder.com/400x400/EF4444/FFFFFF?text=Parse+Error",
+                        'wikipedia_image_url': None,
+                        'coordinates': None,
+                        'city_coordinates': []
+                    }
+            
+                guess = self._enrich_guess(event_data, early, image_owner)
+                guess_cache.put(cache_key, guess)
+                return guess
+            finally:
+                # Steps started for a response that falls back to the old format or fails are not needed
+                early.cancel_rest()
         except Exception as e:
             return {
                 'name': 'Error occurred',
@@ -185,7 +213,7 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
     def _get_wikipedia_image(self, wikipedia_url: str) -> Optional[str]:
         """Get the main image from a Wikipedia page."""
         try:
-            response = requests.get(wikipedia_url, timeout=10)
+            response = http_client.get(wikipedia_url, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -218,65 +246,105 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
         return None
     
     def _get_location_coordinates(self, location: str) -> Optional[Dict[str, float]]:
-        """Get coordinates for a location using Google Maps Geocoding API."""
-        try:
-            geocode_result = self.gmaps.geocode(location)
-            if geocode_result:
-                location_data = geocode_result[0]['geometry']['location']
-                return {
-                    'lat': location_data['lat'],
-                    'lng': location_data['lng']
-                }
-        except Exception as e:
-            print(f"Error getting coordinates for {location}: {e}")
+        """Get coordinates for a location using the shared geocode cache, falling back to Google Maps Geocoding API."""
+        return geocoder.get_coordinates(location)
+    
+    def _start_early_enrichment(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """Start image generation, the image scrape and geocodes for the leading candidate while the rest of it streams in."""
+        self.enrichment.start_early(early, field, value)
+    
+    def _enrich_guess(self, event_data: Dict[str, Any], early: Optional[EarlyTasks] = None, owner: Any = None,
+                      defer_image: bool = False) -> Dict[str, Any]:
+        """Add the generated (or queued) and Wikipedia images and coordinates to a parsed event candidate."""
+        # Stream the parsed guess before the slower enrichment steps
+        emit('guess', dict(event_data))
         
-        return None
+        # Image jobs are queued under the player session the guess is for, or only named when deferred
+        enrichment, timings = self.enrichment.run(event_data, early, {
+            'generated_image': partial(image_jobs.image, 'event', generate=self._generate_event_image, owner=owner,
+                                       defer=defer_image)
+        })
+        print(f"Enrichment timings (ms): {timings}")
+        generated_image = enrichment['generated_image'] or {}
+        
+        # Add images and coordinates to the response
+        event_data['image_url'] = generated_image.get('image_url')
+        event_data['image_job'] = generated_image.get('image_job')
+        event_data['wikipedia_image_url'] = enrichment['wikipedia_image_url'] or "N/A"
+        event_data['coordinates'] = enrichment['coordinates']
+        event_data['city_coordinates'] = enrichment['city_coordinates']
+        event_data['enrichment_timings'] = timings
+        
+        # Ensure key_technologies is included in the response
+        if 'key_technologies' not in event_data:
+            event_data['key_technologies'] = []
+        
+        return event_data
+    
+    def _prefetch_next_guess(self, session: Dict[str, Any]) -> None:
+        """Start computing, in the background, the guess that follows if the latest event guess is marked incorrect."""
+        last_guess = session['guesses'][-1]
+        if not isinstance(last_guess, dict) or not last_guess.get('name'):
+            return
+        user_input = session['user_input']
+        incorrect_events = session['incorrect_events'] + [last_guess['name']]
+        guess_prefetcher.schedule(session, lambda scratch: self._make_guess(user_input, incorrect_events, scratch))
     
     def submit_feedback(self, session_id: int, is_correct: bool) -> Dict[str, Any]:
         """Submit feedback for the current guess."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {'error': 'Invalid session ID'}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {'error': 'Invalid session ID'}
         
-        if is_correct:
-            # Game is won
-            self.current_session['game_over'] = True
-            return {
-                'session_id': session_id,
-                'correct': True,
-                'game_over': True,
-                'message': 'Congratulations! You guessed correctly!'
-            }
-        else:
-            # Add current guess to incorrect list and make a new guess
-            current_guess = self.current_session['guesses'][-1]
-            if current_guess.get('name'):
-                self.current_session['incorrect_events'].append(current_guess['name'])
+            # Score a reused answer and remember newly solved clues
+            solved_index.feedback('event', session, is_correct)
+            if is_correct:
+                # Game is won
+                guess_prefetcher.discard(session)
+                session['game_over'] = True
+                return {
+                    'session_id': session_id,
+                    'correct': True,
+                    'game_over': True,
+                    'message': 'Congratulations! You guessed correctly!'
+                }
+            else:
+                # Add current guess to incorrect list and make a new guess
+                current_guess = session['guesses'][-1]
+                if current_guess.get('name'):
+                    session['incorrect_events'].append(current_guess['name'])
             
-            # Make a new guess with the updated context
-            new_guess = self._make_guess(
-                self.current_session['user_input'], 
-                self.current_session['incorrect_events']
-            )
-            self.current_session['guesses'].append(new_guess)
+                # Make a new guess, reusing the one prefetched while the player was deciding
+                new_guess = guess_prefetcher.take(session)
+                if new_guess is None:
+                    new_guess = self._make_guess(
+                        session['user_input'], 
+                        session['incorrect_events'],
+                        session
+                    )
+                session['guesses'].append(new_guess)
+                self._prefetch_next_guess(session)
+                entity_warmer.schedule('event', session, new_guess)
             
-            return {
-                'session_id': session_id,
-                'correct': False,
-                'game_over': False,
-                'new_guess': new_guess
-            }
+                return {
+                    'session_id': session_id,
+                    'correct': False,
+                    'game_over': False,
+                    'new_guess': new_guess
+                }
     
     def get_session_status(self, session_id: int) -> Dict[str, Any]:
         """Get the current status of a session."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {'error': 'Invalid session ID'}
         
         return {
             'session_id': session_id,
-            'user_input': self.current_session['user_input'],
-            'guesses': self.current_session['guesses'],
-            'incorrect_events': self.current_session['incorrect_events'],
-            'game_over': self.current_session.get('game_over', False)
+            'user_input': session['user_input'],
+            'guesses': session['guesses'],
+            'incorrect_events': session['incorrect_events'],
+            'game_over': session.get('game_over', False)
         }
     
     def _generate_event_image(self, event_name: str) -> str:
@@ -298,10 +366,8 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
             if hasattr(response, 'parts') and response.parts:
                 for part in response.parts:
                     if hasattr(part, 'inline_data') and part.inline_data:
-                        # Convert base64 image data to data URL
-                        import base64
-                        image_data = base64.b64encode(part.inline_data.data).decode('utf-8')
-                        image_url = f"data:image/png;base64,{image_data}"
+                        # Store the image once and reference it by URL
+                        image_url = media_store.store_image_part(part)
                         return image_url
                 else:
                     # Fallback if no image data found
@@ -315,71 +381,8 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
     
     def _extract_image_from_url(self, url: str) -> str:
         """Extract the best image URL from a given webpage URL."""
-        try:
-            # Add headers to mimic a real browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the main image (usually the first large image or infobox image)
-            image_url = None
-            
-            # For Wikipedia pages, look for infobox images first
-            if 'wikipedia.org' in url:
-                infobox = soup.find('table', class_='infobox')
-                if infobox:
-                    img = infobox.find('img')
-                    if img and img.get('src'):
-                        image_url = img.get('src')
-                        # Convert to full URL if it's a relative path
-                        if image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                        elif image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        return image_url
-            
-            # Look for the first large image in the content
-            images = soup.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Skip small images, icons, and decorative elements
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    # Check if it's a reasonable size for an event photo
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            if w >= 100 and h >= 100:  # Minimum size threshold
-                                image_url = src
-                                break
-                        except ValueError:
-                            continue
-                    
-                    # If no size attributes, check the src for common patterns
-                    if not image_url and any(keyword in src.lower() for keyword in ['photo', 'image', 'event', 'battle', 'war', 'meeting', 'conference', 'jpg', 'jpeg', 'png']):
-                        image_url = src
-                        break
-            
-            if image_url:
-                # Convert to full URL if it's a relative path
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    image_url = urljoin(url, image_url)
-                return image_url
-            
-            return "N/A"
-            
-        except Exception as e:
-            print(f"Error extracting image from {url}: {str(e)}")
-            return "N/A"
-
+        return image_extractor.extract(url, ['photo', 'image', 'event', 'battle', 'war', 'meeting', 'conference', 'jpg', 'jpeg', 'png'], min_size=100)
+    
 # Create global instance
-event_guesser = EventGuesser()
\ No newline at end of file
+event_guesser = EventGuesser()
+entity_describer.register('event', event_guesser, 'event', EVENT_FIELDS, images=True)
@@ -0,0 +1,183 @@
+"""
+Financial snapshot cache for the business game.
+Keeps each scraped metric per ticker with its own TTL (minutes for stock price and market cap,
+days for Macrotrends fundamentals) and serves stale values immediately while a background
+refresh fetches a current one (stale-while-revalidate).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# SQLite file that keeps financial snapshots across restarts
+FINANCIAL_CACHE_PATH = os.getenv('FINANCIAL_CACHE_PATH', os.path.join('cache', 'financials.sqlite3'))
+
+# Seconds a stock price or market cap is fresh
+FINANCIAL_PRICE_TTL = float(os.getenv('FINANCIAL_PRICE_TTL', '300'))
+
+# Seconds a fundamental (revenue, net income, equity, assets, operating income) is fresh
+FINANCIAL_FUNDAMENTALS_TTL = float(os.getenv('FINANCIAL_FUNDAMENTALS_TTL', str(3 * 24 * 3600)))
+
+# Seconds past expiry that a stale value may still be served while it is refreshed
+FINANCIAL_MAX_STALE = float(os.getenv('FINANCIAL_MAX_STALE', str(7 * 24 * 3600)))
+
+# Ticker metrics kept in the in-memory LRU tier
+FINANCIAL_MEMORY_ENTRIES = int(os.getenv('FINANCIAL_MEMORY_ENTRIES', '10000'))
+
+# Background refreshes running at once
+FINANCIAL_REFRESH_WORKERS = int(os.getenv('FINANCIAL_REFRESH_WORKERS', '4'))
+
+# Metrics that move with the market; everything else is a reported fundamental
+MARKET_METRICS = {'stock_price', 'market_cap'}
+
+
+def metric_ttl(metric: str) -> float:
+    """Seconds a value of this metric stays fresh."""
+    return FINANCIAL_PRICE_TTL if metric in MARKET_METRICS else FINANCIAL_FUNDAMENTALS_TTL
+
+
+class FinancialCache:
+    """Per-ticker, per-metric cache (memory LRU, then SQLite) with stale-while-revalidate refresh."""
+
+    def __init__(self, path: str = FINANCIAL_CACHE_PATH, max_stale: float = FINANCIAL_MAX_STALE,
+                 refresh_workers: int = FINANCIAL_REFRESH_WORKERS, memory_entries: int = FINANCIAL_MEMORY_ENTRIES):
+        """
+        Initialize the cache and create the SQLite table if needed.
+
+        Args:
+            path: SQLite database file
+            max_stale: Seconds past expiry a value may still be served while refreshing
+            refresh_workers: Size of the background refresh pool
+            memory_entries: Capacity of the in-memory LRU tier
+        """
+        self.max_stale = max_stale
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='financial-refresh')
+        self._counters = {'fresh_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_failures': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS financials ('
+            'ticker TEXT NOT NULL, metric TEXT NOT NULL, value TEXT, fetched_at REAL NOT NULL, '
+            'PRIMARY KEY (ticker, metric))'
+        )
+        self._db.commit()
+
+    def get(self, ticker: str, metric: str, fetch: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Get a metric for a ticker, scraping it only when there is no usable cached value.
+
+        Args:
+            ticker: Stock ticker symbol
+            metric: Metric name (e.g. 'stock_price', 'revenue')
+            fetch: Zero-argument scrape returning the value, or None if it could not be found
+
+        Returns:
+            The cached or freshly scraped value, or None
+        """
+        key = (ticker.strip().upper(), metric)
+        cached = self._lookup(key)
+        if cached is not None:
+            value, fetched_at = cached
+            age = time.time() - fetched_at
+            ttl = metric_ttl(metric)
+            if age < ttl:
+                self._count('fresh_hits')
+                return value
+            if age < ttl + self.max_stale:
+                # Serve the old value now and bring the cache up to date in the background
+                self._count('stale_hits')
+                self._refresh_in_background(key, fetch)
+                return value
+
+        self._count('misses')
+        value = fetch()
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                return cached
+            row = self._db.execute(
+                'SELECT value, fetched_at FROM financials WHERE ticker = ? AND metric = ?', key
+            ).fetchone()
+            if row is None:
+                return None
+            cached = (row[0], row[1])
+            self._remember(key, cached)
+            return cached
+
+    def _store(self, key: Tuple[str, str], value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, (value, now))
+            self._db.execute(
+                'INSERT OR REPLACE INTO financials (ticker, metric, value, fetched_at) VALUES (?, ?, ?, ?)',
+                (key[0], key[1], value, now)
+            )
+            self._db.commit()
+
+    def _remember(self, key: Tuple[str, str], entry: Tuple[Any, float]) -> None:
+        """Insert into the memory tier, evicting the least recently used entries beyond capacity."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _refresh_in_background(self, key: Tuple[str, str], fetch: Callable[[], Optional[str]]) -> None:
+        """Start one refresh per key; concurrent stale reads of the same key share it."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh() -> None:
+            try:
+                value = fetch()
+                if value is not None:
+                    self._store(key, value)
+                    self._count('refreshes')
+                else:
+                    # Keep serving the stale value; the next stale read tries again
+                    self._count('refresh_failures')
+            except Exception as e:
+                self._count('refresh_failures')
+                print(f"Error refreshing {key[1]} for {key[0]}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss and refresh counters."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['entries'] = len(self._memory)
+            counters['refreshing'] = len(self._refreshing)
+        lookups = counters['fresh_hits'] + counters['stale_hits'] + counters['misses']
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 4) if lookups else None
+        return counters
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+
+# Global instance
+financial_cache = FinancialCache()
@@ -0,0 +1,358 @@
+"""
+Offline gazetteer of populated places.
+Most places the games geocode are well-known cities written as "City, Division, Country".
+A GeoNames city dump (e.g. cities15000.txt, with admin1CodesASCII.txt and countryInfo.txt
+for division and country names) is loaded into array-backed columns with a hash index from
+place name to rows, so those places resolve in-process before Google Maps is asked. A k-d
+tree over the same rows answers reverse lookups (the populated place nearest a point).
+Without the files the gazetteer is empty and every place goes to Google Maps.
+"""
+
+import math
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Set to 0 to resolve every place through the geocode cache and Google Maps
+GAZETTEER = os.getenv('GAZETTEER', '1') == '1'
+
+# GeoNames city dump (tab-separated, e.g. cities15000.txt from download.geonames.org/export/dump)
+GAZETTEER_PATH = os.getenv('GAZETTEER_PATH', os.path.join('data', 'cities15000.txt'))
+
+# GeoNames first-level division names (admin1CodesASCII.txt); optional
+GAZETTEER_ADMIN1_PATH = os.getenv('GAZETTEER_ADMIN1_PATH', os.path.join('data', 'admin1CodesASCII.txt'))
+
+# GeoNames country names and codes (countryInfo.txt); optional
+GAZETTEER_COUNTRIES_PATH = os.getenv('GAZETTEER_COUNTRIES_PATH', os.path.join('data', 'countryInfo.txt'))
+
+# A bare city name resolves only if its most populous match is this many times larger than the next
+GAZETTEER_DOMINANCE = float(os.getenv('GAZETTEER_DOMINANCE', '10'))
+
+# Kilometres within which a reported point is accepted as the city the gazetteer has there
+GAZETTEER_MATCH_KM = float(os.getenv('GAZETTEER_MATCH_KM', '25'))
+
+EARTH_RADIUS_KM = 6371.0
+
+# Common ways of writing a country that countryInfo.txt does not list
+COUNTRY_ALIASES = {
+    'usa': 'US', 'u s': 'US', 'u s a': 'US', 'united states of america': 'US', 'america': 'US',
+    'uk': 'GB', 'u k': 'GB', 'great britain': 'GB', 'britain': 'GB',
+    'czech republic': 'CZ', 'holland': 'NL', 'the netherlands': 'NL', 'korea': 'KR', 'republic of korea': 'KR',
+    'russian federation': 'RU', 'ussr': 'RU', 'soviet union': 'RU', 'uae': 'AE', "people's republic of china": 'CN',
+    'prc': 'CN', 'turkiye': 'TR', 'ivory coast': 'CI', 'burma': 'MM', 'swaziland': 'SZ', 'macedonia': 'MK'
+}
+
+
+def fold_name(text: Any) -> str:
+    """
+    Fold a place name for matching: accents, case, punctuation and spacing are ignored.
+
+    Args:
+        text: Place name or part of one
+
+    Returns:
+        Folded name (e.g. "São Paulo" -> "sao paulo"), or an empty string
+    """
+    if not isinstance(text, str):
+        return ''
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = re.sub(r"[^\w\s,']", ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def parse_degrees(value: Any) -> Optional[float]:
+    """
+    Read a latitude or longitude as the models write it.
+
+    Args:
+        value: Number or text such as "32.78", "-96.8" or "32.7767° N"
+
+    Returns:
+        Signed decimal degrees (south and west negative), or None if unreadable
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = re.search(r'(-?\d+(?:\.\d+)?)\s*°?\s*([NSEWnsew])?', value)
+    if match is None:
+        return None
+    degrees = float(match.group(1))
+    if match.group(2) and match.group(2).upper() in 'SW':
+        degrees = -abs(degrees)
+    return degrees
+
+
+def _unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    """Point on the unit sphere; straight-line distances order like great-circle distances."""
+    phi, lam = math.radians(lat), math.radians(lng)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+class Gazetteer:
+    """Array-backed table of populated places with a name index and a k-d tree for reverse lookups."""
+
+    def __init__(self, enabled: bool = GAZETTEER, path: str = GAZETTEER_PATH,
+                 admin1_path: str = GAZETTEER_ADMIN1_PATH, countries_path: str = GAZETTEER_COUNTRIES_PATH,
+                 dominance: float = GAZETTEER_DOMINANCE):
+        """
+        Initialize the gazetteer and load the dump if it exists.
+
+        Args:
+            enabled: Whether lookups are answered at all
+            path: GeoNames city dump
+            admin1_path: GeoNames first-level division names
+            countries_path: GeoNames country info
+            dominance: Population ratio a bare city name needs over its next match
+        """
+        self.enabled = enabled
+        self.dominance = dominance
+        # One entry per place: columns rather than per-row objects keep the table small
+        self._names: List[str] = []
+        self._country: List[str] = []
+        self._admin1: List[str] = []
+        self._lat = array('d')
+        self._lng = array('d')
+        self._population = array('q')
+        self._xyz = (array('d'), array('d'), array('d'))
+        # Folded name to its row, or a tuple of rows when several places share the name
+        self._index: Dict[str, Union[int, Tuple[int, ...]]] = {}
+        # Row numbers laid out as an implicit k-d tree: each range's middle splits it on one axis
+        self._tree = array('l')
+        self._countries: Dict[str, str] = {}
+        self._division_names: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'ambiguous': 0, 'misses': 0, 'reverse_lookups': 0}
+
+        if enabled and os.path.exists(path):
+            self.load(path, admin1_path, countries_path)
+
+    def load(self, path: str, admin1_path: Optional[str] = None, countries_path: Optional[str] = None) -> None:
+        """
+        Load a GeoNames city dump, replacing any places already loaded.
+
+        Args:
+            path: Tab-separated city dump (geonameid, name, asciiname, alternatenames, latitude,
+                longitude, feature class, feature code, country code, cc2, admin1 code, ..., population, ...)
+            admin1_path: Tab-separated "CC.code, name, asciiname, geonameid" file, if available
+            countries_path: GeoNames countryInfo.txt, if available
+        """
+        countries = dict(COUNTRY_ALIASES)
+        if countries_path and os.path.exists(countries_path):
+            with open(countries_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('#'):
+                        continue
+                    columns = line.rstrip('\n').split('\t')
+                    if len(columns) > 4:
+                        for alias in (columns[0], columns[1], columns[4]):
+                            countries[fold_name(alias)] = columns[0]
+
+        divisions: Dict[str, Tuple[str, ...]] = {}
+        if admin1_path and os.path.exists(admin1_path):
+            with open(admin1_path, encoding='utf-8') as f:
+                for line in f:
+                    columns = line.rstrip('\n').split('\t')
+                    if len(columns) > 2:
+                        divisions[columns[0]] = tuple({fold_name(columns[1]), fold_name(columns[2])})
+
+        names, country, admin1 = [], [], []
+        lat, lng, population = array('d'), array('d'), array('q')
+        index: Dict[str, Union[int, Tuple[int, ...]]] = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                columns = line.rstrip('\n').split('\t')
+                if len(columns) < 15 or columns[6] != 'P':
+                    continue
+                try:
+                    row_lat, row_lng = float(columns[4]), float(columns[5])
+                    row_population = int(columns[14] or 0)
+                except ValueError:
+                    continue
+                row = len(names)
+                names.append(columns[1])
+                country.append(columns[8])
+                admin1.append(columns[10])
+                lat.append(row_lat)
+                lng.append(row_lng)
+                population.append(row_population)
+                for key in {fold_name(columns[1]), fold_name(columns[2])}:
+                    if not key:
+                        continue
+                    rows = index.get(key)
+                    if rows is None:
+                        index[key] = row
+                    else:
+                        index[key] = (rows if isinstance(rows, tuple) else (rows,)) + (row,)
+
+        xyz = (array('d'), array('d'), array('d'))
+        for row in range(len(names)):
+            for axis, value in enumerate(_unit_vector(lat[row], lng[row])):
+                xyz[axis].append(value)
+        tree = array('l', range(len(names)))
+        self._build(tree, xyz, 0, len(tree), 0)
+
+        with self._lock:
+            self._names, self._country, self._admin1 = names, country, admin1
+            self._lat, self._lng, self._population, self._xyz = lat, lng, population, xyz
+            self._index, self._tree = index, tree
+            self._countries, self._division_names = countries, divisions
+        print(f"Gazetteer: loaded {len(names)} places from {path}")
+
+    def lookup(self, place: str) -> Optional[Dict[str, float]]:
+        """
+        Resolve a place written as "City", "City, Country" or "City, Division, Country".
+
+        Every part after the city must name the place's country or first-level division; a
+        bare city name resolves only when one match clearly dominates by population.
+
+        Args:
+            place: Place name as returned by the model
+
+        Returns:
+            Dictionary with 'lat' and 'lng', or None if the place is not a known city or is ambiguous
+        """
+        if not self.enabled or not self._names:
+            return None
+        parts = [part for part in (fold_name(part) for part in str(place).split(',')) if part]
+        if not parts:
+            return None
+
+        rows = self._rows(parts[0])
+        qualifiers = parts[1:]
+        matches = [row for row in rows if all(self._qualifies(row, qualifier) for qualifier in qualifiers)]
+        matches.sort(key=lambda row: self._population[row], reverse=True)
+        if not matches:
+            self._count('misses')
+            return None
+        if len(matches) > 1 and self._population[matches[0]] < self.dominance * max(self._population[matches[1]], 1):
+            # Same-named places the qualifiers cannot tell apart (e.g. "Springfield, United States")
+            self._count('ambiguous')
+            return None
+        self._count('hits')
+        return {'lat': self._lat[matches[0]], 'lng': self._lng[matches[0]]}
+
+    def nearest(self, lat: float, lng: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the populated place nearest a point.
+
+        Args:
+            lat: Latitude in decimal degrees
+            lng: Longitude in decimal degrees
+
+        Returns:
+            Tuple of (place, distance in km) where place has 'name', 'country', 'admin1', 'lat',
+            'lng' and 'population', or None if the gazetteer is empty
+        """
+        found = self._nearest_row(lat, lng)
+        if found is None:
+            return None
+        row, distance = found
+        place = {
+            'name': self._names[row], 'country': self._country[row], 'admin1': self._admin1[row],
+            'lat': self._lat[row], 'lng': self._lng[row], 'population': self._population[row]
+        }
+        return place, distance
+
+    def confirm(self, place: str, lat: Any, lng: Any, max_km: float = GAZETTEER_MATCH_KM) -> Optional[Dict[str, float]]:
+        """
+        Check reported coordinates against the gazetteer.
+
+        Args:
+            place: Place name the coordinates were reported for ("City, Division, Country")
+            lat: Reported latitude (number or text such as "32.7767° N")
+            lng: Reported longitude
+            max_km: Furthest the nearest place may be from the reported point
+
+        Returns:
+            The reported coordinates, parsed, if the gazetteer's place nearest the point bears the
+            place's name, otherwise None
+        """
+        lat, lng = parse_degrees(lat), parse_degrees(lng)
+        if lat is None or lng is None or not -90 <= lat <= 90 or not -180 <= lng <= 180:
+            return None
+        found = self._nearest_row(lat, lng)
+        if found is None:
+            return None
+        row, distance = found
+        if distance > max_km or row not in self._rows(fold_name(str(place).split(',')[0])):
+            return None
+        return {'lat': lat, 'lng': lng}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return table size and lookup counters."""
+        with self._lock:
+            counters = dict(self._counters)
+        counters['places'] = len(self._names)
+        counters['enabled'] = self.enabled
+        resolved = counters['hits'] + counters['ambiguous'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / resolved, 4) if resolved else None
+        return counters
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _rows(self, key: str) -> Tuple[int, ...]:
+        rows = self._index.get(key, ())
+        return rows if isinstance(rows, tuple) else (rows,)
+
+    def _nearest_row(self, lat: float, lng: float) -> Optional[Tuple[int, float]]:
+        """Row of the place nearest a point and its distance in km, or None if the gazetteer is empty."""
+        if not self.enabled or not self._names:
+            return None
+        self._count('reverse_lookups')
+        target = _unit_vector(lat, lng)
+        best = [-1, float('inf')]
+        self._search(target, 0, len(self._tree), 0, best)
+        row, chord_squared = best
+        return row, 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+
+    def _qualifies(self, row: int, qualifier: str) -> bool:
+        """Whether a qualifier names the row's country or first-level division."""
+        country = self._country[row]
+        if self._countries.get(qualifier) == country:
+            return True
+        if qualifier in self._division_names.get(f"{country}.{self._admin1[row]}", ()):
+            return True
+        # Postal-style division codes such as "TX"; numeric codes are not how people write places
+        return not self._admin1[row].isdigit() and qualifier == self._admin1[row].casefold()
+
+    def _build(self, tree: array, xyz: Tuple[array, array, array], lo: int, hi: int, depth: int) -> None:
+        """Arrange tree[lo:hi] so its middle entry splits the rest on axis depth % 3."""
+        if hi - lo <= 1:
+            return
+        axis = xyz[depth % 3]
+        tree[lo:hi] = array('l', sorted(tree[lo:hi], key=axis.__getitem__))
+        mid = (lo + hi) // 2
+        self._build(tree, xyz, lo, mid, depth + 1)
+        self._build(tree, xyz, mid + 1, hi, depth + 1)
+
+    def _search(self, target: Tuple[float, float, float], lo: int, hi: int, depth: int, best: List[Any]) -> None:
+        """Nearest-neighbour search of tree[lo:hi], keeping [row, squared distance] in best."""
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        row = self._tree[mid]
+        distance = sum((self._xyz[axis][row] - target[axis]) ** 2 for axis in range(3))
+        if distance < best[1]:
+            best[0], best[1] = row, distance
+
+        axis = depth % 3
+        offset = target[axis] - self._xyz[axis][row]
+        near, far = ((lo, mid), (mid + 1, hi)) if offset < 0 else ((mid + 1, hi), (lo, mid))
+        self._search(target, near[0], near[1], depth + 1, best)
+        # The other side can only hold something closer if the splitting plane is
+        if offset * offset < best[1]:
+            self._search(target, far[0], far[1], depth + 1, best)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+
+# Global instance
+gazetteer = Gazetteer()
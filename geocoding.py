@@ -0,0 +1,319 @@
+"""
+Shared geocoding service for all games.
+Well-known cities are resolved in-process from the offline gazetteer. Other places go
+through an in-memory LRU and an on-disk SQLite store in front of the Google Maps
+Geocoding API, keyed by normalized place names, with negative caching for misses.
+A guess's places can be resolved as one batch: duplicates are folded, cache hits
+are answered locally and the misses go to Google Maps concurrently, under a
+request rate limit shared by every game, with one request per place in flight.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import googlemaps
+from config import GOOGLE_MAPS_API_KEY
+from gazetteer import Gazetteer, gazetteer
+
+# SQLite file backing the geocode cache
+GEOCODE_CACHE_PATH = os.getenv('GEOCODE_CACHE_PATH', os.path.join('cache', 'geocode.sqlite3'))
+
+# Number of places kept in the in-memory LRU tier
+GEOCODE_MEMORY_ENTRIES = int(os.getenv('GEOCODE_MEMORY_ENTRIES', '10000'))
+
+# Seconds a "no result" answer is remembered before Google Maps is asked again
+GEOCODE_NEGATIVE_TTL = float(os.getenv('GEOCODE_NEGATIVE_TTL', str(7 * 24 * 3600)))
+
+# Google Maps requests in flight at once across all games
+GEOCODE_WORKERS = int(os.getenv('GEOCODE_WORKERS', '8'))
+
+# Google Maps requests started per second across all games (the API allows 50)
+GEOCODE_RATE = float(os.getenv('GEOCODE_RATE', '40'))
+
+# Placeholder values the models return instead of a real place
+EMPTY_PLACES = {'', 'n/a', 'na', 'none', 'null', 'unknown'}
+
+
+def normalize_place(place: str) -> str:
+    """
+    Normalize a place name into a cache key.
+
+    Case, Unicode form, whitespace and spacing around commas are folded so
+    "Paris,  Île-de-France, France" and "paris, île-de-france, france" share one entry.
+
+    Args:
+        place: Place name as returned by the model
+
+    Returns:
+        Normalized key, or an empty string for blank/placeholder values
+    """
+    if not place:
+        return ''
+    key = unicodedata.normalize('NFKC', str(place)).casefold()
+    key = re.sub(r'\s+', ' ', key)
+    key = re.sub(r'\s*,\s*', ', ', key).strip(' ,.')
+    return '' if key in EMPTY_PLACES else key
+
+
+class GeocodeCache:
+    """Two-tier (memory LRU, then SQLite) cache of place coordinates."""
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, memory_entries: int = GEOCODE_MEMORY_ENTRIES,
+                 negative_ttl: float = GEOCODE_NEGATIVE_TTL):
+        """
+        Initialize the cache and create the SQLite table if needed.
+
+        Args:
+            path: SQLite database file
+            memory_entries: Capacity of the in-memory LRU tier
+            negative_ttl: Seconds to remember places that have no coordinates
+        """
+        self.memory_entries = memory_entries
+        self.negative_ttl = negative_ttl
+        self._memory: "OrderedDict[str, Tuple[Optional[Dict[str, float]], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS places ('
+            'key TEXT PRIMARY KEY, lat REAL, lng REAL, found INTEGER NOT NULL, updated_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, float]], str]:
+        """
+        Look up a normalized place key.
+
+        Args:
+            key: Normalized place key
+
+        Returns:
+            Tuple of (hit, coordinates or None, tier) where tier is 'memory', 'disk' or ''
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                coords, expires_at = cached
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return True, coords, 'memory'
+                del self._memory[key]
+
+            row = self._db.execute('SELECT lat, lng, found, updated_at FROM places WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return False, None, ''
+            lat, lng, found, updated_at = row
+            coords = {'lat': lat, 'lng': lng} if found else None
+            expires_at = float('inf') if found else updated_at + self.negative_ttl
+            if expires_at <= now:
+                return False, None, ''
+            self._remember(key, coords, expires_at)
+            return True, coords, 'disk'
+
+    def put(self, key: str, coords: Optional[Dict[str, float]]) -> None:
+        """
+        Store coordinates for a key; None records a negative result.
+
+        Args:
+            key: Normalized place key
+            coords: Dictionary with 'lat' and 'lng', or None if the place has no result
+        """
+        now = time.time()
+        expires_at = float('inf') if coords else now + self.negative_ttl
+        with self._lock:
+            self._remember(key, coords, expires_at)
+            self._db.execute(
+                'INSERT OR REPLACE INTO places (key, lat, lng, found, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (key, coords['lat'] if coords else None, coords['lng'] if coords else None, 1 if coords else 0, now)
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, coords: Optional[Dict[str, float]], expires_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entries beyond capacity."""
+        self._memory[key] = (coords, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+
+class _RateLimiter:
+    """Spaces calls evenly so no more than a given number start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Wait for the next free slot; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class Geocoder:
+    """Resolves place names to coordinates from the gazetteer, then the shared cache, falling back to Google Maps."""
+
+    def __init__(self, cache: Optional[GeocodeCache] = None, max_workers: int = GEOCODE_WORKERS,
+                 rate: float = GEOCODE_RATE, places: Optional[Gazetteer] = None):
+        """
+        Initialize the Google Maps client, the cache and the upstream request pool.
+
+        Args:
+            cache: Coordinates cache; a default GeocodeCache if None
+            max_workers: Google Maps requests in flight at once
+            rate: Google Maps requests started per second
+            places: Offline gazetteer tried first; the shared gazetteer if None
+        """
+        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
+        self.cache = cache or GeocodeCache()
+        self.gazetteer = places if places is not None else gazetteer
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='geocode')
+        self._limiter = _RateLimiter(rate)
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._counters = {'gazetteer_hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'negative_hits': 0, 'upstream_calls': 0, 'upstream_errors': 0,
+                          'joined_in_flight': 0, 'batches': 0, 'batched_places': 0, 'batch_duplicates': 0}
+        self._throttled_seconds = 0.0
+
+    def get_coordinates(self, place: str) -> Optional[Dict[str, float]]:
+        """
+        Get coordinates for a place, using the cache when possible.
+
+        Args:
+            place: Place name (e.g. "Dallas, Texas, United States")
+
+        Returns:
+            Dictionary with 'lat' and 'lng', or None if the place could not be resolved
+        """
+        key = normalize_place(place)
+        if not key:
+            return None
+
+        hit, coords = self._cached(key)
+        if not hit:
+            coords = self._upstream(key, place).result()
+        return dict(coords) if coords else None
+
+    def get_coordinates_batch(self, places: List[str]) -> Dict[str, Optional[Dict[str, float]]]:
+        """
+        Get coordinates for all the places of a guess at once.
+
+        Places that normalize to the same key are looked up once, cache hits are answered
+        locally, and the misses are sent to Google Maps concurrently.
+
+        Args:
+            places: Place names, possibly repeated across a guess's lists
+
+        Returns:
+            Dictionary mapping each given place name to its coordinates, or None if it could not be resolved
+        """
+        keys = {place: normalize_place(place) if isinstance(place, str) else '' for place in places}
+        unique: Dict[str, str] = {}
+        for place, key in keys.items():
+            if key:
+                unique.setdefault(key, place)
+        with self._stats_lock:
+            self._counters['batches'] += 1
+            self._counters['batched_places'] += len(places)
+            self._counters['batch_duplicates'] += len(places) - len(unique)
+
+        resolved: Dict[str, Optional[Dict[str, float]]] = {}
+        pending: Dict[str, Future] = {}
+        for key, place in unique.items():
+            hit, coords = self._cached(key)
+            if hit:
+                resolved[key] = coords
+            else:
+                pending[key] = self._upstream(key, place)
+        for key, future in pending.items():
+            resolved[key] = future.result()
+        return {place: dict(resolved[key]) if resolved.get(key) else None for place, key in keys.items()}
+
+    def _cached(self, key: str) -> Tuple[bool, Optional[Dict[str, float]]]:
+        """Look a key up in the gazetteer, then the cache, counting the hit."""
+        coords = self.gazetteer.lookup(key)
+        if coords is not None:
+            self._count('gazetteer_hits')
+            return True, coords
+        hit, coords, tier = self.cache.get(key)
+        if hit:
+            self._count(f'{tier}_hits')
+            if coords is None:
+                self._count('negative_hits')
+        return hit, coords
+
+    def _upstream(self, key: str, place: str) -> Future:
+        """Start a Google Maps lookup, or join the one already in flight for the same key."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._count('joined_in_flight')
+                return future
+            future = self._inflight[key] = self._executor.submit(self._fetch, key, place)
+            return future
+
+    def _fetch(self, key: str, place: str) -> Optional[Dict[str, float]]:
+        try:
+            waited = self._limiter.acquire()
+            with self._stats_lock:
+                self._throttled_seconds += waited
+            self._count('upstream_calls')
+            try:
+                geocode_result = self.gmaps.geocode(place)
+            except Exception as e:
+                # Errors are not cached so a transient outage does not poison the cache
+                self._count('upstream_errors')
+                print(f"Error getting coordinates for {place}: {str(e)}")
+                return None
+
+            coords = None
+            if geocode_result:
+                location = geocode_result[0]['geometry']['location']
+                coords = {'lat': location['lat'], 'lng': location['lng']}
+            self.cache.put(key, coords)
+            return coords
+        finally:
+            # The result is cached by now, so later lookups find it there
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, the overall cache hit rate and the time spent waiting on the rate limit."""
+        with self._stats_lock:
+            counters = dict(self._counters)
+            counters['throttled_seconds'] = round(self._throttled_seconds, 3)
+        hits = counters['gazetteer_hits'] + counters['memory_hits'] + counters['disk_hits']
+        lookups = hits + counters['upstream_calls']
+        counters['lookups'] = lookups
+        counters['hit_rate'] = round(hits / lookups, 4) if lookups else None
+        counters['memory_entries'] = len(self.cache)
+        return counters
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            self._counters[counter] += 1
+
+
+# Global geocoder shared by every game
+geocoder = Geocoder()
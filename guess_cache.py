@@ -0,0 +1,194 @@
+"""
+Exact-match cache of fully enriched guesses.
+Keyed by game, normalized clue text, the sorted exclusion list and the model version, so a
+repeated clue (a demo, a classroom typing the same puzzle) is answered without a Gemini call
+or any enrichment. An in-memory LRU with a byte budget sits in front of a SQLite tier.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Set to 0 to always ask Gemini, even for a clue that was answered before
+GUESS_CACHE = os.getenv('GUESS_CACHE', '1') == '1'
+
+# Seconds a cached guess is served
+GUESS_CACHE_TTL = float(os.getenv('GUESS_CACHE_TTL', str(24 * 3600)))
+
+# Approximate bytes of guesses kept in memory; least recently used guesses beyond it live on disk only
+GUESS_CACHE_MEMORY_BYTES = int(os.getenv('GUESS_CACHE_MEMORY_BYTES', str(64 * 1024 * 1024)))
+
+# SQLite file backing the cache
+GUESS_CACHE_PATH = os.getenv('GUESS_CACHE_PATH', os.path.join('cache', 'guesses.sqlite3'))
+
+# Expired rows are purged from SQLite once every this many writes
+_PURGE_EVERY = 500
+
+
+def normalize_clue(text: str) -> str:
+    """
+    Fold case, Unicode form, punctuation and whitespace so trivially different clues match.
+
+    Args:
+        text: Clue or excluded name
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize('NFKC', str(text or '')).casefold()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class GuessCache:
+    """Two-tier (memory LRU with a byte budget, then SQLite) cache of enriched guesses."""
+
+    def __init__(self, path: str = GUESS_CACHE_PATH, ttl: float = GUESS_CACHE_TTL,
+                 memory_bytes: int = GUESS_CACHE_MEMORY_BYTES, enabled: bool = GUESS_CACHE):
+        """
+        Initialize the cache and create the SQLite table if needed.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds a guess is served
+            memory_bytes: Byte budget for the in-memory tier
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.ttl = ttl
+        self.memory_bytes = memory_bytes
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_size = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS guesses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(game: str, clue: str, excluded: Optional[Iterable[str]], model_version: str) -> str:
+        """
+        Build the cache key for a guess request.
+
+        Args:
+            game: Game name (e.g. 'movie')
+            clue: Context sent to the model
+            excluded: Names already marked incorrect
+            model_version: Model name, so a model upgrade does not serve old answers
+
+        Returns:
+            Hex digest identifying the request
+        """
+        exclusions = sorted({normalize_clue(name) for name in (excluded or []) if name})
+        material = json.dumps([game, normalize_clue(clue), exclusions, model_version])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a guess.
+
+        Args:
+            key: Key from GuessCache.key()
+
+        Returns:
+            A copy of the cached guess, or None
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, expires_at = cached
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return json.loads(value)
+                self._forget(key)
+
+            row = self._db.execute('SELECT value, expires_at FROM guesses WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self._counters['misses'] += 1
+                return None
+            self._remember(key, row[0], row[1])
+            self._counters['disk_hits'] += 1
+            return json.loads(row[0])
+
+    def contains(self, key: str) -> bool:
+        """Whether a live guess is cached under key, without counting a lookup."""
+        if not self.enabled:
+            return False
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[1] > now:
+                return True
+            row = self._db.execute('SELECT expires_at FROM guesses WHERE key = ?', (key,)).fetchone()
+            return row is not None and row[0] > now
+
+    def put(self, key: str, guess: Any) -> None:
+        """
+        Store a successfully enriched guess.
+
+        Args:
+            key: Key from GuessCache.key()
+            guess: JSON-serializable guess as returned to the player
+        """
+        if not self.enabled or not isinstance(guess, dict) or 'error' in guess:
+            return
+        value = json.dumps(guess, default=str)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._db.execute(
+                'INSERT OR REPLACE INTO guesses (key, value, expires_at) VALUES (?, ?, ?)', (key, value, expires_at)
+            )
+            self._writes += 1
+            if self._writes % _PURGE_EVERY == 0:
+                self._db.execute('DELETE FROM guesses WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+            self._counters['stores'] += 1
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        """Insert into the memory tier, evicting least recently used guesses beyond the byte budget."""
+        self._forget(key)
+        self._memory[key] = (value, expires_at)
+        self._memory_size += len(value)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _forget(self, key: str) -> None:
+        cached = self._memory.pop(key, None)
+        if cached is not None:
+            self._memory_size -= len(cached[0])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory tier usage."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['memory_entries'] = len(self._memory)
+            counters['memory_bytes'] = self._memory_size
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        counters['enabled'] = self.enabled
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 4) if lookups else None
+        return counters
+
+
+# Global instance
+guess_cache = GuessCache()
@@ -0,0 +1,101 @@
+"""
+Shared HTTP client for page scraping.
+One process-wide requests.Session with keep-alive connection pools, so repeat fetches from
+Wikipedia, CNBC, Business Insider and Macrotrends reuse an open TCP/TLS connection instead of
+paying a new handshake on every call.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Number of hosts whose connection pools are kept open at once
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '32'))
+
+# Maximum open connections to a single host; further requests wait for a free connection
+HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '16'))
+
+# Default connect and read timeouts, in seconds, for requests that do not pass their own
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+
+# Sent with every request unless overridden
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class HTTPClient:
+    """Process-wide pooled HTTP client shared by every guesser."""
+
+    def __init__(self, pool_hosts: int = HTTP_POOL_HOSTS, pool_per_host: int = HTTP_POOL_PER_HOST,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, read_timeout: float = HTTP_READ_TIMEOUT):
+        """
+        Initialize the client.
+
+        Args:
+            pool_hosts: Number of per-host connection pools kept open
+            pool_per_host: Maximum concurrent connections to one host
+            connect_timeout: Default seconds to wait for a connection
+            read_timeout: Default seconds to wait for the response
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Retry only failed connection attempts; a slow or failing page is the caller's to handle
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_per_host,
+            pool_block=True,
+            max_retries=Retry(total=1, connect=1, read=0, status=0, redirect=5, raise_on_status=False)
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Any = None, **kwargs) -> requests.Response:
+        """
+        Fetch a URL over a pooled connection.
+
+        Args:
+            url: URL to fetch
+            headers: Extra headers, merged over the defaults
+            timeout: Seconds, or a (connect, read) tuple; defaults to the client timeouts
+            **kwargs: Passed through to requests
+
+        Returns:
+            The response
+        """
+        with self._lock:
+            self._requests += 1
+        try:
+            return self.session.get(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counts and how many connections were opened to serve them."""
+        open_pools = self.adapter.poolmanager.pools
+        pools = [pool for pool in (open_pools.get(key) for key in open_pools.keys()) if pool is not None]
+        connections = sum(pool.num_connections for pool in pools)
+        with self._lock:
+            requests_made, errors = self._requests, self._errors
+        return {
+            'requests': requests_made,
+            'errors': errors,
+            'connections_opened': connections,
+            'hosts': len(pools),
+            'reuse_rate': round(1 - connections / requests_made, 3) if requests_made else 0.0
+        }
+
+
+# Global instance
+http_client = HTTPClient()
@@ -0,0 +1,324 @@
+"""
+Shared page image extractor.
+Streams a page through an incremental HTML tokenizer and stops downloading as soon as the
+infobox image (or, off Wikipedia, the first suitable image) is known, instead of fetching the
+whole article and building a BeautifulSoup tree of it. Resolved images are kept in a SQLite
+cache and revalidated with conditional GETs once they are older than a TTL.
+"""
+
+import codecs
+import os
+import sqlite3
+import threading
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from http_client import http_client
+
+# Bytes read from the response per parsing step
+IMAGE_CHUNK_BYTES = int(os.getenv('IMAGE_CHUNK_BYTES', '16384'))
+
+# SQLite file mapping page URLs to their resolved image
+IMAGE_CACHE_PATH = os.getenv('IMAGE_CACHE_PATH', os.path.join('cache', 'page_images.sqlite3'))
+
+# Seconds a resolved image is served without asking the page's server again
+IMAGE_CACHE_TTL = float(os.getenv('IMAGE_CACHE_TTL', str(24 * 3600)))
+
+# Seconds a page without an image is remembered before it is checked again
+IMAGE_NEGATIVE_TTL = float(os.getenv('IMAGE_NEGATIVE_TTL', str(6 * 3600)))
+
+# Keywords that make an unsized image a likely photo when no better match exists
+DEFAULT_IMAGE_KEYWORDS = ['photo', 'image', 'jpg', 'jpeg', 'png']
+
+
+class PageImageParser(HTMLParser):
+    """Incremental tokenizer that finds the first infobox image and the first suitable fallback image."""
+
+    def __init__(self, prefer_infobox: bool, keywords: List[str], min_size: int = 0):
+        """
+        Initialize the parser.
+
+        Args:
+            prefer_infobox: Whether the first image in the first table.infobox wins (Wikipedia pages)
+            keywords: Source substrings that qualify an image without usable size attributes
+            min_size: Minimum width and height for a sized image to qualify on its own
+        """
+        super().__init__(convert_charrefs=True)
+        self.prefer_infobox = prefer_infobox
+        self.keywords = keywords
+        self.min_size = min_size
+        self.infobox_image: Optional[str] = None
+        self.fallback_image: Optional[str] = None
+        self.done = False
+        self._infobox = 'pending'
+        self._table_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self.done:
+            return
+        if tag == 'table':
+            if self._infobox == 'pending' and 'infobox' in (dict(attrs).get('class') or '').split():
+                self._infobox = 'open'
+                self._table_depth = 1
+            elif self._infobox == 'open':
+                self._table_depth += 1
+        elif tag == 'img':
+            attributes = dict(attrs)
+            if self._infobox == 'open':
+                # Only the infobox's first image counts, as with infobox.find('img')
+                self._infobox = 'closed'
+                self.infobox_image = attributes.get('src') or None
+            if self.fallback_image is None and self._qualifies(attributes):
+                self.fallback_image = attributes['src']
+            self._update_done()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == 'table' and self._infobox == 'open':
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self._infobox = 'closed'
+                self._update_done()
+
+    def _qualifies(self, attributes: Dict[str, Optional[str]]) -> bool:
+        src = attributes.get('src')
+        if not src:
+            return False
+        width, height = attributes.get('width'), attributes.get('height')
+        if width and height:
+            try:
+                if int(width) >= self.min_size and int(height) >= self.min_size:
+                    return True
+            except ValueError:
+                return False
+        return any(keyword in src.lower() for keyword in self.keywords)
+
+    def _update_done(self) -> None:
+        if not self.prefer_infobox:
+            self.done = self.fallback_image is not None
+        elif self.infobox_image:
+            self.done = True
+        else:
+            # Without an infobox image the first fallback wins, but only once the infobox is ruled out
+            self.done = self._infobox == 'closed' and self.fallback_image is not None
+
+    @property
+    def image(self) -> Optional[str]:
+        """The chosen image source as written in the page, or None."""
+        if self.prefer_infobox and self.infobox_image:
+            return self.infobox_image
+        return self.fallback_image
+
+
+def scan_for_image(chunks: Iterable[bytes], url: str, encoding: str = 'utf-8',
+                   keywords: Optional[List[str]] = None, min_size: int = 0) -> Tuple[Optional[str], int]:
+    """
+    Parse page bytes until the image is known.
+
+    Args:
+        chunks: Page body in pieces, in order
+        url: Page URL; Wikipedia pages prefer the infobox image
+        encoding: Text encoding of the body
+        keywords: Fallback source keywords (defaults to DEFAULT_IMAGE_KEYWORDS)
+        min_size: Minimum width and height for a sized fallback image
+
+    Returns:
+        Tuple of (image source or None, bytes consumed)
+    """
+    parser = PageImageParser('wikipedia.org' in url, keywords or DEFAULT_IMAGE_KEYWORDS, min_size)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    consumed = 0
+    for chunk in chunks:
+        consumed += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break
+    else:
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+    return parser.image, consumed
+
+
+def absolute_image_url(src: str, page_url: str) -> str:
+    """Turn a protocol-relative or site-relative image source into a full URL."""
+    if src.startswith('//'):
+        return 'https:' + src
+    if src.startswith('/'):
+        return urljoin(page_url, src)
+    return src
+
+
+class PageImageCache:
+    """SQLite store of resolved page images with the HTTP validators needed to revalidate them."""
+
+    def __init__(self, path: str = IMAGE_CACHE_PATH, ttl: float = IMAGE_CACHE_TTL,
+                 negative_ttl: float = IMAGE_NEGATIVE_TTL):
+        """
+        Initialize the cache and create the SQLite table if needed.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds a found image is fresh
+            negative_ttl: Seconds a page without an image is fresh
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS page_images ('
+            'key TEXT PRIMARY KEY, image TEXT, etag TEXT, last_modified TEXT, checked_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a page.
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            Dictionary with 'image' (None for a page without one), 'etag', 'last_modified'
+            and 'fresh', or None if the page was never resolved
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT image, etag, last_modified, checked_at FROM page_images WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        image, etag, last_modified, checked_at = row
+        ttl = self.ttl if image else self.negative_ttl
+        return {'image': image, 'etag': etag, 'last_modified': last_modified, 'fresh': checked_at + ttl > time.time()}
+
+    def put(self, key: str, image: Optional[str], etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        Store a resolved page; None records a page without an image.
+
+        Args:
+            key: Cache key from cache_key()
+            image: Absolute image URL, or None
+            etag: The page's ETag header, if any
+            last_modified: The page's Last-Modified header, if any
+        """
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO page_images (key, image, etag, last_modified, checked_at) VALUES (?, ?, ?, ?, ?)',
+                (key, image, etag, last_modified, time.time())
+            )
+            self._db.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark a page as just revalidated (the server answered 304 Not Modified)."""
+        with self._lock:
+            self._db.execute('UPDATE page_images SET checked_at = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+
+    @staticmethod
+    def cache_key(url: str, keywords: List[str], min_size: int) -> str:
+        """Key a page by URL and by the game's fallback settings, which can change the chosen image."""
+        return f"{url.split('#')[0]}|{','.join(keywords)}|{min_size}"
+
+
+class ImageExtractor:
+    """Finds a page's representative image while downloading as little of it as possible."""
+
+    def __init__(self, chunk_bytes: int = IMAGE_CHUNK_BYTES, cache: Optional[PageImageCache] = None):
+        self.chunk_bytes = chunk_bytes
+        self.cache = cache or PageImageCache()
+        self._lock = threading.Lock()
+        self._pages = 0
+        self._early_stops = 0
+        self._bytes_read = 0
+        self._cache_hits = 0
+        self._not_modified = 0
+
+    def extract(self, url: str, keywords: Optional[List[str]] = None, min_size: int = 0, timeout: Any = 10) -> str:
+        """
+        Extract the best image URL from a webpage.
+
+        Args:
+            url: Page URL
+            keywords: Fallback source keywords for the game (defaults to DEFAULT_IMAGE_KEYWORDS)
+            min_size: Minimum width and height for a sized fallback image
+            timeout: Request timeout in seconds
+
+        Returns:
+            Absolute image URL, or "N/A" if none was found or the fetch failed
+        """
+        keywords = keywords or DEFAULT_IMAGE_KEYWORDS
+        key = PageImageCache.cache_key(url, keywords, min_size)
+        cached = self.cache.get(key)
+        if cached is not None and cached['fresh']:
+            self._count('_cache_hits')
+            return cached['image'] or "N/A"
+
+        # A stale entry is revalidated with a conditional GET instead of re-reading the page
+        headers = {}
+        if cached is not None:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = http_client.get(url, headers=headers, timeout=timeout, stream=True)
+            try:
+                if response.status_code == 304 and cached is not None:
+                    self.cache.touch(key)
+                    self._count('_not_modified')
+                    return cached['image'] or "N/A"
+                response.raise_for_status()
+                # Without a declared charset requests assumes Latin-1; HTML today is almost always UTF-8
+                declared = 'charset' in response.headers.get('Content-Type', '').lower()
+                encoding = response.encoding if declared and response.encoding else 'utf-8'
+                src, consumed = scan_for_image(response.iter_content(chunk_size=self.chunk_bytes),
+                                               url, encoding, keywords, min_size)
+                # Closing before the body is exhausted aborts the rest of the download
+                stopped_early = not response.raw.isclosed()
+                validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            finally:
+                response.close()
+
+            with self._lock:
+                self._pages += 1
+                self._bytes_read += consumed
+                if stopped_early:
+                    self._early_stops += 1
+
+            image = absolute_image_url(src, url) if src else None
+            self.cache.put(key, image, *validators)
+            return image or "N/A"
+
+        except Exception as e:
+            # Failures are not cached; a previously resolved image is still better than none
+            print(f"Error extracting image from {url}: {str(e)}")
+            if cached is not None and cached['image']:
+                return cached['image']
+            return "N/A"
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hits, revalidations, pages scanned, how many were abandoned early, and bytes read."""
+        with self._lock:
+            return {
+                'cache_hits': self._cache_hits,
+                'not_modified': self._not_modified,
+                'pages': self._pages,
+                'early_stops': self._early_stops,
+                'bytes_read': self._bytes_read
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+# Global instance
+image_extractor = ImageExtractor()
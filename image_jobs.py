@@ -0,0 +1,352 @@
+"""
+Deferred image generation.
+Generating an illustration is the slowest upstream call behind an event or invention guess, so
+the guess no longer waits for it: it names an image job and returns, a bounded worker pool
+generates the image, and the page polls for it while showing the Wikipedia image. A job is
+identified by the entity it illustrates, so repeated guesses, cached guesses and concurrent
+players asking for the same entity share one generation, and a job stays queued until every
+session that asked for it has left. Each player session has only a few jobs generating at once,
+and jobs asked for outside any session share one small allowance; the rest wait their turn.
+Generated images are remembered in SQLite so a job ID stored in a cached guess keeps resolving
+across restarts; a reused guess whose image is not done (the job failed, was cancelled or was
+lost in a restart) or has been evicted from the media store submits its job again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from guess_cache import normalize_clue
+from media_store import media_store
+
+# Set to 0 to generate images inline, holding each guess until its image is ready
+IMAGE_JOBS = os.getenv('IMAGE_JOBS', '1') == '1'
+
+# Images generated at once across all players
+IMAGE_JOB_WORKERS = int(os.getenv('IMAGE_JOB_WORKERS', '4'))
+
+# Jobs one player session may have generating at once; further jobs wait, newest first
+IMAGE_JOBS_PER_USER = int(os.getenv('IMAGE_JOBS_PER_USER', '2'))
+
+# Jobs generating at once for requests outside any player session; further jobs wait, newest first
+IMAGE_JOBS_BACKGROUND = int(os.getenv('IMAGE_JOBS_BACKGROUND', '1'))
+
+# Seconds a finished job is kept in memory (generated images stay resolvable from SQLite)
+IMAGE_JOB_TTL = float(os.getenv('IMAGE_JOB_TTL', '3600'))
+
+# SQLite file mapping job IDs to generated images
+IMAGE_JOB_PATH = os.getenv('IMAGE_JOB_PATH', os.path.join('cache', 'image_jobs.sqlite3'))
+
+
+def image_job_id(kind: str, name: str) -> str:
+    """
+    Identify the job that illustrates an entity.
+
+    Args:
+        kind: What is illustrated (e.g. 'event')
+        name: Entity name
+
+    Returns:
+        Stable job ID shared by every request for the same entity
+    """
+    material = json.dumps([kind, normalize_clue(name)])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def _evicted(image_url: Any) -> bool:
+    """Whether an image URL points into the media store at a file it no longer has."""
+    if not isinstance(image_url, str) or not image_url.startswith('/media/'):
+        return False
+    return media_store.lookup(image_url.rsplit('/', 1)[-1]) is None
+
+
+class ImageJobQueue:
+    """Bounded pool of image generation jobs, deduplicated by entity and capped per player session."""
+
+    def __init__(self, enabled: bool = IMAGE_JOBS, max_workers: int = IMAGE_JOB_WORKERS,
+                 per_user: int = IMAGE_JOBS_PER_USER, background: int = IMAGE_JOBS_BACKGROUND,
+                 ttl: float = IMAGE_JOB_TTL, path: str = IMAGE_JOB_PATH):
+        """
+        Initialize the queue and its SQLite table.
+
+        Args:
+            enabled: Whether guesses defer image generation to the queue
+            max_workers: Size of the generation pool
+            per_user: Jobs one owner may have queued or generating at once
+            background: Jobs without an owner that may be queued or generating at once
+            ttl: Seconds a finished job is kept in memory
+            path: SQLite database file
+        """
+        self.enabled = enabled
+        self.per_user = per_user
+        self.background = background
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-job') if enabled else None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._finished: Deque[Tuple[float, str]] = deque()
+        self._active: Dict[Any, int] = {}
+        self._waiting: Dict[Any, List[Tuple[str, Callable[[str], str]]]] = {}
+        self._lock = threading.Lock()
+        self._counters = {'submitted': 0, 'deduplicated': 0, 'from_disk': 0, 'waited': 0,
+                          'generated': 0, 'failed': 0, 'cancelled': 0}
+        self._seconds = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS image_jobs ('
+            'job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, name TEXT NOT NULL, '
+            'image_url TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def submit(self, kind: str, name: str, generate: Callable[[str], str], owner: Any = None) -> Dict[str, Any]:
+        """
+        Ask for an entity's image, joining a job for the same entity if there is one (a failed job is tried again).
+
+        Args:
+            kind: What is illustrated (e.g. 'invention')
+            name: Entity name, passed to generate
+            generate: Blocking generator returning an image URL (a placeholder URL on failure)
+            owner: Player session the image is for; None for work outside a session, which shares the background cap
+
+        Returns:
+            Job status: {'job_id', 'status', 'image_url'}; image_url is set once the job is done
+        """
+        job_id = image_job_id(kind, name)
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            # A failed job, or a done one whose image the media store has evicted, is run again
+            if job is not None and job['status'] != 'failed' and not _evicted(job['image_url']):
+                self._counters['deduplicated'] += 1
+                job['owners'].add(owner)
+                # A job stuck behind another player's cap is taken over by a requester with room
+                if job['status'] == 'waiting' and self._has_room(owner):
+                    self._unwait(job_id)
+                    self._start(job_id, generate, owner)
+                return self._view(job_id, job)
+
+            stored = self._stored(job_id)
+            if stored is not None:
+                self._counters['from_disk'] += 1
+                return self._view(job_id, stored)
+
+            owners = job['owners'] if job is not None else set()
+            job = self._jobs[job_id] = {'kind': kind, 'name': name, 'status': 'waiting', 'image_url': None,
+                                        'owners': owners | {owner}}
+            self._counters['submitted'] += 1
+            if self._has_room(owner):
+                self._start(job_id, generate, owner)
+            else:
+                self._wait(job_id, generate, owner)
+            return self._view(job_id, job)
+
+    def image(self, kind: str, name: str, generate: Callable[[str], str], owner: Any = None,
+              defer: bool = False) -> Dict[str, Any]:
+        """
+        Get an entity's image for a guess: queued as a job when enabled, otherwise generated now.
+
+        Args:
+            kind: What is illustrated (e.g. 'event')
+            name: Entity name
+            generate: Blocking generator returning an image URL
+            owner: Player session the image is for
+            defer: Only name the job, leaving resume() to submit it once the guess is served
+                (ignored when images are generated inline)
+
+        Returns:
+            {'image_url', 'image_job'}; image_url is None while a queued job is pending, image_job is None inline
+        """
+        if not self.enabled:
+            return {'image_url': generate(name), 'image_job': None}
+        if defer:
+            job = self.status(image_job_id(kind, name))
+            done = job is not None and job['status'] == 'done' and not _evicted(job['image_url'])
+            return {'image_url': job['image_url'] if done else None, 'image_job': image_job_id(kind, name)}
+        job = self.submit(kind, name, generate, owner)
+        return {'image_url': job['image_url'], 'image_job': job['job_id']}
+
+    def resume(self, kind: str, guess: Any, generate: Callable[[str], str], owner: Any = None) -> None:
+        """
+        Make sure the image job a reused guess refers to still produces its image.
+
+        Cached and solved guesses keep the job ID they were first served with; the job may have
+        failed, been cancelled or been lost in a restart since, so it is submitted again unless its
+        image is done. A done image is filled into the guess. An image the media store has evicted
+        since the guess was stored is dropped from the guess and generated again.
+
+        Args:
+            kind: What is illustrated (e.g. 'event')
+            guess: Guess about to be served again
+            generate: Blocking generator returning an image URL
+            owner: Player session the guess is served to
+        """
+        if not isinstance(guess, dict):
+            return
+        if _evicted(guess.get('image_url')):
+            guess['image_url'] = None
+            guess['image_job'] = image_job_id(kind, guess.get('name')) if self.enabled else None
+        if not self.enabled or not guess.get('image_job') or guess.get('image_url'):
+            return
+        job = self.submit(kind, guess.get('name'), generate, owner)
+        guess['image_job'] = job['job_id']
+        if job['status'] == 'done':
+            guess['image_url'] = job['image_url']
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: ID returned with a guess
+
+        Returns:
+            Job status ({'job_id', 'status', 'image_url'}), or None if the job is unknown or expired
+        """
+        with self._lock:
+            job = self._jobs.get(job_id) or self._stored(job_id)
+            return self._view(job_id, job) if job is not None else None
+
+    def cancel(self, owner: Any) -> None:
+        """
+        Withdraw an owner from its jobs still waiting for a slot; jobs already generating finish.
+
+        A waiting job another session also asked for is handed to that session; it is dropped only
+        when its last owner leaves.
+
+        Args:
+            owner: Player session that left
+        """
+        with self._lock:
+            for job_id, generate in self._waiting.pop(owner, []):
+                job = self._jobs[job_id]
+                job['owners'].discard(owner)
+                if not job['owners']:
+                    del self._jobs[job_id]
+                    self._counters['cancelled'] += 1
+                    continue
+                heir = next((other for other in job['owners'] if self._has_room(other)), next(iter(job['owners'])))
+                if self._has_room(heir):
+                    self._start(job_id, generate, heir)
+                else:
+                    self._wait(job_id, generate, heir)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return job counters, jobs by status and the time spent generating."""
+        with self._lock:
+            counters = dict(self._counters)
+            for status in ('waiting', 'queued', 'running'):
+                counters[status] = sum(1 for job in self._jobs.values() if job['status'] == status)
+            counters['seconds'] = round(self._seconds, 3)
+        finished = counters['generated'] + counters['failed']
+        counters['avg_generation_seconds'] = round(counters['seconds'] / finished, 3) if finished else None
+        counters['enabled'] = self.enabled
+        return counters
+
+    def _has_room(self, owner: Any) -> bool:
+        limit = self.per_user if owner is not None else self.background
+        return self._active.get(owner, 0) < limit
+
+    def _start(self, job_id: str, generate: Callable[[str], str], owner: Any) -> None:
+        """Hand a job to the pool; called with the lock held."""
+        job = self._jobs[job_id]
+        job['status'] = 'queued'
+        job['owner'] = owner
+        self._active[owner] = self._active.get(owner, 0) + 1
+        self._executor.submit(self._run, job_id, generate)
+
+    def _wait(self, job_id: str, generate: Callable[[str], str], owner: Any) -> None:
+        """Queue a job behind its owner's running jobs; called with the lock held."""
+        self._jobs[job_id]['owner'] = owner
+        self._waiting.setdefault(owner, []).append((job_id, generate))
+        self._counters['waited'] += 1
+
+    def _unwait(self, job_id: str) -> None:
+        """Remove a job from its owner's waiting list; called with the lock held."""
+        owner = self._jobs[job_id].get('owner')
+        waiting = [entry for entry in self._waiting.get(owner, []) if entry[0] != job_id]
+        if waiting:
+            self._waiting[owner] = waiting
+        else:
+            self._waiting.pop(owner, None)
+
+    def _run(self, job_id: str, generate: Callable[[str], str]) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'running'
+        started = time.perf_counter()
+        try:
+            image_url = generate(job['name'])
+        except Exception as e:
+            print(f"Error generating image for {job['kind']} '{job['name']}': {str(e)}")
+            image_url = None
+        elapsed = time.perf_counter() - started
+
+        # Generators report failures as placeholder URLs; only stored images are kept on disk
+        generated = isinstance(image_url, str) and image_url.startswith('/media/')
+        with self._lock:
+            self._seconds += elapsed
+            self._counters['generated' if generated else 'failed'] += 1
+            job['status'] = 'done' if generated else 'failed'
+            job['image_url'] = image_url
+            self._finished.append((time.time(), job_id))
+            if generated:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO image_jobs (job_id, kind, name, image_url, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (job_id, job['kind'], job['name'], image_url, time.time())
+                )
+                self._db.commit()
+            self._release(job.get('owner'))
+
+    def _release(self, owner: Any) -> None:
+        """Free an owner's slot and start their newest waiting job; called with the lock held."""
+        self._active[owner] -= 1
+        if not self._active[owner]:
+            del self._active[owner]
+        waiting = self._waiting.get(owner)
+        if waiting:
+            # The newest guess is the one on the player's screen
+            job_id, generate = waiting.pop()
+            if not waiting:
+                del self._waiting[owner]
+            self._start(job_id, generate, owner)
+
+    def _stored(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a generated image from SQLite; called with the lock held."""
+        row = self._db.execute('SELECT kind, name, image_url FROM image_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        kind, name, image_url = row
+        # The media store may have evicted the image since it was generated
+        if _evicted(image_url):
+            self._db.execute('DELETE FROM image_jobs WHERE job_id = ?', (job_id,))
+            self._db.commit()
+            return None
+        return {'kind': kind, 'name': name, 'status': 'done', 'image_url': image_url}
+
+    def _purge(self) -> None:
+        """Forget finished jobs older than the TTL; called with the lock held."""
+        cutoff = time.time() - self.ttl
+        while self._finished and self._finished[0][0] < cutoff:
+            _, job_id = self._finished.popleft()
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] in ('done', 'failed'):
+                del self._jobs[job_id]
+
+    @staticmethod
+    def _view(job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {'job_id': job_id, 'status': job['status'], 'image_url': job['image_url']}
+
+
+# Global instance
+image_jobs = ImageJobQueue()
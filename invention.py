@@ -1,11 +1,57 @@
 import google.generativeai as genai
 from typing import Optional, Dict, Any
 import json
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import googlemaps
-from config import GEMINI_API_KEY, GOOGLE_MAPS_API_KEY
+from urllib.parse import urlparse
+from functools import partial
+from config import GEMINI_API_KEY
+from geocoding import geocoder
+from image_extractor import image_extractor
+from sessions import SessionStore
+from candidates import candidates_instruction, next_candidate, parse_candidates, queue_candidates
+from prefetch import guess_prefetcher
+from streaming import emit
+from concurrency import EarlyTasks
+from json_stream import generate_json
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from image_jobs import image_jobs
+from enrichment import Enrich, EnrichmentGraph
+from media_store import media_store
+
+# Fields returned for a invention, shared by the guessing prompt and the known-entity lookup
+INVENTION_FIELDS = """- 'name': The invention's name
+- 'year_invented': The year the invention was invented, or null if unknown
+- 'places_invented': An array of strings with places where the invention was invented, or empty array [] if unknown
+- 'inventors': An array of strings with inventor names, or empty array [] if unknown
+- 'materials_used': An array of strings with materials used in the invention, or empty array [] if unknown
+- 'previous_inventions': An array of strings with names of previous inventions it relied on, or empty array [] if unknown
+- 'later_inventions': An array of strings with names of later inventions it enabled, or empty array [] if unknown
+- 'consumer_uses': An array of strings with consumer uses of the invention, or empty array [] if unknown
+- 'commercial_uses': An array of strings with commercial uses of the invention, or empty array [] if unknown
+- 'institutional_uses': An array of strings with institutional (government, military, education, scientific, nonprofit, etc.) uses of the invention, or empty array [] if unknown
+- 'businesses': An array of strings with names of businesses that produce this invention, or empty array [] if unknown
+- 'design_hubs': An array of strings with names of cities where the invention is or was historically designed, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
+- 'manufacturing_hubs': An array of strings with names of cities where the invention is or was historically manufactured, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
+- 'historical_events': An array of strings with names of historical events where this invention was used, or empty array [] if unknown
+- 'wikipedia_url': Wikipedia URL for this invention, or null if not found
+- 'overview': A brief overview of the invention in 50 to 75 words.
+- 'cities': An array of modern-day cities located in, at, or near the place where the invention was invented (if known, otherwise null), entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown"""
+
+# Enrichment of an invention guess: which fields feed which enrichers
+INVENTION_ENRICHMENT = [
+    # A queued image job is only submitted for the final candidate, never while it streams
+    Enrich('generated_image', 'name', 'generated_image', early=not image_jobs.enabled, timeout=None),
+    Enrich('wikipedia_image_url', 'wikipedia_url', 'wiki_image'),
+    Enrich('places_coordinates', 'places_invented', 'geocode', each=True, label='place'),
+    Enrich('cities_coordinates', 'cities', 'geocode', each=True, extra={'type': 'invention_city'}),
+    Enrich('design_hubs_coordinates', 'design_hubs', 'geocode', each=True, extra={'type': 'design_hub'}),
+    Enrich('manufacturing_hubs_coordinates', 'manufacturing_hubs', 'geocode', each=True, extra={'type': 'manufacturing_hub'}),
+    # The invention's city, or else its place of invention, stands in when none of the listed places could be placed
+    Enrich('coordinates', ('city', 'place_invented'), 'geocode', early=False,
+           fallback_for=('places_coordinates', 'cities_coordinates', 'design_hubs_coordinates', 'manufacturing_hubs_coordinates'))
+]
 
 class InventionGuesser:
     def __init__(self):
@@ -17,31 +63,48 @@ class InventionGuesser:
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
         self.image_model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-        self.current_session = None
+        self.sessions = SessionStore()
+        self.enrichment = EnrichmentGraph(INVENTION_ENRICHMENT, {
+            'generated_image': partial(image_jobs.image, 'invention', generate=self._generate_invention_image),
+            'wiki_image': self._extract_wikimedia_image,
+            'geocode': self._get_location_coordinates
+        }, batch={'geocode': geocoder.get_coordinates_batch})
     
-    def start_new_session(self, user_input: str) -> Dict[str, Any]:
+    def start_new_session(self, user_input: str, known_entity: bool = False) -> Dict[str, Any]:
         """Start a new guessing session with user input."""
-        self.current_session = {
+        session = {
             'user_input': user_input,
             'guesses': [],
-            'incorrect_names': [],  # Track names that were marked as incorrect
-            'session_id': len(str(hash(user_input + str(len(user_input)))))
+            'incorrect_names': []  # Track names that were marked as incorrect
         }
+        self.sessions.create(session)
         
         # Make the first guess
-        first_guess = self._make_guess(user_input)
-        self.current_session['guesses'].append(first_guess)
+        if known_entity:
+            # A name followed from another game's link is described directly instead of guessed
+            first_guess = entity_describer.describe('invention', user_input, ('invention', session['session_id']))
+        else:
+            # A paraphrase of a clue players already solved is answered with the confirmed entity
+            first_guess = solved_index.lookup('invention', user_input, session)
+        if first_guess is None:
+            first_guess = self._make_guess(user_input, session=session)
+        else:
+            # A reused guess may name an image job that failed or was lost since it was first served
+            image_jobs.resume('invention', first_guess, self._generate_invention_image, ('invention', session['session_id']))
+        session['guesses'].append(first_guess)
+        if not known_entity:
+            self._prefetch_next_guess(session)
+        entity_warmer.schedule('invention', session, first_guess)
         
         return {
-            'session_id': self.current_session['session_id'],
+            'session_id': session['session_id'],
             'guess': first_guess,
             'is_correct': None,
             'game_over': False
         }
     
-    def _make_guess(self, context: str, incorrect_names: list = None) -> str:
-        """Make a guess using Gemini API."""
+    def _make_guess(self, context: str, incorrect_names: list = None, session: Optional[Dict[str, Any]] = None) -> str:
+        """Make a guess, using the next queued candidate before calling the Gemini API."""
         if incorrect_names is None:
             incorrect_names = []
         
@@ -54,196 +117,151 @@ class InventionGuesser:
         Based on the following information, guess what invention the user is describing. Source information from Wikipedia and other reliable sources.
         
         Return the information as a JSON object with the following keys:
-        - 'name': The invention's name
-        - 'year_invented': The year the invention was invented, or null if unknown
-        - 'places_invented': An array of strings with places where the invention was invented, or empty array [] if unknown
-        - 'inventors': An array of strings with inventor names, or empty array [] if unknown
-        - 'materials_used': An array of strings with materials used in the invention, or empty array [] if unknown
-        - 'previous_inventions': An array of strings with names of previous inventions it relied on, or empty array [] if unknown
-        - 'later_inventions': An array of strings with names of later inventions it enabled, or empty array [] if unknown
-        - 'consumer_uses': An array of strings with consumer uses of the invention, or empty array [] if unknown
-        - 'commercial_uses': An array of strings with commercial uses of the invention, or empty array [] if unknown
-        - 'institutional_uses': An array of strings with institutional (government, military, education, scientific, nonprofit, etc.) uses of the invention, or empty array [] if unknown
-        - 'businesses': An array of strings with names of businesses that produce this invention, or empty array [] if unknown
-        - 'design_hubs': An array of strings with names of cities where the invention is or was historically designed, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
-        - 'manufacturing_hubs': An array of strings with names of cities where the invention is or was historically manufactured, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
-        - 'historical_events': An array of strings with names of historical events where this invention was used, or empty array [] if unknown
-        - 'wikipedia_url': Wikipedia URL for this invention, or null if not found
+        {INVENTION_FIELDS}
         - 'reasoning': Brief explanation of why you think this is the correct invention based on the information provided
-        - 'overview': A brief overview of the invention in 50 to 75 words.
-        - 'cities': An array of modern-day cities located in, at, or near the place where the invention was invented (if known, otherwise null), entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
         
         Information: {context}{exclusion_text}
         
-        If you're not sure, make your best guess based on the information provided and explain your reasoning.
+        If you're not sure, make your best guess based on the information provided and explain your reasoning.{candidates_instruction('inventions')}
         """
         
+        cache_key = guess_cache.key('invention', context, incorrect_names, self.model.model_name)
+        # Image jobs are capped per player session; prefetches and link lookups have none
+        image_owner = ('invention', session['session_id']) if session and 'session_id' in session else None
         try:
-            response = self.model.generate_content(prompt)
-            guess_text = response.text.strip()
-            print(f"=== GEMINI RESPONSE DEBUG ===")
-            print(f"Full response: {guess_text}")
-            print(f"Response length: {len(guess_text)}")
-            print("=== END GEMINI RESPONSE ===")
+            # The same clue with the same exclusions was already answered
+            cached = guess_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached guess: {cached.get('name', 'N/A')}")
+                image_jobs.resume('invention', cached, self._generate_invention_image, image_owner)
+                return cached
             
-            # Parse JSON response - handle markdown code blocks
-            import json
-            try:
-                # Strip markdown code blocks if present
-                cleaned_text = guess_text.strip()
-                if cleaned_text.startswith('```json'):
-                    cleaned_text = cleaned_text[7:]  # Remove ```json
-                if cleaned_text.startswith('```'):
-                    cleaned_text = cleaned_text[3:]   # Remove ```
-                if cleaned_text.endswith('```'):
-                    cleaned_text = cleaned_text[:-3]  # Remove trailing ```
-                cleaned_text = cleaned_text.strip()
-                
-                data = json.loads(cleaned_text)
-                print(f"=== JSON PARSED SUCCESSFULLY ===")
-                print(f"Name: {data.get('name', 'N/A')}")
-                print(f"Inventors: {data.get('inventors', [])}")
-                print(f"Materials: {data.get('materials_used', [])}")
-                print("=== END JSON PARSING ===")
-                
-                # Extract data from JSON
-                name = data.get('name', 'Unknown')
-                year_invented = data.get('year_invented')
-                place_invented = data.get('place_invented')
-                inventors = data.get('inventors', [])
-                materials_used = data.get('materials_used', [])
-                previous_inventions = data.get('previous_inventions', [])
-                later_inventions = data.get('later_inventions', [])
-                consumer_uses = data.get('consumer_uses', [])
-                commercial_uses = data.get('commercial_uses', [])
-                institutional_uses = data.get('institutional_uses', [])
-                businesses = data.get('businesses', [])
-                design_hubs = data.get('design_hubs', [])
-                manufacturing_hubs = data.get('manufacturing_hubs', [])
-                historical_events = data.get('historical_events', [])
-                wikipedia_url = data.get('wikipedia_url')
-                reasoning = data.get('reasoning', '')
-                overview = data.get('overview', '')
-                
-                # Convert arrays to strings for display
-                inventors_str = ', '.join(inventors) if inventors else 'N/A'
-                materials_str = ', '.join(materials_used) if materials_used else 'N/A'
-                previous_str = ', '.join(previous_inventions) if previous_inventions else 'N/A'
-                later_str = ', '.join(later_inventions) if later_inventions else 'N/A'
-                businesses_str = ', '.join(businesses) if businesses else 'N/A'
-                events_str = ', '.join(historical_events) if historical_events else 'N/A'
-                
-            except json.JSONDecodeError as e:
-                print(f"=== JSON PARSING ERROR ===")
-                print(f"Error: {e}")
-                print(f"Raw response: {guess_text}")
-                print("=== END JSON ERROR ===")
-                # Fallback to old format parsing
-                return self._parse_old_format(guess_text, context, incorrect_names)
+            # A ranked candidate left over from an earlier call needs no new Gemini request
+            queued = next_candidate(session, incorrect_names)
+            if queued is not None:
+                print(f"Using queued candidate: {queued.get('name', 'N/A')}")
+                guess = self._enrich_guess(queued, owner=image_owner)
+                guess_cache.put(cache_key, guess)
+                return guess
             
-            # Generate image using Gemini 2.5 Flash Image Preview
-            generated_image_url = self._generate_invention_image(name)
+            # Stream the response so image generation and geocodes start as soon as their fields arrive
+            early = EarlyTasks()
+            try:
+                guess_text = generate_json(self.model, prompt, partial(self._start_early_enrichment, early)).strip()
+                print(f"=== GEMINI RESPONSE DEBUG ===")
+                print(f"Full response: {guess_text}")
+                print(f"Response length: {len(guess_text)}")
+                print("=== END GEMINI RESPONSE ===")
             
-            # Get Wikipedia image if URL is available (as fallback)
-            wikipedia_image_url = "N/A"
-            if wikipedia_url and wikipedia_url.lower() != 'n/a':
-                wikipedia_image_url = self._extract_wikimedia_image(wikipedia_url)
+                # Parse JSON response - handle markdown code blocks
+                import json
+                try:
+                    # Accepts a single object or a ranked array of candidates, with or without code fences
+                    candidates = parse_candidates(guess_text)
+                    queue_candidates(session, candidates)
+                    data = candidates[0]
+                    print(f"=== JSON PARSED SUCCESSFULLY ===")
+                    print(f"Name: {data.get('name', 'N/A')}")
+                    print(f"Inventors: {data.get('inventors', [])}")
+                    print(f"Materials: {data.get('materials_used', [])}")
+                    print("=== END JSON PARSING ===")
+                except json.JSONDecodeError as e:
+                    print(f"=== JSON PARSING ERROR ===")
+                    print(f"Error: {e}")
+                    print(f"Raw response: {guess_text}")
+                    print("=== END JSON ERROR ===")
+                    # Fallback to old format parsing
+                    return self._parse_old_format(guess_text, context, incorrect_names)
             
-                # Get coordinates for all places invented
-                places_coordinates = []
-                places_invented = data.get('places_invented', [])
-                if places_invented:
-                    for place in places_invented:
-                        coords = self._get_location_coordinates(place)
-                        if coords:
-                            places_coordinates.append({
-                                'place': place,
-                                'coordinates': coords
-                            })
-                
-                # Get coordinates for all cities
-                cities_coordinates = []
-                cities = data.get('cities', [])
-                if cities:
-                    for city in cities:
-                        coords = self._get_location_coordinates(city)
-                        if coords:
-                            cities_coordinates.append({
-                                'city': city,
-                                'coordinates': coords,
-                                'type': 'invention_city'
-                            })
-                
-                # Get coordinates for design hubs
-                design_hubs_coordinates = []
-                design_hubs = data.get('design_hubs', [])
-                if design_hubs:
-                    for hub in design_hubs:
-                        coords = self._get_location_coordinates(hub)
-                        if coords:
-                            design_hubs_coordinates.append({
-                                'city': hub,
-                                'coordinates': coords,
-                                'type': 'design_hub'
-                            })
-                
-                # Get coordinates for manufacturing hubs
-                manufacturing_hubs_coordinates = []
-                manufacturing_hubs = data.get('manufacturing_hubs', [])
-                if manufacturing_hubs:
-                    for hub in manufacturing_hubs:
-                        coords = self._get_location_coordinates(hub)
-                        if coords:
-                            manufacturing_hubs_coordinates.append({
-                                'city': hub,
-                                'coordinates': coords,
-                                'type': 'manufacturing_hub'
-                            })
-                
-                # Fallback to single location if no multiple locations found
-                coordinates = None
-                city = data.get('city')
-                if not places_coordinates and not cities_coordinates and not design_hubs_coordinates and not manufacturing_hubs_coordinates:
-                    if city:
-                        coordinates = self._get_location_coordinates(city)
-                    elif place_invented:
-                        coordinates = self._get_location_coordinates(place_invented)
-            
-            # Build the final response as JSON
-            final_response = {
-                "name": name,
-                "overview": overview,
-                "year_invented": year_invented,
-                "place_invented": place_invented,
-                "places_invented": places_invented,
-                "inventors": inventors,
-                "materials_used": materials_used,
-                "previous_inventions": previous_inventions,
-                "later_inventions": later_inventions,
-                "consumer_uses": consumer_uses,
-                "commercial_uses": commercial_uses,
-                "institutional_uses": institutional_uses,
-                "businesses": businesses,
-                "design_hubs": design_hubs,
-                "manufacturing_hubs": manufacturing_hubs,
-                "historical_events": historical_events,
-                "wikipedia_url": wikipedia_url,
-                "reasoning": reasoning,
-                "image_url": generated_image_url,
-                "wikipedia_image_url": wikipedia_image_url,
-                "city": city,
-                "cities": cities,
-                "coordinates": coordinates,
-                "places_coordinates": places_coordinates,
-                "cities_coordinates": cities_coordinates,
-                "design_hubs_coordinates": design_hubs_coordinates,
-                "manufacturing_hubs_coordinates": manufacturing_hubs_coordinates
-            }
-
-            return final_response
+                guess = self._enrich_guess(data, early, image_owner)
+                guess_cache.put(cache_key, guess)
+                return guess
+            finally:
+                # Steps started for a response that falls back to the old format or fails are not needed
+                early.cancel_rest()
         except Exception as e:
             return f"Error making guess: {str(e)}"
     
+    def _start_early_enrichment(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """Start image generation, the image scrape and geocodes for the leading candidate while the rest of it streams in."""
+        self.enrichment.start_early(early, field, value)
+    
+    def _enrich_guess(self, data: Dict[str, Any], early: Optional[EarlyTasks] = None, owner: Any = None,
+                      defer_image: bool = False) -> Dict[str, Any]:
+        """Add the generated (or queued) and Wikipedia images and place coordinates to a parsed invention candidate."""
+        # Extract data from JSON
+        name = data.get('name', 'Unknown')
+        year_invented = data.get('year_invented')
+        place_invented = data.get('place_invented')
+        inventors = data.get('inventors', [])
+        materials_used = data.get('materials_used', [])
+        previous_inventions = data.get('previous_inventions', [])
+        later_inventions = data.get('later_inventions', [])
+        consumer_uses = data.get('consumer_uses', [])
+        commercial_uses = data.get('commercial_uses', [])
+        institutional_uses = data.get('institutional_uses', [])
+        businesses = data.get('businesses', [])
+        design_hubs = data.get('design_hubs', [])
+        manufacturing_hubs = data.get('manufacturing_hubs', [])
+        historical_events = data.get('historical_events', [])
+        wikipedia_url = data.get('wikipedia_url')
+        reasoning = data.get('reasoning', '')
+        overview = data.get('overview', '')
+        
+        # Convert arrays to strings for display
+        inventors_str = ', '.join(inventors) if inventors else 'N/A'
+        materials_str = ', '.join(materials_used) if materials_used else 'N/A'
+        previous_str = ', '.join(previous_inventions) if previous_inventions else 'N/A'
+        later_str = ', '.join(later_inventions) if later_inventions else 'N/A'
+        businesses_str = ', '.join(businesses) if businesses else 'N/A'
+        events_str = ', '.join(historical_events) if historical_events else 'N/A'
+        
+        # Stream the parsed guess before the slower enrichment steps
+        emit('guess', dict(data))
+        
+        # Image jobs are queued under the player session the guess is for, or only named when deferred
+        enrichment, timings = self.enrichment.run(data, early, {
+            'generated_image': partial(image_jobs.image, 'invention', generate=self._generate_invention_image, owner=owner,
+                                       defer=defer_image)
+        })
+        print(f"Enrichment timings (ms): {timings}")
+        generated_image = enrichment['generated_image'] or {}
+        
+        # Build the final response as JSON
+        final_response = {
+            "name": name,
+            "overview": overview,
+            "year_invented": year_invented,
+            "place_invented": place_invented,
+            "places_invented": data.get('places_invented', []),
+            "inventors": inventors,
+            "materials_used": materials_used,
+            "previous_inventions": previous_inventions,
+            "later_inventions": later_inventions,
+            "consumer_uses": consumer_uses,
+            "commercial_uses": commercial_uses,
+            "institutional_uses": institutional_uses,
+            "businesses": businesses,
+            "design_hubs": design_hubs,
+            "manufacturing_hubs": manufacturing_hubs,
+            "historical_events": historical_events,
+            "wikipedia_url": wikipedia_url,
+            "reasoning": reasoning,
+            "image_url": generated_image.get('image_url'),
+            "image_job": generated_image.get('image_job'),
+            "wikipedia_image_url": enrichment['wikipedia_image_url'] or "N/A",
+            "city": data.get('city'),
+            "cities": data.get('cities', []),
+            "coordinates": enrichment['coordinates'],
+            "places_coordinates": enrichment['places_coordinates'],
+            "cities_coordinates": enrichment['cities_coordinates'],
+            "design_hubs_coordinates": enrichment['design_hubs_coordinates'],
+            "manufacturing_hubs_coordinates": enrichment['manufacturing_hubs_coordinates'],
+            "enrichment_timings": timings
+        }
+
+        return final_response
+    
     def _parse_old_format(self, guess_text: str, context: str, incorrect_names: list) -> str:
         """Fallback method to parse the old text format if JSON parsing fails."""
         lines = guess_text.split('\n')
@@ -252,86 +270,11 @@ class InventionGuesser:
     
     def _extract_wikimedia_image(self, url: str) -> str:
         """Extract the best Wikimedia image URL from a given webpage URL."""
-        try:
-            # Add headers to mimic a real browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the main image (usually the first large image or infobox image)
-            image_url = None
-            
-            # For Wikipedia pages, look for infobox images first
-            if 'wikipedia.org' in url:
-                infobox = soup.find('table', class_='infobox')
-                if infobox:
-                    img = infobox.find('img')
-                    if img and img.get('src'):
-                        image_url = img.get('src')
-                        # Convert to full URL if it's a relative path
-                        if image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                        elif image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        return image_url
-            
-            # Look for the first large image in the content
-            images = soup.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Skip small images, icons, and decorative elements
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    # Check if it's a reasonable size for an invention's image
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            if w >= 100 and h >= 100:  # Minimum size threshold
-                                image_url = src
-                                break
-                        except ValueError:
-                            continue
-                    
-                    # If no size attributes, check the src for common patterns
-                    if not image_url and any(keyword in src.lower() for keyword in ['photo', 'image', 'jpg', 'jpeg', 'png', 'invention', 'device']):
-                        image_url = src
-                        break
-            
-            if image_url:
-                # Convert to full URL if it's a relative path
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    image_url = urljoin(url, image_url)
-                return image_url
-            
-            return "N/A"
-            
-        except Exception as e:
-            print(f"Error extracting image from {url}: {str(e)}")
-            return "N/A"
+        return image_extractor.extract(url, ['photo', 'image', 'jpg', 'jpeg', 'png', 'invention', 'device'], min_size=100)
     
     def _get_location_coordinates(self, location: str) -> Optional[Dict[str, float]]:
-        """Get coordinates for a location using Google Maps Geocoding API."""
-        try:
-            geocode_result = self.gmaps.geocode(location)
-            if geocode_result:
-                location_data = geocode_result[0]['geometry']['location']
-                return {
-                    'lat': location_data['lat'],
-                    'lng': location_data['lng']
-                }
-        except Exception as e:
-            print(f"Error getting coordinates for {location}: {e}")
-        
-        return None
+        """Get coordinates for a location using the shared geocode cache, falling back to Google Maps Geocoding API."""
+        return geocoder.get_coordinates(location)
     
     def _generate_invention_image(self, invention_name: str) -> str:
         """Generate an image for the invention using Gemini 2.5 Flash Image Preview."""
@@ -352,10 +295,8 @@ class InventionGuesser:
             if hasattr(response, 'parts') and response.parts:
                 for part in response.parts:
                     if hasattr(part, 'inline_data') and part.inline_data:
-                        # Convert base64 image data to data URL
-                        import base64
-                        image_data = base64.b64encode(part.inline_data.data).decode('utf-8')
-                        image_url = f"data:image/png;base64,{image_data}"
+                        # Store the image once and reference it by URL
+                        image_url = media_store.store_image_part(part)
                         return image_url
                 else:
                     # Fallback if no image data found
@@ -367,123 +308,143 @@ class InventionGuesser:
             print(f"Error generating image for invention '{invention_name}': {e}")
             return "https://via.placeholder.com/400x400/EF4444/FFFFFF?text=Image+Generation+Failed"
     
+    def _prefetch_next_guess(self, session: Dict[str, Any]) -> None:
+        """Start computing, in the background, the guess that follows if the latest invention guess is marked incorrect."""
+        last_guess = session['guesses'][-1]
+        if not isinstance(last_guess, dict) or not last_guess.get('name'):
+            return
+        incorrect_names = session['incorrect_names'] + [last_guess['name']]
+        context = f"{session['user_input']} (Previous incorrect guesses: {', '.join(incorrect_names)})"
+        guess_prefetcher.schedule(session, lambda scratch: self._make_guess(context, incorrect_names, scratch))
+    
     def submit_feedback(self, session_id: int, is_correct: bool) -> Dict[str, Any]:
         """Submit feedback for the current guess and make next guess if incorrect."""
-        try:
-            if not self.current_session or self.current_session['session_id'] != session_id:
-                return {'error': 'Invalid session'}
+        with self.sessions.locked(session_id) as session:
+            try:
+                if not session:
+                    return {'error': 'Invalid session'}
             
-            # Update the last guess with feedback
-            if self.current_session['guesses']:
-                # Get the last guess and handle feedback
-                last_guess = self.current_session['guesses'][-1]
+                # Update the last guess with feedback
+                if session['guesses']:
+                    # Get the last guess and handle feedback
+                    last_guess = session['guesses'][-1]
                 
-                # Handle different guess formats
-                if isinstance(last_guess, str):
-                    # Old text format - wrap in dictionary
-                    self.current_session['guesses'][-1] = {
-                        'guess': last_guess,
-                        'is_correct': is_correct
-                    }
-                    guess_data = last_guess
-                elif isinstance(last_guess, dict):
-                    # Check if it's already wrapped (has 'guess' key) or direct JSON object
-                    if 'guess' in last_guess:
-                        # Already wrapped format
-                        last_guess['is_correct'] = is_correct
-                        guess_data = last_guess['guess']
-                    else:
-                        # Direct JSON object - wrap it
-                        self.current_session['guesses'][-1] = {
+                    # Handle different guess formats
+                    if isinstance(last_guess, str):
+                        # Old text format - wrap in dictionary
+                        session['guesses'][-1] = {
                             'guess': last_guess,
                             'is_correct': is_correct
                         }
                         guess_data = last_guess
+                    elif isinstance(last_guess, dict):
+                        # Check if it's already wrapped (has 'guess' key) or direct JSON object
+                        if 'guess' in last_guess:
+                            # Already wrapped format
+                            last_guess['is_correct'] = is_correct
+                            guess_data = last_guess['guess']
+                        else:
+                            # Direct JSON object - wrap it
+                            session['guesses'][-1] = {
+                                'guess': last_guess,
+                                'is_correct': is_correct
+                            }
+                            guess_data = last_guess
                 
-                # If incorrect, add the name to the incorrect list
-                if not is_correct:
-                    incorrect_name = None
+                    # If incorrect, add the name to the incorrect list
+                    if not is_correct:
+                        incorrect_name = None
                     
-                    # Handle JSON object format
-                    if isinstance(guess_data, dict):
-                        incorrect_name = guess_data.get('name')
-                    # Handle text format with NAME: prefix
-                    elif isinstance(guess_data, str) and 'NAME:' in guess_data:
-                        lines = guess_data.split('\n')
-                        for line in lines:
-                            if line.startswith('NAME:'):
-                                incorrect_name = line.replace('NAME:', '').strip()
-                                break
+                        # Handle JSON object format
+                        if isinstance(guess_data, dict):
+                            incorrect_name = guess_data.get('name')
+                        # Handle text format with NAME: prefix
+                        elif isinstance(guess_data, str) and 'NAME:' in guess_data:
+                            lines = guess_data.split('\n')
+                            for line in lines:
+                                if line.startswith('NAME:'):
+                                    incorrect_name = line.replace('NAME:', '').strip()
+                                    break
                     
-                    # Add to incorrect names list if we found a name
-                    if incorrect_name and incorrect_name not in self.current_session['incorrect_names']:
-                        self.current_session['incorrect_names'].append(incorrect_name)
+                        # Add to incorrect names list if we found a name
+                        if incorrect_name and incorrect_name not in session['incorrect_names']:
+                            session['incorrect_names'].append(incorrect_name)
             
-            if is_correct:
-                # Game won!
-                return {
-                    'session_id': session_id,
-                    'guess': None,
-                    'is_correct': True,
-                    'game_over': True,
-                    'message': 'Congratulations! I guessed correctly!'
-                }
-            else:
-                # Make another guess
-                # Build context from original input and previous incorrect guesses
-                context = self.current_session['user_input']
-                incorrect_guess_names = []
-                for g in self.current_session['guesses']:
-                    if isinstance(g, dict) and g.get('is_correct') == False:
-                        guess_data = g['guess']
-                        # Extract name from guess data
-                        if isinstance(guess_data, dict):
-                            name = guess_data.get('name', 'Unknown')
-                            incorrect_guess_names.append(name)
-                        elif isinstance(guess_data, str):
-                            # Handle old text format
-                            if 'NAME:' in guess_data:
-                                lines = guess_data.split('\n')
-                                for line in lines:
-                                    if line.startswith('NAME:'):
-                                        name = line.replace('NAME:', '').strip()
-                                        incorrect_guess_names.append(name)
-                                        break
-                            else:
-                                incorrect_guess_names.append(guess_data)
-                    elif isinstance(g, str):
-                        # Handle old format where guesses were just strings
-                        incorrect_guess_names.append(g)
+                # Score a reused answer and remember newly solved clues
+                solved_index.feedback('invention', session, is_correct)
+                if is_correct:
+                    # Game won!
+                    guess_prefetcher.discard(session)
+                    return {
+                        'session_id': session_id,
+                        'guess': None,
+                        'is_correct': True,
+                        'game_over': True,
+                        'message': 'Congratulations! I guessed correctly!'
+                    }
+                else:
+                    # Make another guess
+                    # Build context from original input and previous incorrect guesses
+                    context = session['user_input']
+                    incorrect_guess_names = []
+                    for g in session['guesses']:
+                        if isinstance(g, dict) and g.get('is_correct') == False:
+                            guess_data = g['guess']
+                            # Extract name from guess data
+                            if isinstance(guess_data, dict):
+                                name = guess_data.get('name', 'Unknown')
+                                incorrect_guess_names.append(name)
+                            elif isinstance(guess_data, str):
+                                # Handle old text format
+                                if 'NAME:' in guess_data:
+                                    lines = guess_data.split('\n')
+                                    for line in lines:
+                                        if line.startswith('NAME:'):
+                                            name = line.replace('NAME:', '').strip()
+                                            incorrect_guess_names.append(name)
+                                            break
+                                else:
+                                    incorrect_guess_names.append(guess_data)
+                        elif isinstance(g, str):
+                            # Handle old format where guesses were just strings
+                            incorrect_guess_names.append(g)
                 
-                if incorrect_guess_names:
-                    context += f" (Previous incorrect guesses: {', '.join(incorrect_guess_names)})"
+                    if incorrect_guess_names:
+                        context += f" (Previous incorrect guesses: {', '.join(incorrect_guess_names)})"
                 
-                new_guess = self._make_guess(context, self.current_session['incorrect_names'])
-                self.current_session['guesses'].append(new_guess)
+                    # Reuse the guess prefetched while the player was deciding, if there is one
+                    new_guess = guess_prefetcher.take(session)
+                    if new_guess is None:
+                        new_guess = self._make_guess(context, session['incorrect_names'], session)
+                    session['guesses'].append(new_guess)
+                    self._prefetch_next_guess(session)
+                    entity_warmer.schedule('invention', session, new_guess)
                 
-                return {
-                    'session_id': session_id,
-                    'guess': new_guess,
-                    'is_correct': None,
-                    'game_over': False
-                }
-        except Exception as e:
-            print(f"Error in submit_feedback: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {'error': f'Error processing feedback: {str(e)}'}
+                    return {
+                        'session_id': session_id,
+                        'guess': new_guess,
+                        'is_correct': None,
+                        'game_over': False
+                    }
+            except Exception as e:
+                print(f"Error in submit_feedback: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                return {'error': f'Error processing feedback: {str(e)}'}
     
     def get_session_status(self, session_id: int) -> Dict[str, Any]:
         """Get the current status of a session."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {'error': 'Invalid session'}
         
         return {
             'session_id': session_id,
-            'user_input': self.current_session['user_input'],
-            'guesses': self.current_session['guesses'],
-            'total_guesses': len(self.current_session['guesses'])
+            'user_input': session['user_input'],
+            'guesses': session['guesses'],
+            'total_guesses': len(session['guesses'])
         }
 
 # Global instance
-invention_guesser = InventionGuesser()
\ No newline at end of file
+invention_guesser = InventionGuesser()
+entity_describer.register('invention', invention_guesser, 'invention', INVENTION_FIELDS, images=True)
@@ -0,0 +1,142 @@
+"""
+Incremental JSON parsing of streamed Gemini output.
+Reports each top-level field of the first JSON object the moment its value is complete,
+so enrichment for early fields (URLs, places, tickers) can start while the model is still
+writing the rest of the response.
+"""
+
+import json
+import os
+from typing import Any, Callable, List
+
+# Set to 0 to request complete responses instead of streaming them
+STREAM_GENERATION = os.getenv('STREAM_GENERATION', '1') == '1'
+
+
+class JSONFieldStream:
+    """Scans JSON text chunk by chunk and reports completed top-level fields of the first object."""
+
+    def __init__(self, on_field: Callable[[str, Any], None]):
+        """
+        Initialize the parser.
+
+        Args:
+            on_field: Called with (key, value) as soon as a top-level field is complete. For a
+                top-level array (ranked candidates) the fields of its first object are reported.
+        """
+        self.on_field = on_field
+        self._chunks: List[str] = []
+        self._buffer = ''
+        self._position = 0
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._field_depth = 1
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return ''.join(self._chunks)
+
+    def feed(self, chunk: str) -> None:
+        """
+        Consume the next chunk of model output.
+
+        Args:
+            chunk: Text as received, possibly including markdown code fences
+        """
+        self._chunks.append(chunk)
+        if self._done:
+            return
+        self._buffer += chunk
+        self._scan()
+
+    def _scan(self) -> None:
+        buffer = self._buffer
+        i = self._position
+        while i < len(buffer) and not self._done:
+            char = buffer[i]
+            if not self._started:
+                # Skip code fences and any preamble up to the first object or array
+                if char in '{[':
+                    self._started = True
+                    self._depth = 1
+                    self._field_depth = 1 if char == '{' else 2
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buffer[self._key_start:i + 1])
+                        self._key_start = None
+            elif char == '"':
+                self._in_string = True
+                if self._depth == self._field_depth and self._value_start is None:
+                    self._key_start = i
+            elif char == ':':
+                if self._depth == self._field_depth and self._key is not None and self._value_start is None:
+                    self._value_start = i + 1
+            elif char == ',':
+                if self._depth == self._field_depth:
+                    self._finish_field(buffer, i)
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == self._field_depth:
+                    self._finish_field(buffer, i)
+                self._depth -= 1
+                if self._depth < self._field_depth:
+                    # The first object is complete; later candidates are parsed from the full text
+                    self._done = True
+            i += 1
+        self._position = i
+
+    def _finish_field(self, buffer: str, end: int) -> None:
+        key, start = self._key, self._value_start
+        self._key = None
+        self._value_start = None
+        if key is None or start is None:
+            return
+        try:
+            value = json.loads(buffer[start:end])
+        except ValueError:
+            return
+        try:
+            self.on_field(key, value)
+        except Exception as e:
+            print(f"Error handling streamed field '{key}': {str(e)}")
+
+
+def generate_json(model: Any, prompt: str, on_field: Callable[[str, Any], None]) -> str:
+    """
+    Generate a JSON response, reporting top-level fields of the first object as they complete.
+
+    Args:
+        model: Gemini GenerativeModel
+        prompt: Prompt asking for a JSON object or a ranked array of objects
+        on_field: Called with (key, value) for each completed field
+
+    Returns:
+        The full response text
+    """
+    stream = JSONFieldStream(on_field)
+    if not STREAM_GENERATION:
+        stream.feed(model.generate_content(prompt).text)
+        return stream.text
+
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) carry nothing to parse
+            continue
+        stream.feed(text)
+    return stream.text
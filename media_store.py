@@ -0,0 +1,200 @@
+"""
+Content-addressed store for generated media.
+Saves image bytes once on disk under their SHA-256 hash so responses and sessions can
+carry a short /media/{hash} URL instead of an inline base64 data URL.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Directory holding stored media files
+MEDIA_DIR = os.getenv('MEDIA_DIR', os.path.join('cache', 'media'))
+
+# Maximum total size of stored media, in bytes
+MEDIA_MAX_BYTES = int(os.getenv('MEDIA_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+# File extensions for the image types the models return
+MEDIA_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+    'image/gif': '.gif'
+}
+MEDIA_TYPES = {extension: mime_type for mime_type, extension in MEDIA_EXTENSIONS.items()}
+
+MEDIA_KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+
+    A header this store cannot serve as one part (another unit, several ranges, bad syntax) is
+    ignored, so the caller answers with the whole file as if no range had been asked for.
+
+    Args:
+        range_header: Value of the Range header (e.g. "bytes=0-1023"), or None if there is none
+        size: Total size of the resource in bytes
+
+    Returns:
+        Inclusive (start, end) byte offsets, or None if the header should be ignored
+
+    Raises:
+        ValueError: If the range starts at or after the end of the resource (answered with 416)
+    """
+    match = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', range_header or '')
+    if not match:
+        return None
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+    if start == '':
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size <= 0:
+            return None
+        return max(size - length, 0), size - 1
+    first = int(start)
+    last = int(end) if end else size - 1
+    if first >= size:
+        raise ValueError(f"Range starts at byte {first} of {size}")
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
+class MediaStore:
+    """Disk-backed, size-bounded, content-addressed store of media files."""
+
+    def __init__(self, directory: str = MEDIA_DIR, max_bytes: int = MEDIA_MAX_BYTES):
+        """
+        Initialize the store and index any media already on disk.
+
+        Args:
+            directory: Directory where media files are stored
+            max_bytes: Size budget; least recently stored files are removed beyond it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._stored = 0
+        self._deduplicated = 0
+        self._evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            key, extension = os.path.splitext(name)
+            path = os.path.join(self.directory, name)
+            if MEDIA_KEY_PATTERN.fullmatch(key) and extension in MEDIA_TYPES and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, key, name, stat.st_size))
+        for _, key, name, size in sorted(files):
+            self._index[key] = (name, size)
+            self._total_bytes += size
+
+    def put(self, data: bytes, mime_type: str = 'image/png') -> str:
+        """
+        Store media bytes, reusing the existing file if the same content was stored before.
+
+        Args:
+            data: Raw media bytes
+            mime_type: MIME type reported by the model
+
+        Returns:
+            URL path of the stored media (/media/{hash})
+        """
+        key = hashlib.sha256(data).hexdigest()
+        name = key + MEDIA_EXTENSIONS.get(mime_type, '.png')
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+                self._deduplicated += 1
+                return self.url_for(key)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, os.path.join(self.directory, name))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            if key not in self._index:
+                self._index[key] = (name, len(data))
+                self._total_bytes += len(data)
+                self._stored += 1
+            self._index.move_to_end(key)
+            # Never evict the file that was just stored
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                old_key, (old_name, size) = self._index.popitem(last=False)
+                self._total_bytes -= size
+                self._evictions += 1
+                try:
+                    os.remove(os.path.join(self.directory, old_name))
+                except OSError:
+                    pass
+        return self.url_for(key)
+
+    def store_image_part(self, part: Any) -> str:
+        """
+        Store the inline image of a Gemini response part.
+
+        Args:
+            part: Response part with inline_data (data and mime_type)
+
+        Returns:
+            URL path of the stored image
+        """
+        inline_data = part.inline_data
+        return self.put(inline_data.data, getattr(inline_data, 'mime_type', None) or 'image/png')
+
+    def lookup(self, key: str) -> Optional[Tuple[str, str, int]]:
+        """
+        Find stored media by hash.
+
+        Args:
+            key: Hex SHA-256 of the media content
+
+        Returns:
+            Tuple of (file path, MIME type, size in bytes), or None if not stored
+        """
+        if not MEDIA_KEY_PATTERN.fullmatch(key or ''):
+            return None
+        with self._lock:
+            entry = self._index.get(key)
+        if entry is None:
+            return None
+        name, size = entry
+        return os.path.join(self.directory, name), MEDIA_TYPES[os.path.splitext(name)[1]], size
+
+    @staticmethod
+    def url_for(key: str) -> str:
+        """Return the URL path that serves a stored media hash."""
+        return f"/media/{key}"
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters describing the store's size and deduplication."""
+        with self._lock:
+            return {
+                'entries': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'stored': self._stored,
+                'deduplicated': self._deduplicated,
+                'evictions': self._evictions
+            }
+
+
+# Global media store instance
+media_store = MediaStore()
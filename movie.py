@@ -6,11 +6,59 @@ This game allows users to provide information about a movie and the AI tries to
 import google.generativeai as genai
 from typing import Optional, Dict, Any, List
 import json
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import googlemaps
-from config import GEMINI_API_KEY, GOOGLE_MAPS_API_KEY
+from urllib.parse import urlparse
+from functools import partial
+from config import GEMINI_API_KEY
+from geocoding import geocoder
+from image_extractor import image_extractor
+from sessions import SessionStore
+from candidates import candidates_instruction, next_candidate, parse_candidates, queue_candidates
+from prefetch import guess_prefetcher
+from streaming import emit
+from concurrency import EarlyTasks
+from json_stream import generate_json
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from enrichment import Enrich, EnrichmentGraph
+
+# Fields returned for a movie, shared by the guessing prompt and the known-entity lookup
+MOVIE_FIELDS = """- name: The movie title
+- imdb_rating: The movie's IMDB rating (if known, otherwise null)
+- rotten_tomatoes_rating: The movie's Rotten Tomatoes rating (if known, otherwise null)
+- mpaa_rating: The movie's MPAA rating (G, PG, PG-13, R, NC-17, Not Rated)
+- genre: An array of the movie's genres
+- directed_by: An array of director names
+- screenplay_by: An array of screenwriter names
+- story_by: An array of story writer names (if different from screenplay, otherwise empty array)
+- based_on: What the movie is based on (book, true story, original script, etc.)
+- produced_by: An array of producer names
+- starring: An array of main cast member names
+- cinematography: An array of cinematographer names
+- edited_by: An array of editor names
+- music_by: An array of composer names
+- production_company: An array of production company names
+- distributed_by: An array of distributor names
+- release_dates: An object with country as key and release date as value (e.g., {"United States": "2023-07-21", "United Kingdom": "2023-07-28"})
+- running_time: The movie's running time in minutes
+- country: An array of countries where the movie was produced
+- language: An array of languages the movie is in
+- budget: The movie's budget (if known, otherwise null)
+- box_office: The movie's box office gross (if known, otherwise null)
+- people: An array of real-world people who appear as characters in the movie, or empty array [] if unknown
+- cities: An array of real-world cities where the movie takes place, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
+- events: An array of real-world events where the movie takes place, or empty array [] if unknown
+- imdb_url: IMDB URL for the movie (if available, otherwise null)
+- rotten_tomatoes_url: Rotten Tomatoes URL for the movie (if available, otherwise null)
+- wikipedia_url: Wikipedia URL for the movie (if available, otherwise null)
+- overview: A concise 50-75 word overview of the movie's plot, significance, and notable features"""
+
+# Enrichment of a movie guess: which fields feed which enrichers
+MOVIE_ENRICHMENT = [
+    Enrich('image_url', 'wikipedia_url', 'wiki_image'),
+    Enrich('cities_coordinates', 'cities', 'geocode', each=True)
+]
 
 class MovieGuesser:
     def __init__(self):
@@ -21,31 +69,44 @@ class MovieGuesser:
         
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-        self.current_session = None
+        self.sessions = SessionStore()
+        self.enrichment = EnrichmentGraph(MOVIE_ENRICHMENT, {
+            'wiki_image': self._extract_image_from_url,
+            'geocode': self._get_location_coordinates
+        }, batch={'geocode': geocoder.get_coordinates_batch})
     
-    def start_new_session(self, user_input: str) -> Dict[str, Any]:
+    def start_new_session(self, user_input: str, known_entity: bool = False) -> Dict[str, Any]:
         """Start a new movie guessing session with user input."""
-        self.current_session = {
+        session = {
             'user_input': user_input,
             'guesses': [],
-            'incorrect_movies': [],  # Track movies that were marked as incorrect
-            'session_id': len(str(hash(user_input + str(len(user_input)))))
+            'incorrect_movies': []  # Track movies that were marked as incorrect
         }
+        self.sessions.create(session)
         
         # Make the first guess
-        first_guess = self._make_guess(user_input)
-        self.current_session['guesses'].append(first_guess)
+        if known_entity:
+            # A name followed from another game's link is described directly instead of guessed
+            first_guess = entity_describer.describe('movie', user_input)
+        else:
+            # A paraphrase of a clue players already solved is answered with the confirmed entity
+            first_guess = solved_index.lookup('movie', user_input, session)
+        if first_guess is None:
+            first_guess = self._make_guess(user_input, session=session)
+        session['guesses'].append(first_guess)
+        if not known_entity:
+            self._prefetch_next_guess(session)
+        entity_warmer.schedule('movie', session, first_guess)
         
         return {
-            'session_id': self.current_session['session_id'],
+            'session_id': session['session_id'],
             'guess': first_guess,
             'is_correct': None,
             'game_over': False
         }
     
-    def _make_guess(self, context: str, incorrect_movies: List[str] = None) -> Dict[str, Any]:
-        """Make a movie guess using Gemini API."""
+    def _make_guess(self, context: str, incorrect_movies: List[str] = None, session: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a movie guess, using the next queued candidate before calling the Gemini API."""
         if incorrect_movies is None:
             incorrect_movies = []
         
@@ -59,80 +120,45 @@ class MovieGuesser:
 {context}{exclusion_text}
 
 Please respond with a JSON object containing the following fields:
-- name: The movie title
-- imdb_rating: The movie's IMDB rating (if known, otherwise null)
-- rotten_tomatoes_rating: The movie's Rotten Tomatoes rating (if known, otherwise null)
-- mpaa_rating: The movie's MPAA rating (G, PG, PG-13, R, NC-17, Not Rated)
-- genre: An array of the movie's genres
-- directed_by: An array of director names
-- screenplay_by: An array of screenwriter names
-- story_by: An array of story writer names (if different from screenplay, otherwise empty array)
-- based_on: What the movie is based on (book, true story, original script, etc.)
-- produced_by: An array of producer names
-- starring: An array of main cast member names
-- cinematography: An array of cinematographer names
-- edited_by: An array of editor names
-- music_by: An array of composer names
-- production_company: An array of production company names
-- distributed_by: An array of distributor names
-- release_dates: An object with country as key and release date as value (e.g., {{"United States": "2023-07-21", "United Kingdom": "2023-07-28"}})
-- running_time: The movie's running time in minutes
-- country: An array of countries where the movie was produced
-- language: An array of languages the movie is in
-- budget: The movie's budget (if known, otherwise null)
-- box_office: The movie's box office gross (if known, otherwise null)
-- people: An array of real-world people who appear as characters in the movie, or empty array [] if unknown
-- cities: An array of real-world cities where the movie takes place, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
-- events: An array of real-world events where the movie takes place, or empty array [] if unknown
-- imdb_url: IMDB URL for the movie (if available, otherwise null)
-- rotten_tomatoes_url: Rotten Tomatoes URL for the movie (if available, otherwise null)
-- wikipedia_url: Wikipedia URL for the movie (if available, otherwise null)
+{MOVIE_FIELDS}
 - reasoning: Your reasoning for why you think this is the correct movie
-- overview: A concise 50-75 word overview of the movie's plot, significance, and notable features
 
-Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object."""
+Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object.{candidates_instruction('movies')}"""
 
+        cache_key = guess_cache.key('movie', context, incorrect_movies, self.model.model_name)
         try:
-            response = self.model.generate_content(prompt)
+            # The same clue with the same exclusions was already answered
+            cached = guess_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached guess: {cached.get('name', 'N/A')}")
+                return cached
             
-            if not response.text:
-                raise ValueError("No response from Gemini API")
+            # A ranked candidate left over from an earlier call needs no new Gemini request
+            queued = next_candidate(session, incorrect_movies)
+            if queued is not None:
+                print(f"Using queued candidate: {queued.get('name', 'N/A')}")
+                guess = self._enrich_guess(queued)
+                guess_cache.put(cache_key, guess)
+                return guess
             
-            # Try to parse the JSON response
+            # Stream the response so the image scrape and geocodes start as soon as their fields arrive
+            early = EarlyTasks()
             try:
-                movie_data = json.loads(response.text.strip())
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, try to extract JSON from the response
-                text = response.text.strip()
-                if text.startswith('```json'):
-                    text = text[7:]
-                if text.endswith('```'):
-                    text = text[:-3]
-                movie_data = json.loads(text.strip())
-            
-            # If we have a Wikipedia URL, try to extract an image
-            if movie_data.get('wikipedia_url'):
-                image_url = self._extract_image_from_url(movie_data['wikipedia_url'])
-                movie_data['image_url'] = image_url if image_url != "N/A" else None
-            else:
-                movie_data['image_url'] = None
+                response_text = generate_json(self.model, prompt, partial(self._start_early_enrichment, early))
             
-            # Get coordinates for all cities
-            cities_coordinates = []
-            cities = movie_data.get('cities', [])
-            if cities:
-                for city in cities:
-                    coords = self._get_location_coordinates(city)
-                    if coords:
-                        cities_coordinates.append({
-                            'city': city,
-                            'coordinates': coords
-                        })
+                if not response_text:
+                    raise ValueError("No response from Gemini API")
             
-            movie_data['cities_coordinates'] = cities_coordinates
-            
-            return movie_data
+                # Parse the JSON response (a single object or a ranked array of candidates)
+                candidates = parse_candidates(response_text)
+                queue_candidates(session, candidates)
             
+                guess = self._enrich_guess(candidates[0], early)
+                guess_cache.put(cache_key, guess)
+                return guess
+            finally:
+                # Steps started for a response that falls back to the old format or fails are not needed
+                early.cancel_rest()
         except Exception as e:
             return {
                 'error': f'Failed to generate movie guess: {str(e)}',
@@ -140,132 +166,93 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
                 'reasoning': 'Unable to process the request due to an error.'
             }
     
+    def _start_early_enrichment(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """Start the image scrape and city geocodes for the leading candidate while the rest of it streams in."""
+        self.enrichment.start_early(early, field, value)
+    
+    def _enrich_guess(self, movie_data: Dict[str, Any], early: Optional[EarlyTasks] = None) -> Dict[str, Any]:
+        """Add the Wikipedia image and city coordinates to a parsed movie candidate."""
+        # Stream the parsed guess before the slower enrichment steps
+        emit('guess', dict(movie_data))
+        
+        enrichment, timings = self.enrichment.run(movie_data, early)
+        print(f"Enrichment timings (ms): {timings}")
+        movie_data.update(enrichment)
+        movie_data['enrichment_timings'] = timings
+        
+        return movie_data
+    
+    def _prefetch_next_guess(self, session: Dict[str, Any]) -> None:
+        """Start computing, in the background, the guess that follows if the latest movie guess is marked incorrect."""
+        last_guess = session['guesses'][-1]
+        if not isinstance(last_guess, dict) or not last_guess.get('name'):
+            return
+        user_input = session['user_input']
+        incorrect_movies = session['incorrect_movies'] + [last_guess['name']]
+        guess_prefetcher.schedule(session, lambda scratch: self._make_guess(user_input, incorrect_movies, scratch))
+    
     def submit_feedback(self, session_id: int, is_correct: bool) -> Dict[str, Any]:
         """Submit feedback for a guess and get the next guess if incorrect."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {"error": "Session not found"}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {"error": "Session not found"}
         
-        if is_correct:
-            # Game is over, user confirmed the guess was correct
-            return {
-                'session_id': session_id,
-                'game_over': True,
-                'message': 'Congratulations! The movie was guessed correctly.'
-            }
-        else:
-            # Add the incorrect movie to the list and make another guess
-            last_guess = self.current_session['guesses'][-1]
-            if isinstance(last_guess, dict) and 'name' in last_guess:
-                self.current_session['incorrect_movies'].append(last_guess['name'])
+            # Score a reused answer and remember newly solved clues
+            solved_index.feedback('movie', session, is_correct)
+            if is_correct:
+                # Game is over, user confirmed the guess was correct
+                guess_prefetcher.discard(session)
+                return {
+                    'session_id': session_id,
+                    'game_over': True,
+                    'message': 'Congratulations! The movie was guessed correctly.'
+                }
+            else:
+                # Add the incorrect movie to the list and make another guess
+                last_guess = session['guesses'][-1]
+                if isinstance(last_guess, dict) and 'name' in last_guess:
+                    session['incorrect_movies'].append(last_guess['name'])
             
-            # Make another guess with the updated context
-            new_guess = self._make_guess(
-                self.current_session['user_input'], 
-                self.current_session['incorrect_movies']
-            )
-            self.current_session['guesses'].append(new_guess)
+                # Make another guess, reusing the one prefetched while the player was deciding
+                new_guess = guess_prefetcher.take(session)
+                if new_guess is None:
+                    new_guess = self._make_guess(
+                        session['user_input'], 
+                        session['incorrect_movies'],
+                        session
+                    )
+                session['guesses'].append(new_guess)
+                self._prefetch_next_guess(session)
+                entity_warmer.schedule('movie', session, new_guess)
             
-            return {
-                'session_id': session_id,
-                'guess': new_guess,
-                'game_over': False,
-                'incorrect_movies': self.current_session['incorrect_movies']
-            }
+                return {
+                    'session_id': session_id,
+                    'guess': new_guess,
+                    'game_over': False,
+                    'incorrect_movies': session['incorrect_movies']
+                }
     
     def get_session_status(self, session_id: int) -> Dict[str, Any]:
         """Get session information."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {"error": "Session not found"}
         
         return {
             'session_id': session_id,
-            'user_input': self.current_session['user_input'],
-            'guesses': self.current_session['guesses'],
-            'incorrect_movies': self.current_session['incorrect_movies']
+            'user_input': session['user_input'],
+            'guesses': session['guesses'],
+            'incorrect_movies': session['incorrect_movies']
         }
     
     def _extract_image_from_url(self, url: str) -> str:
         """Extract the best image URL from a given webpage URL."""
-        try:
-            # Add headers to mimic a real browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the main image (usually the first large image or infobox image)
-            image_url = None
-            
-            # For Wikipedia pages, look for infobox images first
-            if 'wikipedia.org' in url:
-                infobox = soup.find('table', class_='infobox')
-                if infobox:
-                    img = infobox.find('img')
-                    if img and img.get('src'):
-                        image_url = img.get('src')
-                        # Convert to full URL if it's a relative path
-                        if image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                        elif image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        return image_url
-            
-            # Look for the first large image in the content
-            images = soup.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Skip small images, icons, and decorative elements
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    # Accept any image with size attributes as potentially valid
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            # Remove pixel limits - accept any reasonably sized image
-                            image_url = src
-                            break
-                        except ValueError:
-                            continue
-                    
-                    # If no size attributes, check the src for common patterns
-                    if not image_url and any(keyword in src.lower() for keyword in ['poster', 'movie', 'film', 'image', 'jpg', 'jpeg', 'png']):
-                        image_url = src
-                        break
-            
-            if image_url:
-                # Convert to full URL if it's a relative path
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    image_url = urljoin(url, image_url)
-                return image_url
-            
-            return "N/A"
-            
-        except Exception as e:
-            print(f"Error extracting image from {url}: {str(e)}")
-            return "N/A"
+        return image_extractor.extract(url, ['poster', 'movie', 'film', 'image', 'jpg', 'jpeg', 'png'])
     
     def _get_location_coordinates(self, location: str) -> Optional[Dict[str, float]]:
-        """Get coordinates for a location using Google Maps Geocoding API."""
-        try:
-            geocode_result = self.gmaps.geocode(location)
-            if geocode_result:
-                location_data = geocode_result[0]['geometry']['location']
-                return {
-                    'lat': location_data['lat'],
-                    'lng': location_data['lng']
-                }
-        except Exception as e:
-            print(f"Error getting coordinates for {location}: {e}")
-        
-        return None
+        """Get coordinates for a location using the shared geocode cache, falling back to Google Maps Geocoding API."""
+        return geocoder.get_coordinates(location)
 
 # Create a global instance
-movie_guesser = MovieGuesser()
\ No newline at end of file
+movie_guesser = MovieGuesser()
+entity_describer.register('movie', movie_guesser, 'movie', MOVIE_FIELDS)
@@ -4,6 +4,9 @@ import json
 import random
 import os
 from config import GEMINI_API_KEY
+from sessions import SessionStore
+from media_store import media_store
+from odd_pool import odd_situation_pool
 
 class OddSituationGame:
     def __init__(self):
@@ -13,7 +16,7 @@ class OddSituationGame:
         
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        self.current_session = None
+        self.sessions = SessionStore()
         
         # Load data files
         self.people = self._load_file('people.txt')
@@ -31,126 +34,159 @@ class OddSituationGame:
     
     def start_new_game(self) -> Dict[str, Any]:
         """Start a new odd situation game."""
-        # Select random elements
-        person = random.choice(self.people) if self.people else "Albert Einstein"
-        outfit = random.choice(self.outfits) if self.outfits else "space suit"
-        setting = random.choice(self.settings) if self.settings else "on the moon"
-        
-        # Generate image prompt
-        image_prompt = f"A famous person {person} wearing {outfit} {setting}. The image should be clear and recognizable, showing the person in this unusual situation."
-        
-        try:
-            # Generate image using Gemini 2.5 Flash Image Preview
-            response = self.model.generate_content([
-                image_prompt,
-                "Generate a high-quality, realistic image of this scenario. Make sure the person is clearly recognizable and the situation is visually interesting."
-            ])
-            
-            # Extract image URL from response
-            if hasattr(response, 'parts') and response.parts:
-                for part in response.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        # Convert base64 image data to data URL
-                        import base64
-                        image_data = base64.b64encode(part.inline_data.data).decode('utf-8')
-                        image_url = f"data:image/png;base64,{image_data}"
-                        break
-                else:
-                    # Fallback if no image data found
-                    image_url = "https://via.placeholder.com/400x400/4F46E5/FFFFFF?text=No+Image+Generated"
-            else:
-                image_url = "https://via.placeholder.com/400x400/4F46E5/FFFFFF?text=No+Image+Generated"
-            
-        except Exception as e:
-            print(f"Error generating image: {e}")
-            image_url = "https://via.placeholder.com/400x400/EF4444/FFFFFF?text=Image+Generation+Failed"
+        # A situation pre-generated in the background starts the game without waiting for the image model
+        situation = odd_situation_pool.pop()
+        if situation is None:
+            situation = self._create_situation()
         
         # Create session
-        session_id = random.randint(1000, 9999)
-        self.current_session = {
-            'session_id': session_id,
-            'person': person,
-            'outfit': outfit,
-            'setting': setting,
-            'image_url': image_url,
+        session = {
+            'person': situation['person'],
+            'outfit': situation['outfit'],
+            'setting': situation['setting'],
+            'image_url': situation['image_url'],
             'guesses': [],
             'correct': False,
             'revealed': False
         }
+        session_id = self.sessions.create(session)
         
         return {
             'session_id': session_id,
-            'image_url': image_url,
+            'image_url': situation['image_url'],
             'game_over': False
         }
     
+    def _pick_situation(self) -> Dict[str, str]:
+        """Select a random person, outfit and setting."""
+        return {
+            'person': random.choice(self.people) if self.people else "Albert Einstein",
+            'outfit': random.choice(self.outfits) if self.outfits else "space suit",
+            'setting': random.choice(self.settings) if self.settings else "on the moon"
+        }
+    
+    def _create_situation(self) -> Dict[str, str]:
+        """Pick and illustrate a situation now, using a placeholder image if generation fails."""
+        situation = self._pick_situation()
+        try:
+            image_url = self._generate_image(situation['person'], situation['outfit'], situation['setting'])
+            if image_url is None:
+                # Fallback if no image data found
+                image_url = "https://via.placeholder.com/400x400/4F46E5/FFFFFF?text=No+Image+Generated"
+        except Exception as e:
+            print(f"Error generating image: {e}")
+            image_url = "https://via.placeholder.com/400x400/EF4444/FFFFFF?text=Image+Generation+Failed"
+        situation['image_url'] = image_url
+        return situation
+    
+    def _produce_situation(self) -> Optional[Dict[str, str]]:
+        """Pick and illustrate a situation for the pool; None if no image was generated."""
+        situation = self._pick_situation()
+        image_url = self._generate_image(situation['person'], situation['outfit'], situation['setting'])
+        if image_url is None:
+            return None
+        situation['image_url'] = image_url
+        return situation
+    
+    def _generate_image(self, person: str, outfit: str, setting: str) -> Optional[str]:
+        """
+        Generate and store the image of a situation.
+        
+        Args:
+            person: Famous person
+            outfit: What they are wearing
+            setting: Where they are
+        
+        Returns:
+            URL of the stored image, or None if the model returned no image
+        """
+        # Generate image prompt
+        image_prompt = f"A famous person {person} wearing {outfit} {setting}. The image should be clear and recognizable, showing the person in this unusual situation."
+        
+        # Generate image using Gemini 2.5 Flash Image Preview
+        response = self.model.generate_content([
+            image_prompt,
+            "Generate a high-quality, realistic image of this scenario. Make sure the person is clearly recognizable and the situation is visually interesting."
+        ])
+        
+        # Extract image URL from response
+        if hasattr(response, 'parts') and response.parts:
+            for part in response.parts:
+                if hasattr(part, 'inline_data') and part.inline_data:
+                    # Store the image once and reference it by URL
+                    return media_store.store_image_part(part)
+        return None
+    
     def submit_guess(self, session_id: int, guess: str) -> Dict[str, Any]:
         """Submit a guess for the current game."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {'error': 'Invalid session ID'}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {'error': 'Invalid session ID'}
         
-        guess = guess.strip().lower()
-        correct_person = self.current_session['person'].lower()
+            guess = guess.strip().lower()
+            correct_person = session['person'].lower()
         
-        # Check if guess is correct (allowing for partial matches)
-        is_correct = (guess in correct_person or correct_person in guess or 
-                     any(word in correct_person for word in guess.split() if len(word) > 2))
+            # Check if guess is correct (allowing for partial matches)
+            is_correct = (guess in correct_person or correct_person in guess or 
+                         any(word in correct_person for word in guess.split() if len(word) > 2))
         
-        # Add guess to history
-        self.current_session['guesses'].append({
-            'guess': guess,
-            'correct': is_correct,
-            'timestamp': json.dumps({'timestamp': 'now'})  # Simplified timestamp
-        })
+            # Add guess to history
+            session['guesses'].append({
+                'guess': guess,
+                'correct': is_correct,
+                'timestamp': json.dumps({'timestamp': 'now'})  # Simplified timestamp
+            })
+        
+            if is_correct:
+                session['correct'] = True
+                # For correct answers, also reveal the outfit and setting
+                return {
+                    'session_id': session_id,
+                    'correct': is_correct,
+                    'game_over': is_correct,
+                    'total_guesses': len(session['guesses']),
+                    'correct_person': session['person'],
+                    'outfit': session['outfit'],
+                    'setting': session['setting'],
+                    'full_situation': f"{session['person']} wearing {session['outfit']} {session['setting']}"
+                }
         
-        if is_correct:
-            self.current_session['correct'] = True
-            # For correct answers, also reveal the outfit and setting
             return {
                 'session_id': session_id,
                 'correct': is_correct,
                 'game_over': is_correct,
-                'total_guesses': len(self.current_session['guesses']),
-                'correct_person': self.current_session['person'],
-                'outfit': self.current_session['outfit'],
-                'setting': self.current_session['setting'],
-                'full_situation': f"{self.current_session['person']} wearing {self.current_session['outfit']} {self.current_session['setting']}"
+                'total_guesses': len(session['guesses'])
             }
-        
-        return {
-            'session_id': session_id,
-            'correct': is_correct,
-            'game_over': is_correct,
-            'total_guesses': len(self.current_session['guesses'])
-        }
     
     def reveal_answer(self, session_id: int) -> Dict[str, Any]:
         """Reveal the correct answer."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {'error': 'Invalid session ID'}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {'error': 'Invalid session ID'}
         
-        self.current_session['revealed'] = True
+            session['revealed'] = True
         
-        return {
-            'session_id': session_id,
-            'correct_person': self.current_session['person'],
-            'outfit': self.current_session['outfit'],
-            'setting': self.current_session['setting'],
-            'full_situation': f"{self.current_session['person']} wearing {self.current_session['outfit']} {self.current_session['setting']}",
-            'revealed': True
-        }
+            return {
+                'session_id': session_id,
+                'correct_person': session['person'],
+                'outfit': session['outfit'],
+                'setting': session['setting'],
+                'full_situation': f"{session['person']} wearing {session['outfit']} {session['setting']}",
+                'revealed': True
+            }
     
     def get_session_status(self, session_id: int) -> Dict[str, Any]:
         """Get the current status of a session."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {'error': 'Invalid session ID'}
         
         return {
             'session_id': session_id,
-            'guesses': self.current_session['guesses'],
-            'correct': self.current_session['correct'],
-            'revealed': self.current_session['revealed'],
-            'can_reveal': len(self.current_session['guesses']) > 0 and not self.current_session['correct']
+            'guesses': session['guesses'],
+            'correct': session['correct'],
+            'revealed': session['revealed'],
+            'can_reveal': len(session['guesses']) > 0 and not session['correct']
         }
 
 # Create global instance
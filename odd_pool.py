@@ -0,0 +1,190 @@
+"""
+Pool of pre-generated Odd Situation games.
+Generating a situation's image is the slowest step of starting a game, and the situations are
+drawn from a finite set (people x outfits x settings), so a few are generated ahead of time by
+background producers. A new game takes a ready situation from the pool; the producers refill it.
+The pool lives only in SQLite (images live in the media store), so it survives restarts and every
+worker process shares it: a situation is claimed with a single transaction, so it is served once.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from media_store import media_store
+
+# Ready situations kept in the pool; 0 disables pre-generation
+ODD_POOL_SIZE = int(os.getenv('ODD_POOL_SIZE', '8'))
+
+# Background threads generating situations at once
+ODD_POOL_WORKERS = int(os.getenv('ODD_POOL_WORKERS', '2'))
+
+# Seconds a producer waits after a failed generation before trying again
+ODD_POOL_RETRY_DELAY = float(os.getenv('ODD_POOL_RETRY_DELAY', '30'))
+
+# SQLite file holding the pool across restarts
+ODD_POOL_PATH = os.getenv('ODD_POOL_PATH', os.path.join('cache', 'odd_pool.sqlite3'))
+
+# Window, in seconds, over which the refill rate is reported
+_RATE_WINDOW = 600
+
+# Seconds an idle producer sleeps before rechecking a pool other processes may have drained
+_RECHECK_INTERVAL = 5
+
+
+class OddSituationPool:
+    """Bounded on-disk pool of ready (person, outfit, setting, image) situations with background refill."""
+
+    def __init__(self, size: int = ODD_POOL_SIZE, workers: int = ODD_POOL_WORKERS,
+                 retry_delay: float = ODD_POOL_RETRY_DELAY, path: str = ODD_POOL_PATH):
+        """
+        Initialize the pool; situations left from a previous run stay in SQLite and are served first.
+
+        Args:
+            size: Maximum number of ready situations
+            workers: Number of producer threads
+            retry_delay: Seconds a producer backs off after a failure
+            path: SQLite database file
+        """
+        self.size = size
+        self.workers = workers
+        self.retry_delay = retry_delay
+        self._producing = 0
+        self._started = False
+        self._produced_at: Deque[float] = deque()
+        self._generation_seconds = 0.0
+        self._condition = threading.Condition()
+        self._counters = {'served': 0, 'empty': 0, 'produced': 0, 'failed': 0, 'stale': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit, so pop() can open its own write transaction
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS odd_pool ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, person TEXT NOT NULL, outfit TEXT NOT NULL, '
+            'setting TEXT NOT NULL, image_url TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+
+    def start(self, produce: Callable[[], Optional[Dict[str, Any]]]) -> None:
+        """
+        Start the producer threads; called once the app starts serving, not on import.
+
+        Args:
+            produce: Generates one situation ({'person', 'outfit', 'setting', 'image_url'}), or returns
+                None if its image could not be generated
+        """
+        if self.size <= 0 or self._started:
+            return
+        self._started = True
+        for number in range(self.workers):
+            threading.Thread(target=self._produce_forever, args=(produce,), name=f'odd-pool-{number}', daemon=True).start()
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """
+        Take a ready situation.
+
+        Returns:
+            Situation dictionary, or None if the pool is empty and the caller must generate one now
+        """
+        with self._condition:
+            while True:
+                situation = self._claim()
+                if situation is None:
+                    break
+                self._condition.notify()
+                # The media store may have evicted the image since it was generated
+                key = situation['image_url'].rsplit('/', 1)[-1]
+                if situation['image_url'].startswith('/media/') and media_store.lookup(key) is None:
+                    self._counters['stale'] += 1
+                    continue
+                self._counters['served'] += 1
+                return situation
+            if self.size > 0:
+                self._counters['empty'] += 1
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool depth, refill rate and serve/miss counters."""
+        now = time.time()
+        with self._condition:
+            counters = dict(self._counters)
+            while self._produced_at and self._produced_at[0] < now - _RATE_WINDOW:
+                self._produced_at.popleft()
+            counters['depth'] = self._depth()
+            counters['capacity'] = self.size
+            counters['producing'] = self._producing
+            counters['refill_per_minute'] = round(len(self._produced_at) * 60 / _RATE_WINDOW, 3)
+            attempts = counters['produced'] + counters['failed']
+            counters['avg_generation_seconds'] = round(self._generation_seconds / attempts, 3) if attempts else None
+        requests = counters['served'] + counters['empty']
+        counters['hit_rate'] = round(counters['served'] / requests, 4) if requests else None
+        return counters
+
+    def _produce_forever(self, produce: Callable[[], Optional[Dict[str, Any]]]) -> None:
+        while True:
+            with self._condition:
+                # Situations being generated count toward the pool so producers never overshoot it
+                # (by more than what other processes sharing the file are generating at that moment)
+                while self._depth() + self._producing >= self.size:
+                    self._condition.wait(_RECHECK_INTERVAL)
+                self._producing += 1
+
+            started = time.perf_counter()
+            try:
+                situation = produce()
+            except Exception as e:
+                print(f"Error pre-generating odd situation: {str(e)}")
+                situation = None
+            elapsed = time.perf_counter() - started
+
+            with self._condition:
+                self._producing -= 1
+                self._generation_seconds += elapsed
+                if situation is not None:
+                    self._add(situation)
+            if situation is None:
+                with self._condition:
+                    self._counters['failed'] += 1
+                    self._condition.notify()
+                time.sleep(self.retry_delay)
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest situation out of SQLite in one transaction; called with the condition held."""
+        # BEGIN IMMEDIATE takes the write lock first, so two processes never claim the same row
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            row = self._db.execute('SELECT id, person, outfit, setting, image_url FROM odd_pool ORDER BY id LIMIT 1').fetchone()
+            if row is not None:
+                self._db.execute('DELETE FROM odd_pool WHERE id = ?', (row[0],))
+            self._db.execute('COMMIT')
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        _, person, outfit, setting, image_url = row
+        return {'person': person, 'outfit': outfit, 'setting': setting, 'image_url': image_url}
+
+    def _depth(self) -> int:
+        """Ready situations across every process sharing the file; called with the condition held."""
+        return self._db.execute('SELECT COUNT(*) FROM odd_pool').fetchone()[0]
+
+    def _add(self, situation: Dict[str, Any]) -> None:
+        """Store a produced situation; called with the condition held."""
+        now = time.time()
+        self._db.execute(
+            'INSERT INTO odd_pool (person, outfit, setting, image_url, created_at) VALUES (?, ?, ?, ?, ?)',
+            (situation['person'], situation['outfit'], situation['setting'], situation['image_url'], now)
+        )
+        self._produced_at.append(now)
+        self._counters['produced'] += 1
+
+
+# Global instance
+odd_situation_pool = OddSituationPool()
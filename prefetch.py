@@ -0,0 +1,143 @@
+"""
+Speculative prefetch of the next guess.
+While the player reads a guess, the guess that would follow an "incorrect" answer is computed
+and enriched in the background, so the feedback request can return it immediately.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Set to 1 to compute the next guess in the background while the player decides
+SPECULATIVE_PREFETCH = os.getenv('SPECULATIVE_PREFETCH', '0') == '1'
+
+# Maximum number of speculative guesses computed at once, kept apart from the request pools
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '8'))
+
+# Seconds an "incorrect" request waits for a prefetch that is still running
+PREFETCH_WAIT = float(os.getenv('PREFETCH_WAIT', '30'))
+
+
+class GuessPrefetcher:
+    """Runs speculative next guesses and accounts for how many of them are used or wasted."""
+
+    def __init__(self, enabled: bool = SPECULATIVE_PREFETCH, max_workers: int = PREFETCH_WORKERS,
+                 wait_seconds: float = PREFETCH_WAIT):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            enabled: Whether speculative guesses are computed at all
+            max_workers: Size of the background pool
+            wait_seconds: How long a feedback request waits for an unfinished prefetch
+        """
+        self.enabled = enabled
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch') if enabled else None
+        self._lock = threading.Lock()
+        self._counters = {'scheduled': 0, 'hits': 0, 'misses': 0, 'discarded': 0, 'failed': 0}
+        self._wasted_seconds = 0.0
+
+    def schedule(self, session: Dict[str, Any], compute: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Start computing the guess that follows the session's latest guess.
+
+        The computation gets a scratch copy of the session's candidate queue instead of the
+        session itself, so it never races the request thread; take() adopts the scratch queue. The
+        scratch keeps the session ID so work it starts (e.g. image jobs) is owned by the session.
+
+        Args:
+            session: Session dictionary; the pending prefetch is stored under '_prefetch'
+            compute: Callable taking the scratch session and returning the next guess
+        """
+        if not self.enabled:
+            return
+        self.discard(session)
+        scratch = {'candidates': list(session.get('candidates') or []), 'session_id': session.get('session_id')}
+        state = {'guess_number': len(session['guesses']), 'scratch': scratch, 'elapsed': 0.0}
+        state['future'] = self._executor.submit(self._run, compute, state)
+        session['_prefetch'] = state
+        self._count('scheduled')
+
+    def take(self, session: Dict[str, Any]) -> Optional[Any]:
+        """
+        Use the prefetched guess after the latest guess was marked incorrect.
+
+        Args:
+            session: Session dictionary
+
+        Returns:
+            The prefetched guess, or None if there is none and the guess must be computed now
+        """
+        state = session.pop('_prefetch', None)
+        if state is None:
+            if self.enabled:
+                self._count('misses')
+            return None
+        if state['guess_number'] != len(session['guesses']):
+            # The prefetch assumed a different guess was being rejected
+            self._waste(state)
+            self._count('misses')
+            return None
+        try:
+            guess = state['future'].result(timeout=self.wait_seconds)
+        except Exception as e:
+            print(f"Prefetched guess unavailable: {str(e)}")
+            if not state['future'].done():
+                self._waste(state)
+            self._count('failed')
+            self._count('misses')
+            return None
+        session['candidates'] = state['scratch'].get('candidates') or []
+        self._count('hits')
+        return guess
+
+    def discard(self, session: Dict[str, Any]) -> None:
+        """
+        Drop the session's pending prefetch, e.g. because the guess was marked correct.
+
+        Args:
+            session: Session dictionary
+        """
+        state = session.pop('_prefetch', None)
+        if state is not None:
+            self._waste(state)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate and the upstream time spent on guesses nobody used."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['wasted_seconds'] = round(self._wasted_seconds, 3)
+        used = counters['hits'] + counters['misses']
+        counters['enabled'] = self.enabled
+        counters['hit_rate'] = round(counters['hits'] / used, 4) if used else None
+        return counters
+
+    def _run(self, compute: Callable[[Dict[str, Any]], Any], state: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return compute(state['scratch'])
+        finally:
+            state['elapsed'] = time.perf_counter() - started
+
+    def _waste(self, state: Dict[str, Any]) -> None:
+        """Account for a prefetch that will never be shown; unstarted work is simply cancelled."""
+        future: Future = state['future']
+        self._count('discarded')
+        if future.cancel():
+            return
+
+        def record(_: Future) -> None:
+            with self._lock:
+                self._wasted_seconds += state['elapsed']
+        future.add_done_callback(record)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+
+# Global prefetcher shared by every guesser
+guess_prefetcher = GuessPrefetcher()
@@ -0,0 +1,187 @@
+"""
+Session registry shared by all games.
+Holds many concurrent game sessions per guesser with O(1) lookup by ID,
+a lock per session, sliding TTL expiry and an LRU cap on the number of sessions.
+"""
+
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Idle time, in seconds, after which a session is discarded
+SESSION_TTL = float(os.getenv('SESSION_TTL', '3600'))
+
+# Maximum number of live sessions per game; the least recently used are evicted first
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', '20000'))
+
+# Session ID layout: [shard: 8 bits][random: 45 bits]. 53 bits total keeps IDs exact as JavaScript numbers.
+SHARD_BITS = 8
+RANDOM_BITS = 45
+
+# Shard key of this worker; give every worker (or shared-store partition) its own value
+SESSION_SHARD = int(os.getenv('SESSION_SHARD', '0'))
+
+
+def new_session_id(shard: int = SESSION_SHARD) -> int:
+    """
+    Generate a random session ID that carries its owning shard.
+
+    Args:
+        shard: Shard key between 0 and 255
+
+    Returns:
+        Positive integer session ID
+    """
+    if not 0 <= shard < (1 << SHARD_BITS):
+        raise ValueError(f"Session shard must be between 0 and {(1 << SHARD_BITS) - 1}, got {shard}")
+    return (shard << RANDOM_BITS) | secrets.randbits(RANDOM_BITS) or 1
+
+
+def shard_of(session_id: int) -> int:
+    """
+    Read the shard key out of a session ID so a router can forward it without a lookup.
+
+    Args:
+        session_id: Session identifier produced by new_session_id
+
+    Returns:
+        Shard key of the worker or partition that owns the session
+    """
+    return (session_id >> RANDOM_BITS) & ((1 << SHARD_BITS) - 1)
+
+
+class _SessionEntry:
+    """A stored session together with its lock and expiry time."""
+
+    __slots__ = ('session', 'lock', 'expires_at')
+
+    def __init__(self, session: Dict[str, Any], expires_at: float):
+        self.session = session
+        self.lock = threading.RLock()
+        self.expires_at = expires_at
+
+
+class SessionStore:
+    """Thread-safe, memory-bounded store of game sessions keyed by session ID."""
+
+    def __init__(self, ttl_seconds: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS, shard: int = SESSION_SHARD):
+        """
+        Initialize the session store.
+
+        Args:
+            ttl_seconds: Idle time after which a session expires
+            max_sessions: Maximum number of sessions kept before LRU eviction
+            shard: Shard key encoded into every session ID this store issues
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.shard = shard
+        self._entries: "OrderedDict[int, _SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._expired = 0
+        self._evicted = 0
+
+    def create(self, session: Dict[str, Any]) -> int:
+        """
+        Register a new session and assign it an ID.
+
+        Args:
+            session: Session state dictionary; its 'session_id' key is set here
+
+        Returns:
+            The new session ID
+        """
+        now = time.monotonic()
+        with self._lock:
+            session_id = new_session_id(self.shard)
+            while session_id in self._entries:
+                session_id = new_session_id(self.shard)
+            session['session_id'] = session_id
+            self._entries[session_id] = _SessionEntry(session, now + self.ttl_seconds)
+            self._created += 1
+            self._purge_expired(now)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self._evicted += 1
+        return session_id
+
+    def get(self, session_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a live session and refresh its TTL and LRU position.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The session dictionary, or None if unknown or expired
+        """
+        entry = self._touch(session_id)
+        return entry.session if entry else None
+
+    @contextmanager
+    def locked(self, session_id: int) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Hold a session's lock while it is read and updated.
+
+        Args:
+            session_id: Session identifier
+
+        Yields:
+            The session dictionary, or None if unknown or expired
+        """
+        entry = self._touch(session_id)
+        if entry is None:
+            yield None
+            return
+        with entry.lock:
+            yield entry.session
+
+    def remove(self, session_id: int) -> None:
+        """Drop a session if it exists."""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters describing the store's size and churn."""
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return {
+                'shard': self.shard,
+                'active': len(self._entries),
+                'capacity': self.max_sessions,
+                'created': self._created,
+                'expired': self._expired,
+                'evicted': self._evicted
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, session_id: int) -> Optional[_SessionEntry]:
+        """Fetch an entry, expiring it if stale or otherwise marking it recently used."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                del self._entries[session_id]
+                self._expired += 1
+                return None
+            entry.expires_at = now + self.ttl_seconds
+            self._entries.move_to_end(session_id)
+            return entry
+
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired sessions; they sit at the LRU end because the TTL slides on every access."""
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[session_id]
+            self._expired += 1
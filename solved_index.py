@@ -0,0 +1,244 @@
+"""
+Similarity index over solved sessions.
+When a player confirms a guess, their clue and the confirmed, fully enriched guess are added to a
+per-game TF-IDF index (word unigrams and bigrams). A new clue that is a close paraphrase of a
+solved one is answered with that guess instead of a Gemini call.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from guess_cache import normalize_clue
+
+# Set to 0 to always ask Gemini for a new session's first guess
+SOLVED_INDEX = os.getenv('SOLVED_INDEX', '1') == '1'
+
+# Cosine similarity (0-1) a new clue needs with a solved clue to reuse its answer
+SOLVED_MATCH_THRESHOLD = float(os.getenv('SOLVED_MATCH_THRESHOLD', '0.85'))
+
+# Solved clues kept per game; the oldest are dropped beyond this
+SOLVED_INDEX_MAX = int(os.getenv('SOLVED_INDEX_MAX', '50000'))
+
+# SQLite file that keeps solved clues across restarts
+SOLVED_INDEX_PATH = os.getenv('SOLVED_INDEX_PATH', os.path.join('cache', 'solved.sqlite3'))
+
+# Number of best partial matches whose full cosine is computed
+_SHORTLIST = 5
+
+
+def clue_terms(text: str) -> Counter:
+    """
+    Split a clue into weighted terms.
+
+    Args:
+        text: Clue as typed by the player
+
+    Returns:
+        Counter of word unigrams and bigrams
+    """
+    words = normalize_clue(text).split()
+    terms = Counter(words)
+    terms.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return terms
+
+
+class _GameIndex:
+    """TF-IDF inverted index of one game's solved clues."""
+
+    def __init__(self):
+        # Oldest solved first, so the index can shed its oldest answer without a scan
+        self.docs: "OrderedDict[int, Tuple[Counter, str, str]]" = OrderedDict()
+        self.postings: Dict[str, Set[int]] = {}
+        self.by_clue: Dict[str, int] = {}
+
+    def idf(self, term: str) -> float:
+        return math.log((len(self.docs) + 1) / (len(self.postings.get(term, ())) + 1)) + 1
+
+    def add(self, doc_id: int, clue: str, guess: str) -> None:
+        normalized = normalize_clue(clue)
+        previous = self.by_clue.get(normalized)
+        if previous is not None:
+            self.remove(previous)
+        terms = clue_terms(clue)
+        self.docs[doc_id] = (terms, guess, normalized)
+        self.by_clue[normalized] = doc_id
+        for term in terms:
+            self.postings.setdefault(term, set()).add(doc_id)
+
+    def remove(self, doc_id: int) -> None:
+        self._unlink(doc_id, self.docs.pop(doc_id))
+
+    def remove_oldest(self) -> int:
+        doc_id, doc = self.docs.popitem(last=False)
+        self._unlink(doc_id, doc)
+        return doc_id
+
+    def _unlink(self, doc_id: int, doc: Tuple[Counter, str, str]) -> None:
+        terms, _, normalized = doc
+        if self.by_clue.get(normalized) == doc_id:
+            del self.by_clue[normalized]
+        for term in terms:
+            ids = self.postings.get(term)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self.postings[term]
+
+    def best_match(self, clue: str) -> Tuple[Optional[int], float]:
+        """Return the solved clue most similar to this one and its cosine similarity."""
+        query = clue_terms(clue)
+        if not query or not self.docs:
+            return None, 0.0
+        query_weights = {term: count * self.idf(term) for term, count in query.items()}
+        query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values()))
+
+        # Accumulate dot products through the postings of the query's terms only
+        dots: Dict[int, float] = {}
+        for term, query_weight in query_weights.items():
+            idf = self.idf(term)
+            for doc_id in self.postings.get(term, ()):
+                dots[doc_id] = dots.get(doc_id, 0.0) + query_weight * self.docs[doc_id][0][term] * idf
+
+        best_id, best_score = None, 0.0
+        for doc_id, dot in sorted(dots.items(), key=lambda item: item[1], reverse=True)[:_SHORTLIST]:
+            terms = self.docs[doc_id][0]
+            doc_norm = math.sqrt(sum((count * self.idf(term)) ** 2 for term, count in terms.items()))
+            score = dot / (query_norm * doc_norm) if doc_norm else 0.0
+            if score > best_score:
+                best_id, best_score = doc_id, score
+        return best_id, best_score
+
+
+class SolvedIndex:
+    """Per-game similarity index of confirmed answers, persisted in SQLite."""
+
+    def __init__(self, path: str = SOLVED_INDEX_PATH, threshold: float = SOLVED_MATCH_THRESHOLD,
+                 max_entries: int = SOLVED_INDEX_MAX, enabled: bool = SOLVED_INDEX):
+        """
+        Initialize the index and load previously solved clues.
+
+        Args:
+            path: SQLite database file
+            threshold: Minimum cosine similarity for a match
+            max_entries: Solved clues kept per game
+            enabled: When False lookups always miss (solved clues are still recorded)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._games: Dict[str, _GameIndex] = {}
+        self._lock = threading.Lock()
+        self._counters = {'lookups': 0, 'hits': 0, 'confirmed': 0, 'rejected': 0, 'recorded': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS solved ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, game TEXT NOT NULL, clue TEXT NOT NULL, '
+            'guess TEXT NOT NULL, solved_at REAL NOT NULL)'
+        )
+        self._db.commit()
+        for doc_id, game, clue, guess in self._db.execute('SELECT id, game, clue, guess FROM solved ORDER BY id').fetchall():
+            self._add(doc_id, game, clue, guess)
+        self._db.commit()
+
+    def lookup(self, game: str, clue: str, session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Answer a new session's clue from a closely matching solved session.
+
+        Args:
+            game: Game name (e.g. 'person')
+            clue: The new session's input
+            session: The new session; a match is noted in it so the player's feedback can be scored
+
+        Returns:
+            A copy of the confirmed guess, or None if no solved clue is similar enough
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._counters['lookups'] += 1
+            index = self._games.get(game)
+            if index is None:
+                return None
+            doc_id, score = index.best_match(clue)
+            if doc_id is None or score < self.threshold:
+                return None
+            self._counters['hits'] += 1
+            guess = index.docs[doc_id][1]
+        print(f"Answering from solved session (similarity {score:.2f})")
+        session['_solved_match'] = round(score, 4)
+        return json.loads(guess)
+
+    def feedback(self, game: str, session: Dict[str, Any], is_correct: bool) -> None:
+        """
+        Score a reused answer and add newly solved clues to the index.
+
+        Args:
+            game: Game name
+            session: Session receiving feedback on its latest guess
+            is_correct: Whether the player confirmed the guess
+        """
+        if session.pop('_solved_match', None) is not None:
+            with self._lock:
+                self._counters['confirmed' if is_correct else 'rejected'] += 1
+        if is_correct:
+            self.record(game, session.get('user_input', ''), session['guesses'][-1] if session.get('guesses') else None)
+
+    def record(self, game: str, clue: str, guess: Any) -> None:
+        """
+        Add a confirmed answer to the index.
+
+        Args:
+            game: Game name
+            clue: The input the player started the session with
+            guess: The confirmed guess (a wrapped {'guess': ..., 'is_correct': ...} entry is unwrapped)
+        """
+        if isinstance(guess, dict) and isinstance(guess.get('guess'), dict):
+            guess = guess['guess']
+        if not clue or not isinstance(guess, dict) or not guess.get('name') or 'error' in guess:
+            return
+        value = json.dumps(guess, default=str)
+        with self._lock:
+            cursor = self._db.execute(
+                'INSERT INTO solved (game, clue, guess, solved_at) VALUES (?, ?, ?, ?)', (game, clue, value, time.time())
+            )
+            self._add(cursor.lastrowid, game, clue, value)
+            self._db.commit()
+            self._counters['recorded'] += 1
+
+    def _add(self, doc_id: int, game: str, clue: str, guess: str) -> None:
+        index = self._games.setdefault(game, _GameIndex())
+        # A clue solved again replaces its earlier answer
+        previous = index.by_clue.get(normalize_clue(clue))
+        index.add(doc_id, clue, guess)
+        if previous is not None:
+            self._db.execute('DELETE FROM solved WHERE id = ?', (previous,))
+        while len(index.docs) > self.max_entries:
+            oldest = index.remove_oldest()
+            self._db.execute('DELETE FROM solved WHERE id = ?', (oldest,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate, accuracy of reused answers, and index sizes."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['solved'] = {game: len(index.docs) for game, index in self._games.items()}
+        judged = counters['confirmed'] + counters['rejected']
+        counters['enabled'] = self.enabled
+        counters['threshold'] = self.threshold
+        counters['hit_rate'] = round(counters['hits'] / counters['lookups'], 4) if counters['lookups'] else None
+        counters['accuracy'] = round(counters['confirmed'] / judged, 4) if judged else None
+        return counters
+
+
+# Global instance
+solved_index = SolvedIndex()
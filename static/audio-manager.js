@@ -159,7 +159,7 @@ class AudioManager {
     async requestTTS(text, voice = null, prompt = "Say the following in a natural way") {
         try {
             // Check cache first
-            const cacheKey = `${voice || this.defaultVoice}_${text.slice(0, 50)}`;
+            const cacheKey = `${voice || this.defaultVoice}_${prompt}_${text}`;
             const cachedAudio = this.getCachedAudio(cacheKey);
             if (cachedAudio) {
                 console.log('Using cached audio');
@@ -1,6 +1,7 @@
 class BusinessGame {
     constructor() {
         this.currentSessionId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -110,7 +111,7 @@ class BusinessGame {
         }
     }
 
-    async startNewGame() {
+    async startNewGame(knownEntity = false) {
         const inputText = this.userInput.value.trim();
         
         if (!inputText) {
@@ -125,13 +126,19 @@ class BusinessGame {
         this.showLoading();
 
         try {
-            const response = await fetch('/api/start-business-guess', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ text: inputText }),
-            });
+            let response;
+            if (knownEntity) {
+                // A name followed from another game's link is looked up directly rather than guessed
+                response = await fetch(`/api/business/entity/${encodeURIComponent(inputText)}`);
+            } else {
+                response = await fetch('/api/start-business-guess', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ text: inputText }),
+                });
+            }
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
@@ -580,7 +587,16 @@ class BusinessGame {
         this.hideLoading();
     }
 
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'business', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     resetGame() {
+        this.leaveSession();
         this.currentSessionId = null;
         this.userInput.value = '';
         this.hideAllSections();
@@ -703,7 +719,7 @@ class BusinessGame {
                 this.userInput.value = businessFromPerson;
                 // Automatically start the search after a short delay to ensure everything is loaded
                 setTimeout(() => {
-                    this.startNewGame();
+                    this.startNewGame(true);
                 }, 500);
             }
         } else {
@@ -718,7 +734,7 @@ class BusinessGame {
                     this.userInput.value = businessFromInvention;
                     // Automatically start the search after a short delay to ensure everything is loaded
                     setTimeout(() => {
-                        this.startNewGame();
+                        this.startNewGame(true);
                     }, 500);
                 }
             } else {
@@ -733,7 +749,7 @@ class BusinessGame {
                         this.userInput.value = businessFromCity;
                         // Automatically start the search after a short delay to ensure everything is loaded
                         setTimeout(() => {
-                            this.startNewGame();
+                            this.startNewGame(true);
                         }, 500);
                     }
                 } else {
@@ -750,7 +766,7 @@ class BusinessGame {
                             this.userInput.value = businessFromMovie;
                             // Automatically start the search after a short delay to ensure everything is loaded
                             setTimeout(() => {
-                                this.startNewGame();
+                                this.startNewGame(true);
                             }, 500);
                         }
                     } else if (businessFromTVShow) {
@@ -761,7 +777,7 @@ class BusinessGame {
                             this.userInput.value = businessFromTVShow;
                             // Automatically start the search after a short delay to ensure everything is loaded
                             setTimeout(() => {
-                                this.startNewGame();
+                                this.startNewGame(true);
                             }, 500);
                         }
                     } else {
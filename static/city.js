@@ -1,6 +1,7 @@
 class CityGame {
     constructor() {
         this.currentSessionId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -92,7 +93,7 @@ class CityGame {
         }
     }
 
-    async startNewGame() {
+    async startNewGame(knownEntity = false) {
         const inputText = this.userInput.value.trim();
         
         if (!inputText) {
@@ -107,13 +108,19 @@ class CityGame {
         this.hideAllSections();
 
         try {
-            const response = await fetch('/api/start-city-guess', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ text: inputText })
-            });
+            let response;
+            if (knownEntity) {
+                // A name followed from another game's link is looked up directly rather than guessed
+                response = await fetch(`/api/city/entity/${encodeURIComponent(inputText)}`);
+            } else {
+                response = await fetch('/api/start-city-guess', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ text: inputText })
+                });
+            }
 
             if (!response.ok) {
                 const errorData = await response.json();
@@ -522,7 +529,16 @@ class CityGame {
         this.errorSection.classList.add('hidden');
     }
 
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'city', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     resetGame() {
+        this.leaveSession();
         this.currentSessionId = null;
         this.userInput.value = '';
         this.hideAllSections();
@@ -533,6 +549,7 @@ class CityGame {
     // Allow starting a new game even during an active session
     startNewGameFromButton() {
         // Reset current session and start fresh
+        this.leaveSession();
         this.currentSessionId = null;
         this.startNewGame();
     }
@@ -549,7 +566,7 @@ class CityGame {
                 this.userInput.value = cityFromPerson;
                 // Automatically start the search after a short delay to ensure everything is loaded
                 setTimeout(() => {
-                    this.startNewGame();
+                    this.startNewGame(true);
                 }, 500);
             }
         } else {
@@ -564,7 +581,7 @@ class CityGame {
                     this.userInput.value = cityFromInvention;
                     // Automatically start the search after a short delay to ensure everything is loaded
                     setTimeout(() => {
-                        this.startNewGame();
+                        this.startNewGame(true);
                     }, 500);
                 }
             } else {
@@ -579,7 +596,7 @@ class CityGame {
                         this.userInput.value = cityFromEvent;
                         // Automatically start the search after a short delay to ensure everything is loaded
                         setTimeout(() => {
-                            this.startNewGame();
+                            this.startNewGame(true);
                         }, 500);
                     }
                 } else {
@@ -594,7 +611,7 @@ class CityGame {
                             this.userInput.value = cityFromBusiness;
                             // Automatically start the search after a short delay to ensure everything is loaded
                             setTimeout(() => {
-                                this.startNewGame();
+                                this.startNewGame(true);
                             }, 500);
                         }
                     } else {
@@ -611,7 +628,7 @@ class CityGame {
                                 this.userInput.value = cityFromMovie;
                                 // Automatically start the search after a short delay to ensure everything is loaded
                                 setTimeout(() => {
-                                    this.startNewGame();
+                                    this.startNewGame(true);
                                 }, 500);
                             }
                         } else if (cityFromTVShow) {
@@ -622,7 +639,7 @@ class CityGame {
                                 this.userInput.value = cityFromTVShow;
                                 // Automatically start the search after a short delay to ensure everything is loaded
                                 setTimeout(() => {
-                                    this.startNewGame();
+                                    this.startNewGame(true);
                                 }, 500);
                             }
                         } else {
@@ -1,6 +1,8 @@
 class EventGame {
     constructor() {
         this.currentSessionId = null;
+        this.imageJobId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -79,7 +81,7 @@ class EventGame {
         }
     }
     
-    async startNewSession() {
+    async startNewSession(knownEntity = false) {
         const userInput = this.userInput.value.trim();
         if (!userInput) {
             alert('Please enter some information about the event!');
@@ -93,13 +95,19 @@ class EventGame {
         this.showLoading();
         
         try {
-            const response = await fetch('/api/start-event-guess', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ text: userInput }),
-            });
+            let response;
+            if (knownEntity) {
+                // A name followed from another game's link is looked up directly rather than guessed
+                response = await fetch(`/api/event/entity/${encodeURIComponent(userInput)}`);
+            } else {
+                response = await fetch('/api/start-event-guess', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ text: userInput }),
+                });
+            }
             
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
@@ -186,8 +194,14 @@ class EventGame {
         const reasoning = data.reasoning || '';
         const overview = data.overview || '';
         
-        // Display the generated image
-        this.displayEventImage(generatedImageUrl, name);
+        // Display the generated image, or the Wikipedia image until a queued one is ready
+        this.imageJobId = null;
+        if (data.image_job && !generatedImageUrl) {
+            this.displayEventImage(wikipediaImageUrl, name);
+            this.pollImageJob(data.image_job, name);
+        } else {
+            this.displayEventImage(generatedImageUrl, name);
+        }
         
         // Build event information
         let eventInfo = '';
@@ -306,6 +320,28 @@ class EventGame {
         }
     }
     
+    async pollImageJob(jobId, eventName) {
+        // Wait for a queued image; a newer guess or a new game stops the polling
+        this.imageJobId = jobId;
+        for (let attempt = 0; attempt < 60; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 2000));
+            if (this.imageJobId !== jobId) return;
+            try {
+                const response = await fetch(`/api/image-jobs/${encodeURIComponent(jobId)}`);
+                if (!response.ok) return;
+                const job = await response.json();
+                if (this.imageJobId !== jobId) return;
+                if (job.status === 'done') {
+                    this.displayEventImage(job.image_url, eventName);
+                }
+                if (job.status === 'done' || job.status === 'failed') return;
+            } catch (error) {
+                console.error('Error polling image job:', error);
+                return;
+            }
+        }
+    }
+
     displayEventImage(imageUrl, eventName) {
         if (imageUrl && imageUrl !== null && imageUrl.toLowerCase() !== 'n/a' && 
             !imageUrl.includes('placeholder.com') && !imageUrl.includes('Parse+Error')) {
@@ -550,12 +586,22 @@ class EventGame {
         this.errorSection.classList.add('hidden');
     }
     
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'event', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     startNewGame() {
         this.hideAllSections();
         this.hideLoading();
         this.userInput.focus();
         this.userInput.value = '';
+        this.leaveSession();
         this.currentSessionId = null;
+        this.imageJobId = null;
         // Hide the event image container
         if (this.eventImageContainer) {
             this.eventImageContainer.style.display = 'none';
@@ -574,7 +620,7 @@ class EventGame {
                 this.userInput.value = eventFromPerson;
                 // Automatically start the search after a short delay to ensure everything is loaded
                 setTimeout(() => {
-                    this.startNewSession();
+                    this.startNewSession(true);
                 }, 500);
             }
         } else {
@@ -589,7 +635,7 @@ class EventGame {
                     this.userInput.value = eventFromInvention;
                     // Automatically start the search after a short delay to ensure everything is loaded
                     setTimeout(() => {
-                        this.startNewSession();
+                        this.startNewSession(true);
                     }, 500);
                 }
             } else {
@@ -604,7 +650,7 @@ class EventGame {
                         this.userInput.value = eventFromCity;
                         // Automatically start the search after a short delay to ensure everything is loaded
                         setTimeout(() => {
-                            this.startNewSession();
+                            this.startNewSession(true);
                         }, 500);
                     }
                 } else {
@@ -621,7 +667,7 @@ class EventGame {
                             this.userInput.value = eventFromMovie;
                             // Automatically start the search after a short delay to ensure everything is loaded
                             setTimeout(() => {
-                                this.startNewSession();
+                                this.startNewSession(true);
                             }, 500);
                         }
                     } else if (eventFromTVShow) {
@@ -632,7 +678,7 @@ class EventGame {
                             this.userInput.value = eventFromTVShow;
                             // Automatically start the search after a short delay to ensure everything is loaded
                             setTimeout(() => {
-                                this.startNewSession();
+                                this.startNewSession(true);
                             }, 500);
                         }
                     } else {
@@ -1,6 +1,8 @@
 class InventionGame {
     constructor() {
         this.currentSessionId = null;
+        this.imageJobId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -78,7 +80,7 @@ class InventionGame {
         }
     }
 
-    async startNewGameFromButton() {
+    async startNewGameFromButton(knownEntity = false) {
         const userInput = this.userInput.value.trim();
         
         if (!userInput) {
@@ -93,13 +95,19 @@ class InventionGame {
         this.showLoading();
 
         try {
-            const response = await fetch('/api/start-invention-guess', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ text: userInput })
-            });
+            let response;
+            if (knownEntity) {
+                // A name followed from another game's link is looked up directly rather than guessed
+                response = await fetch(`/api/invention/entity/${encodeURIComponent(userInput)}`);
+            } else {
+                response = await fetch('/api/start-invention-guess', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ text: userInput })
+                });
+            }
 
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
@@ -360,8 +368,14 @@ class InventionGame {
                 </div>
             `;
             
-            // Display image
-            this.displayInventionImage(guess.image_url, name);
+            // Display the generated image, or the Wikipedia image until a queued one is ready
+            this.imageJobId = null;
+            if (guess.image_job && !guess.image_url) {
+                this.displayInventionImage(guess.wikipedia_image_url, name);
+                this.pollImageJob(guess.image_job, name);
+            } else {
+                this.displayInventionImage(guess.image_url, name);
+            }
             
             // Setup clickable invention links
             this.setupClickableInventionLinks();
@@ -422,6 +436,28 @@ class InventionGame {
         }
     }
 
+    async pollImageJob(jobId, inventionName) {
+        // Wait for a queued image; a newer guess or a new game stops the polling
+        this.imageJobId = jobId;
+        for (let attempt = 0; attempt < 60; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 2000));
+            if (this.imageJobId !== jobId) return;
+            try {
+                const response = await fetch(`/api/image-jobs/${encodeURIComponent(jobId)}`);
+                if (!response.ok) return;
+                const job = await response.json();
+                if (this.imageJobId !== jobId) return;
+                if (job.status === 'done') {
+                    this.displayInventionImage(job.image_url, inventionName);
+                }
+                if (job.status === 'done' || job.status === 'failed') return;
+            } catch (error) {
+                console.error('Error polling image job:', error);
+                return;
+            }
+        }
+    }
+
     displayInventionImage(imageUrl, inventionName) {
         if (imageUrl && imageUrl !== null && imageUrl.toLowerCase() !== 'n/a' && 
             !imageUrl.includes('placeholder.com') && !imageUrl.includes('Parse+Error')) {
@@ -555,7 +591,7 @@ class InventionGame {
             this.userInput.value = inventionName;
             // Automatically start the search after a short delay to ensure everything is loaded
             setTimeout(() => {
-                this.startNewGameFromButton();
+                this.startNewGameFromButton(true);
             }, 500);
         }
     }
@@ -885,8 +921,18 @@ class InventionGame {
         this.errorSection.classList.add('hidden');
     }
 
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'invention', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     startNewGame() {
+        this.leaveSession();
         this.currentSessionId = null;
+        this.imageJobId = null;
         this.userInput.value = '';
         this.hideAllSections();
         this.guessText.innerHTML = '';
@@ -36,6 +36,7 @@ class MovieGame {
         this.inspirationContent = document.getElementById('inspirationContent');
         
         this.currentSessionId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -123,9 +124,18 @@ class MovieGame {
         this.errorSection.classList.add('hidden');
     }
 
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'movie', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     startNewGame() {
         this.hideAllSections();
         this.userInput.value = '';
+        this.leaveSession();
         this.currentSessionId = null;
         this.userInput.focus();
         // Hide the map
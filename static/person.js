@@ -1,6 +1,7 @@
 class FamousPersonGame {
     constructor() {
         this.currentSessionId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -98,7 +99,7 @@ class FamousPersonGame {
         }
     }
 
-    async startNewGame() {
+    async startNewGame(knownEntity = false) {
         const inputText = this.userInput.value.trim();
         
         if (!inputText) {
@@ -113,13 +114,19 @@ class FamousPersonGame {
         this.hideAllSections();
 
         try {
-            const response = await fetch('/api/start-guess', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ text: inputText })
-            });
+            let response;
+            if (knownEntity) {
+                // A name followed from another game's link is looked up directly rather than guessed
+                response = await fetch(`/api/person/entity/${encodeURIComponent(inputText)}`);
+            } else {
+                response = await fetch('/api/start-guess', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ text: inputText })
+                });
+            }
 
             if (!response.ok) {
                 const errorData = await response.json();
@@ -537,7 +544,16 @@ class FamousPersonGame {
         this.errorSection.classList.add('hidden');
     }
 
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'person', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     resetGame() {
+        this.leaveSession();
         this.currentSessionId = null;
         this.userInput.value = '';
         this.hideAllSections();
@@ -851,6 +867,7 @@ class FamousPersonGame {
     // Allow starting a new game even during an active session
     startNewGameFromButton() {
         // Reset current session and start fresh
+        this.leaveSession();
         this.currentSessionId = null;
         this.startNewGame();
     }
@@ -1098,7 +1115,7 @@ class FamousPersonGame {
                 this.userInput.value = personFromEvent;
                 // Automatically start the search after a short delay to ensure everything is loaded
                 setTimeout(() => {
-                    this.startNewGame();
+                    this.startNewGame(true);
                 }, 500);
             }
         } else {
@@ -1113,7 +1130,7 @@ class FamousPersonGame {
                     this.userInput.value = personFromInvention;
                     // Automatically start the search after a short delay to ensure everything is loaded
                     setTimeout(() => {
-                        this.startNewGame();
+                        this.startNewGame(true);
                     }, 500);
                 }
             } else {
@@ -1128,11 +1145,11 @@ class FamousPersonGame {
                         this.userInput.value = personFromBusiness;
                         // Automatically start the search after a short delay to ensure everything is loaded
                         setTimeout(() => {
-                            this.startNewGame();
+                            this.startNewGame(true);
                         }, 500);
                     }
                 } else {
-                    // Fallback: Check if there's a 'search' parameter in the URL
+                    // Fallback: Check if there's a 'search' parameter in the URL (person links from the city, movie and TV show games)
                     const urlParams = new URLSearchParams(window.location.search);
                     const searchParam = urlParams.get('search');
                     
@@ -1142,7 +1159,7 @@ class FamousPersonGame {
                             this.userInput.value = searchParam;
                             // Automatically start the search after a short delay to ensure everything is loaded
                             setTimeout(() => {
-                                this.startNewGame();
+                                this.startNewGame(true);
                             }, 500);
                         }
                     }
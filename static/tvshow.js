@@ -34,6 +34,7 @@ class TVShowGame {
         this.inspirationContent = document.getElementById('inspirationContent');
         
         this.currentSessionId = null;
+        window.addEventListener('pagehide', () => this.leaveSession());
         this.mapsApiKey = null;
         this.map = null;
         this.googleMapsScriptLoaded = false;
@@ -93,9 +94,18 @@ class TVShowGame {
         this.errorSection.classList.add('hidden');
     }
 
+    leaveSession() {
+        // Let the server cancel background work for a session the player is done with
+        if (this.currentSessionId) {
+            const body = JSON.stringify({ game: 'tvshow', session_id: this.currentSessionId });
+            navigator.sendBeacon('/api/leave-session', new Blob([body], { type: 'application/json' }));
+        }
+    }
+
     startNewGame() {
         this.hideAllSections();
         this.userInput.value = '';
+        this.leaveSession();
         this.currentSessionId = null;
         this.userInput.focus();
         // Hide the map
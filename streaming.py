@@ -0,0 +1,113 @@
+"""
+Progressive delivery of guesses over Server-Sent Events.
+A guess call runs on the guess executor while the guesser emits the parsed guess and each
+enrichment result as it becomes available; the events are relayed to the client as they arrive.
+"""
+
+import asyncio
+import contextvars
+import json
+from typing import Any, AsyncIterator, Callable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from concurrency import run_blocking
+
+# Stream that the guess running on the current thread reports to, if any
+_current_stream: "contextvars.ContextVar[Optional[GuessStream]]" = contextvars.ContextVar('guess_stream', default=None)
+
+# Marks the end of a stream
+_END = object()
+
+
+def emit(event: str, data: Any) -> None:
+    """
+    Report progress to the client streaming the current guess; a no-op for regular requests.
+
+    Args:
+        event: SSE event name (e.g. "guess" or "enrichment")
+        data: JSON-serializable payload
+    """
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.put(event, data)
+
+
+def emit_enrichment(name: str, value: Any) -> None:
+    """Report one finished enrichment step (image, coordinates, financials) to the streaming client."""
+    emit('enrichment', {name: value})
+
+
+def format_event(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class GuessStream:
+    """Relays events from a guess running on a worker thread to an async SSE response."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    def put(self, event: str, data: Any) -> None:
+        """Queue an event from any thread."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (event, data))
+
+    def run(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking guess call on this thread with events routed to this stream."""
+        token = _current_stream.set(self)
+        try:
+            return func(*args)
+        finally:
+            _current_stream.reset(token)
+
+    async def events(self, func: Callable[..., Any], *args) -> AsyncIterator[str]:
+        """
+        Run a guess call and yield its progress followed by the complete result.
+
+        Args:
+            func: Blocking guesser method (e.g. start_new_session)
+            *args: Arguments for the method
+
+        Yields:
+            Encoded SSE events; the last one is "result" (the regular endpoint's response) or "error"
+        """
+        async def run_and_close() -> None:
+            try:
+                result = await run_blocking(self.run, func, *args)
+                if isinstance(result, dict) and 'error' in result:
+                    self._queue.put_nowait(('error', {'detail': result['error']}))
+                else:
+                    self._queue.put_nowait(('result', result))
+            except Exception as e:
+                self._queue.put_nowait(('error', {'detail': str(e)}))
+            finally:
+                self._queue.put_nowait(_END)
+
+        # If the client disconnects, the guess still finishes and is stored in its session
+        self._task = asyncio.ensure_future(run_and_close())
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                break
+            yield format_event(*item)
+
+
+def stream_guess(func: Callable[..., Any], *args) -> StreamingResponse:
+    """
+    Build an SSE response that streams a guess call's progress.
+
+    Args:
+        func: Blocking guesser method (start_new_session or submit_feedback)
+        *args: Arguments for the method
+
+    Returns:
+        StreamingResponse emitting "guess", "enrichment" and finally "result" or "error" events
+    """
+    stream = GuessStream(asyncio.get_running_loop())
+    return StreamingResponse(
+        stream.events(func, *args),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,194 @@
+"""Tests for the declarative enrichment graph: empty values, fallbacks, deadlines, batching and early steps."""
+
+import threading
+import time
+
+import pytest
+
+from concurrency import EarlyTasks
+from enrichment import Enrich, EnrichmentGraph, is_empty
+
+
+class Recorder:
+    """Enricher that records its calls and returns a value derived from its arguments."""
+
+    def __init__(self, result=lambda *args: f"enriched {args[0]}", delay: float = 0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.calls.append(args)
+        if self.delay:
+            time.sleep(self.delay)
+        return self.result(*args)
+
+
+@pytest.mark.parametrize('value', [None, '', '  ', 'N/A', 'na', 'null', 'None', 'Unknown', [], {}, (), set()])
+def test_is_empty_values(value):
+    assert is_empty(value)
+
+
+@pytest.mark.parametrize('value', [0, 0.0, False, 'Paris', 'none of the above', [None], {'lat': 0}])
+def test_is_empty_keeps_real_values(value):
+    assert not is_empty(value)
+
+
+def test_outputs_lists_and_groups():
+    geocode = Recorder(lambda place: {'lat': 1.0, 'lng': 2.0} if place != 'Nowhere' else None)
+    graph = EnrichmentGraph([
+        Enrich('birth', 'place_of_birth', 'geocode', group='coordinates'),
+        Enrich('death', 'place_of_death', 'geocode', group='coordinates', skip=('alive',)),
+        Enrich('cities', 'cities', 'geocode', each=True, extra={'kind': 'filmed'}),
+        Enrich('image', 'wikipedia_url', 'image')
+    ], {'geocode': geocode, 'image': Recorder()})
+
+    outputs, timings = graph.run({
+        'place_of_birth': 'Paris', 'place_of_death': 'Alive', 'cities': ['Paris', 'Nowhere', 'N/A'],
+        'wikipedia_url': 'unknown'
+    })
+
+    assert outputs['coordinates'] == {'birth': {'lat': 1.0, 'lng': 2.0}}
+    assert outputs['cities'] == [{'city': 'Paris', 'coordinates': {'lat': 1.0, 'lng': 2.0}, 'kind': 'filmed'}]
+    assert outputs['image'] is None
+    # The same place in two declarations is geocoded once
+    assert sorted(geocode.calls) == [('Nowhere',), ('Paris',)]
+    assert set(timings) == {'geocode:Paris', 'geocode:Nowhere'}
+
+
+def test_first_non_empty_field_and_also_fields():
+    lookup = Recorder(lambda name, ticker: f"{name}:{ticker}")
+    graph = EnrichmentGraph([
+        Enrich('image', ('image_url', 'wikipedia_url'), 'image'),
+        Enrich('price', 'name', 'price', also=('ticker',))
+    ], {'image': Recorder(), 'price': lookup})
+
+    outputs, _ = graph.run({'image_url': 'N/A', 'wikipedia_url': 'https://w/x', 'name': 'Acme', 'ticker': 'none'})
+    assert outputs == {'image': 'enriched https://w/x', 'price': None}
+    assert lookup.calls == []
+
+    outputs, _ = graph.run({'name': 'Acme', 'ticker': 'ACME'})
+    assert outputs['price'] == 'Acme:ACME'
+
+
+def make_fallback_graph(primary_result):
+    primary = Recorder(lambda value: primary_result)
+    fallback = Recorder(lambda value: 'from fallback')
+    graph = EnrichmentGraph([
+        Enrich('reported', 'name', 'primary'),
+        Enrich('resolved', 'name', 'fallback', fallback_for=('reported',))
+    ], {'primary': primary, 'fallback': fallback})
+    return graph, primary, fallback
+
+
+def test_fallback_is_skipped_when_its_output_has_a_value():
+    graph, primary, fallback = make_fallback_graph({'lat': 0.0, 'lng': 0.0})
+    outputs, _ = graph.run({'name': 'Null Island'})
+    assert outputs == {'reported': {'lat': 0.0, 'lng': 0.0}, 'resolved': None}
+    assert fallback.calls == []
+
+
+@pytest.mark.parametrize('primary_result', [None, 'N/A', {}])
+def test_fallback_runs_when_its_output_is_empty(primary_result):
+    graph, primary, fallback = make_fallback_graph(primary_result)
+    outputs, _ = graph.run({'name': 'Springfield'})
+    assert outputs == {'reported': None, 'resolved': 'from fallback'}
+    assert fallback.calls == [('Springfield',)]
+
+
+def test_fallback_runs_when_the_primary_fails():
+    def fail(value):
+        raise RuntimeError('upstream down')
+
+    graph = EnrichmentGraph([
+        Enrich('reported', 'name', 'primary'),
+        Enrich('resolved', 'name', 'fallback', fallback_for=('reported',))
+    ], {'primary': fail, 'fallback': Recorder(lambda value: 'from fallback')})
+    outputs, _ = graph.run({'name': 'Springfield'})
+    assert outputs == {'reported': None, 'resolved': 'from fallback'}
+
+
+def test_step_past_its_deadline_is_dropped_without_holding_the_rest():
+    slow = Recorder(delay=1.0)
+    graph = EnrichmentGraph([
+        Enrich('slow', 'name', 'slow', timeout=0.1),
+        Enrich('fast', 'name', 'fast')
+    ], {'slow': slow, 'fast': Recorder()})
+
+    started = time.monotonic()
+    outputs, _ = graph.run({'name': 'X'})
+    assert time.monotonic() - started < 0.8
+    assert outputs == {'slow': None, 'fast': 'enriched X'}
+
+
+def test_step_without_a_timeout_is_awaited():
+    graph = EnrichmentGraph([Enrich('image', 'name', 'image', timeout=None)], {'image': Recorder(delay=0.2)})
+    outputs, _ = graph.run({'name': 'X'})
+    assert outputs == {'image': 'enriched X'}
+
+
+def test_fallback_waits_for_a_late_primary_only_until_its_deadline():
+    graph = EnrichmentGraph([
+        Enrich('reported', 'name', 'primary', timeout=0.1),
+        Enrich('resolved', 'name', 'fallback', fallback_for=('reported',))
+    ], {'primary': Recorder(delay=1.0), 'fallback': Recorder(lambda value: 'from fallback')})
+    started = time.monotonic()
+    outputs, _ = graph.run({'name': 'X'})
+    assert time.monotonic() - started < 0.8
+    assert outputs == {'reported': None, 'resolved': 'from fallback'}
+
+
+def test_batched_enricher_gets_one_call():
+    batch_calls = []
+
+    def geocode_batch(places):
+        batch_calls.append(sorted(places))
+        return {place: {'place': place} for place in places}
+
+    single = Recorder()
+    graph = EnrichmentGraph([
+        Enrich('birth', 'place_of_birth', 'geocode', group='coordinates'),
+        Enrich('cities', 'cities', 'geocode', each=True)
+    ], {'geocode': single}, batch={'geocode': geocode_batch})
+
+    outputs, _ = graph.run({'place_of_birth': 'Paris', 'cities': ['Lyon', 'Paris']})
+    assert batch_calls == [['Lyon', 'Paris']]
+    assert single.calls == []
+    assert outputs['coordinates'] == {'birth': {'place': 'Paris'}}
+    assert [entry['city'] for entry in outputs['cities']] == ['Lyon', 'Paris']
+
+
+def test_enrichers_replaced_for_one_guess_bypass_the_batch():
+    override = Recorder(lambda place: 'override')
+    graph = EnrichmentGraph([Enrich('birth', 'place', 'geocode')], {'geocode': Recorder()},
+                            batch={'geocode': lambda places: pytest.fail('batch used')})
+    outputs, _ = graph.run({'place': 'Paris'}, enrichers={'geocode': override})
+    assert outputs == {'birth': 'override'}
+    assert override.calls == [('Paris',)]
+
+
+def test_steps_started_while_streaming_are_reused_and_unneeded_ones_cancelled():
+    release = threading.Event()
+    image = Recorder()
+    blocked = Recorder(lambda value: release.wait(2) and 'late')
+    graph = EnrichmentGraph([
+        Enrich('image', 'wikipedia_url', 'image'),
+        Enrich('place', 'place', 'blocked'),
+        Enrich('generated', 'name', 'image', early=False)
+    ], {'image': image, 'blocked': blocked})
+
+    early = EarlyTasks()
+    graph.start_early(early, 'wikipedia_url', 'https://w/a')
+    graph.start_early(early, 'name', 'A')
+    # The streamed place is replaced by the final candidate, so its early step is not needed
+    graph.start_early(early, 'place', 'Streamed place')
+    outputs, _ = graph.run({'wikipedia_url': 'https://w/a', 'name': 'A', 'place': 'N/A'}, early)
+    release.set()
+
+    assert outputs == {'image': 'enriched https://w/a', 'place': None, 'generated': 'enriched A'}
+    # The early image step was reused; the step declared early=False did not start while streaming
+    assert image.calls.count(('https://w/a',)) == 1
+    assert image.calls.count(('A',)) == 1
+    assert early.pop('blocked:Streamed place') is None
@@ -0,0 +1,157 @@
+"""Tests for the offline gazetteer: name lookups, k-d tree nearest-neighbour search and coordinate checks."""
+
+import math
+import random
+
+import pytest
+
+from gazetteer import EARTH_RADIUS_KM, Gazetteer, fold_name, parse_degrees
+
+# name, ascii name, lat, lng, country, admin1, population
+PLACES = [
+    ('Paris', 'Paris', 48.85341, 2.3488, 'FR', '11', 2138551),
+    ('Paris', 'Paris', 33.66094, -95.55551, 'US', 'TX', 24782),
+    ('Dallas', 'Dallas', 32.78306, -96.80667, 'US', 'TX', 1300092),
+    ('Springfield', 'Springfield', 39.80172, -89.64371, 'US', 'IL', 116565),
+    ('Springfield', 'Springfield', 37.21533, -93.29824, 'US', 'MO', 166810),
+    ('São Paulo', 'Sao Paulo', -23.5475, -46.63611, 'BR', '27', 10021295),
+    ('Auckland', 'Auckland', -36.84853, 174.76349, 'NZ', 'E7', 417910),
+    ('Suva', 'Suva', -18.14161, 178.44149, 'FJ', '01', 77366),
+    ('Apia', 'Apia', -13.83333, -171.76666, 'WS', '04', 40407),
+    ('Reykjavík', 'Reykjavik', 64.13548, -21.89541, 'IS', '39', 118918),
+    ('Longyearbyen', 'Longyearbyen', 78.2186, 15.64007, 'SJ', '21', 2060),
+]
+
+
+def dump_line(geonameid, name, ascii_name, lat, lng, country, admin1, population, feature_class='P'):
+    columns = [str(geonameid), name, ascii_name, '', str(lat), str(lng), feature_class, 'PPL', country, '',
+               admin1, '', '', '', str(population), '', '', 'UTC', '2024-01-01']
+    return '\t'.join(columns) + '\n'
+
+
+def write_dump(path, places):
+    with open(path, 'w', encoding='utf-8') as f:
+        for geonameid, place in enumerate(places, 1):
+            f.write(dump_line(geonameid, *place))
+        # Non-populated features (a mountain) are skipped
+        f.write(dump_line(999999, 'Mount Paris', 'Mount Paris', 10.0, 10.0, 'FR', '11', 0, feature_class='T'))
+
+
+def great_circle_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlam = phi2 - phi1, math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    countries = tmp_path / 'countryInfo.txt'
+    countries.write_text(
+        '#ISO\tISO3\tISO-Numeric\tfips\tCountry\n'
+        'FR\tFRA\t250\tFR\tFrance\n'
+        'US\tUSA\t840\tUS\tUnited States\n'
+        'BR\tBRA\t076\tBR\tBrazil\n',
+        encoding='utf-8'
+    )
+    admin1 = tmp_path / 'admin1CodesASCII.txt'
+    admin1.write_text('US.TX\tTexas\tTexas\t4736286\nUS.IL\tIllinois\tIllinois\t4896861\n', encoding='utf-8')
+    dump = tmp_path / 'cities.txt'
+    write_dump(dump, PLACES)
+    return Gazetteer(path=str(dump), admin1_path=str(admin1), countries_path=str(countries))
+
+
+def test_fold_name():
+    assert fold_name('  São   Paulo ') == 'sao paulo'
+    assert fold_name('Reykjavík!') == 'reykjavik'
+    assert fold_name(None) == ''
+
+
+@pytest.mark.parametrize('value, expected', [
+    (32.78, 32.78), (-96, -96.0), ('32.7767° N', 32.7767), ('96.797° W', -96.797), ('33.9 S', -33.9),
+    ('-46.6', -46.6), ('north', None), (None, None), (True, None)
+])
+def test_parse_degrees(value, expected):
+    assert parse_degrees(value) == expected
+
+
+def test_loads_only_populated_places(gazetteer):
+    assert len(gazetteer) == len(PLACES)
+
+
+def test_lookup_by_name_country_and_division(gazetteer):
+    assert gazetteer.lookup('Paris') == {'lat': 48.85341, 'lng': 2.3488}
+    assert gazetteer.lookup('Paris, France') == {'lat': 48.85341, 'lng': 2.3488}
+    assert gazetteer.lookup('Paris, Texas, USA') == {'lat': 33.66094, 'lng': -95.55551}
+    assert gazetteer.lookup('Paris, TX') == {'lat': 33.66094, 'lng': -95.55551}
+    assert gazetteer.lookup('Sao Paulo, Brazil') == {'lat': -23.5475, 'lng': -46.63611}
+    assert gazetteer.lookup('Dallas, France') is None
+    assert gazetteer.lookup('Atlantis') is None
+
+
+def test_ambiguous_bare_name_is_not_resolved(gazetteer):
+    assert gazetteer.lookup('Springfield, United States') is None
+    assert gazetteer.lookup('Springfield, Illinois') == {'lat': 39.80172, 'lng': -89.64371}
+    stats = gazetteer.stats()
+    assert stats['ambiguous'] == 1 and stats['hits'] == 1
+
+
+@pytest.mark.parametrize('lat, lng, name', [
+    (48.9, 2.4, 'Paris'),
+    (32.9, -96.7, 'Dallas'),
+    (-23.0, -46.0, 'São Paulo'),
+    # Longitudes wrap at the antimeridian: Suva (178.4° E) is nearest a point at 179.5° W
+    (-17.5, -179.5, 'Suva'),
+    (-13.9, -172.5, 'Apia'),
+    (89.9, 0.0, 'Longyearbyen'),
+])
+def test_nearest_finds_the_closest_place(gazetteer, lat, lng, name):
+    place, distance = gazetteer.nearest(lat, lng)
+    assert place['name'] == name
+    assert distance == pytest.approx(great_circle_km(lat, lng, place['lat'], place['lng']), rel=1e-6)
+
+
+def test_nearest_matches_a_brute_force_search(tmp_path):
+    rng = random.Random(7)
+    places = [
+        (f'Place {i}', f'Place {i}', round(math.degrees(math.asin(rng.uniform(-1, 1))), 5),
+         round(rng.uniform(-180, 180), 5), 'XX', '01', rng.randint(1000, 10 ** 6))
+        for i in range(500)
+    ]
+    dump = tmp_path / 'cities.txt'
+    write_dump(dump, places)
+    gazetteer = Gazetteer(path=str(dump))
+
+    for _ in range(200):
+        lat, lng = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        expected = min(great_circle_km(lat, lng, place[2], place[3]) for place in places)
+        place, distance = gazetteer.nearest(lat, lng)
+        assert distance == pytest.approx(expected, abs=1e-6)
+
+
+def test_empty_or_disabled_gazetteer_answers_nothing(tmp_path):
+    missing = Gazetteer(path=str(tmp_path / 'missing.txt'))
+    assert missing.nearest(0, 0) is None
+    assert missing.lookup('Paris') is None
+
+    dump = tmp_path / 'cities.txt'
+    write_dump(dump, PLACES)
+    disabled = Gazetteer(enabled=False, path=str(dump))
+    assert len(disabled) == 0
+    assert disabled.nearest(48.85, 2.35) is None
+
+
+def test_confirm_keeps_the_reported_coordinates(gazetteer):
+    assert gazetteer.confirm('Dallas, Texas, United States', '32.7767° N', '96.797° W') == {
+        'lat': 32.7767, 'lng': -96.797
+    }
+    assert gazetteer.confirm('Paris, France', 48.86, 2.35) == {'lat': 48.86, 'lng': 2.35}
+
+
+def test_confirm_rejects_points_that_are_far_or_another_place(gazetteer):
+    # Nearest place is Paris, Texas, but the model named Dallas
+    assert gazetteer.confirm('Dallas, Texas', 33.66, -95.55) is None
+    # Dallas is the nearest place but the point is over 25 km away
+    assert gazetteer.confirm('Dallas, Texas', 32.2, -97.5) is None
+    assert gazetteer.confirm('Dallas', 'unknown', -96.8) is None
+    assert gazetteer.confirm('Dallas', 132.0, -96.8) is None
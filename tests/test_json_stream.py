@@ -0,0 +1,117 @@
+"""Tests for incremental parsing of streamed JSON fields."""
+
+import json
+
+import pytest
+
+import json_stream
+from json_stream import JSONFieldStream, generate_json
+
+OBJECT = {
+    'name': 'He said "hi", then left {early}',
+    'path': 'C:\\temp\\[draft]',
+    'unicode': 'caf\u00e9 \u2603',
+    'tags': ['a, b', 'c]', {'nested': '}'}],
+    'count': 3,
+    'empty': None,
+    'flag': True
+}
+
+
+def parse(chunks):
+    fields = []
+    stream = JSONFieldStream(lambda key, value: fields.append((key, value)))
+    for chunk in chunks:
+        stream.feed(chunk)
+    return fields, stream
+
+
+def split_every(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_fields_are_reported_in_order_with_escapes():
+    text = json.dumps(OBJECT)
+    fields, stream = parse([text])
+    assert fields == list(OBJECT.items())
+    assert stream.text == text
+
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_every_two_way_split_gives_the_same_fields(ensure_ascii):
+    text = json.dumps(OBJECT, ensure_ascii=ensure_ascii)
+    for cut in range(len(text) + 1):
+        fields, _ = parse([text[:cut], text[cut:]])
+        assert fields == list(OBJECT.items()), f"split at {cut}: {text[:cut]!r}"
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7])
+def test_small_chunks_give_the_same_fields(size):
+    text = '```json\n' + json.dumps(OBJECT, indent=2) + '\n```'
+    fields, stream = parse(split_every(text, size))
+    assert fields == list(OBJECT.items())
+    assert stream.text == text
+
+
+def test_field_is_reported_as_soon_as_it_is_complete():
+    fields, stream = parse(['{"first": "done", "sec'])
+    assert fields == [('first', 'done')]
+    stream.feed('ond": [1, 2')
+    assert fields == [('first', 'done')]
+    stream.feed(']}')
+    assert fields == [('first', 'done'), ('second', [1, 2])]
+
+
+def test_ranked_array_reports_only_the_first_candidate():
+    text = json.dumps([{'name': 'First', 'rank': 1}, {'name': 'Second', 'rank': 2}])
+    fields, stream = parse(split_every(text, 5))
+    assert fields == [('name', 'First'), ('rank', 1)]
+    assert stream.text == text
+
+
+def test_preamble_before_the_object_is_skipped():
+    fields, _ = parse(['Here you go: ', '{"name": "X"}', ' trailing {"name": "Y"}'])
+    assert fields == [('name', 'X')]
+
+
+def test_callback_errors_do_not_stop_parsing():
+    seen = []
+
+    def on_field(key, value):
+        seen.append(key)
+        if key == 'a':
+            raise RuntimeError('boom')
+
+    stream = JSONFieldStream(on_field)
+    stream.feed('{"a": 1, "b": 2}')
+    assert seen == ['a', 'b']
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError('no text parts')
+        return self._text
+
+
+class FakeModel:
+    def __init__(self, text):
+        self.text = text
+
+    def generate_content(self, prompt, stream=False):
+        if not stream:
+            return FakeChunk(self.text)
+        return [FakeChunk(None)] + [FakeChunk(chunk) for chunk in split_every(self.text, 4)]
+
+
+@pytest.mark.parametrize('streaming', [True, False])
+def test_generate_json_returns_full_text_and_reports_fields(monkeypatch, streaming):
+    monkeypatch.setattr(json_stream, 'STREAM_GENERATION', streaming)
+    text = json.dumps(OBJECT)
+    fields = []
+    assert generate_json(FakeModel(text), 'prompt', lambda key, value: fields.append((key, value))) == text
+    assert fields == list(OBJECT.items())
@@ -0,0 +1,100 @@
+"""Tests for the session registry's TTL expiry and LRU cap."""
+
+import pytest
+
+import sessions
+from sessions import SessionStore, new_session_id, shard_of
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(sessions.time, 'monotonic', fake)
+    return fake
+
+
+def make(store: SessionStore, label: str) -> int:
+    return store.create({'label': label})
+
+
+def test_create_assigns_id_and_get_returns_session(clock):
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session = {'label': 'a'}
+    session_id = store.create(session)
+    assert session['session_id'] == session_id
+    assert store.get(session_id) is session
+    assert store.get(session_id + 1) is None
+
+
+def test_session_expires_after_idle_ttl(clock):
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session_id = make(store, 'a')
+    clock.now += 60
+    assert store.get(session_id) is None
+    assert store.stats()['expired'] == 1
+
+
+def test_access_slides_the_ttl(clock):
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    session_id = make(store, 'a')
+    for _ in range(3):
+        clock.now += 45
+        assert store.get(session_id) is not None
+    clock.now += 59
+    with store.locked(session_id) as session:
+        assert session['label'] == 'a'
+
+
+def test_creating_purges_expired_sessions(clock):
+    store = SessionStore(ttl_seconds=60, max_sessions=10)
+    make(store, 'a')
+    make(store, 'b')
+    clock.now += 61
+    make(store, 'c')
+    assert len(store) == 1
+    assert store.stats()['expired'] == 2
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    store = SessionStore(ttl_seconds=60, max_sessions=2)
+    first = make(store, 'a')
+    second = make(store, 'b')
+    # Reading the first session makes the second the least recently used
+    store.get(first)
+    third = make(store, 'c')
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.get(third) is not None
+    stats = store.stats()
+    assert stats['evicted'] == 1
+    assert stats['active'] == 2
+
+
+def test_locked_yields_none_for_unknown_session(clock):
+    store = SessionStore()
+    with store.locked(12345) as session:
+        assert session is None
+
+
+def test_remove_drops_session(clock):
+    store = SessionStore()
+    session_id = make(store, 'a')
+    store.remove(session_id)
+    assert store.get(session_id) is None
+
+
+def test_session_ids_carry_their_shard():
+    for shard in (0, 7, 255):
+        session_id = new_session_id(shard)
+        assert 0 < session_id < 2 ** 53
+        assert shard_of(session_id) == shard
+    with pytest.raises(ValueError):
+        new_session_id(256)
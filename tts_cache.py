@@ -0,0 +1,157 @@
+"""
+Content-addressed cache for synthesized TTS audio.
+Stores MP3 bytes on disk keyed by a hash of (voice, prompt, full text) and evicts the
+least recently used files once the cache grows past its size budget.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Directory holding cached audio files
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join('cache', 'tts'))
+
+# Maximum total size of cached audio, in bytes
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+
+class AudioCache:
+    """Disk-backed, size-bounded LRU cache of synthesized audio."""
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        """
+        Initialize the cache and index any audio already on disk.
+
+        Args:
+            directory: Directory where audio files are stored
+            max_bytes: Size budget; least recently used files are removed beyond it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.mp3') and os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._index[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def key_for(voice: str, prompt: str, text: str) -> str:
+        """
+        Build the content address for a synthesis request.
+
+        Args:
+            voice: Voice name
+            prompt: Style prompt
+            text: Full text to synthesize
+
+        Returns:
+            Hex SHA-256 digest identifying the audio
+        """
+        payload = json.dumps([voice, prompt, text], ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def contains(self, key: str) -> bool:
+        """Check whether audio for a key is cached."""
+        with self._lock:
+            return key in self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read cached audio and mark it recently used.
+
+        Args:
+            key: Content address from key_for
+
+        Returns:
+            MP3 bytes, or None on a miss
+        """
+        with self._lock:
+            if key not in self._index:
+                self._misses += 1
+                return None
+            self._index.move_to_end(key)
+        try:
+            path = self._path(key)
+            with open(path, 'rb') as f:
+                audio = f.read()
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                size = self._index.pop(key, 0)
+                self._total_bytes -= size
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """
+        Store audio under its key, evicting old entries to stay within budget.
+
+        Args:
+            key: Content address from key_for
+            audio: MP3 bytes
+        """
+        if len(audio) > self.max_bytes:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            print(f"Error caching TTS audio {key}: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self._total_bytes += len(audio) - self._index.get(key, 0)
+            self._index[key] = len(audio)
+            self._index.move_to_end(key)
+            while self._total_bytes > self.max_bytes and self._index:
+                old_key, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                self._evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else None
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+
+# Global audio cache instance
+audio_cache = AudioCache()
@@ -6,11 +6,58 @@ This game allows users to provide information about a TV show and the AI tries t
 import google.generativeai as genai
 from typing import Optional, Dict, Any, List
 import json
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import googlemaps
-from config import GEMINI_API_KEY, GOOGLE_MAPS_API_KEY
+from urllib.parse import urlparse
+from functools import partial
+from config import GEMINI_API_KEY
+from geocoding import geocoder
+from image_extractor import image_extractor
+from sessions import SessionStore
+from candidates import candidates_instruction, next_candidate, parse_candidates, queue_candidates
+from prefetch import guess_prefetcher
+from streaming import emit
+from concurrency import EarlyTasks
+from json_stream import generate_json
+from guess_cache import guess_cache
+from solved_index import solved_index
+from entities import entity_describer
+from entity_warmer import entity_warmer
+from enrichment import Enrich, EnrichmentGraph
+
+# Fields returned for a TV show, shared by the guessing prompt and the known-entity lookup
+TVSHOW_FIELDS = """- name: The TV show title
+- genre: An array of the show's genres
+- imdb_rating: The show's IMDB rating (if known, otherwise null)
+- rotten_tomatoes_rating: The show's Rotten Tomatoes rating (if known, otherwise null)
+- tv_parental_guidelines_rating: The show's TV Parental Guidelines rating (TV-Y, TV-Y7, TV-G, TV-PG, TV-14, TV-MA, Not Rated)
+- created_by: An array of creator names
+- written_by: An array of writer names
+- starring: An array of main cast member names
+- composers: An array of composer names
+- country_of_origin: An array of countries where the show was produced
+- original_language: An array of languages the show is originally in
+- number_of_seasons: The number of seasons
+- number_of_episodes: The total number of episodes
+- executive_producers: An array of executive producer names
+- producers: An array of producer names
+- cinematography: An array of cinematographer names
+- editors: An array of editor names
+- running_time: The average episode running time in minutes
+- production_companies: An array of production company names
+- network: An array of networks/channels that aired the show
+- release_date: The original air date or premiere date
+- imdb_url: IMDB URL for the show (if available, otherwise null)
+- rotten_tomatoes_url: Rotten Tomatoes URL for the show (if available, otherwise null)
+- wikipedia_url: Wikipedia URL for the show (if available, otherwise null)
+- people: An array of real-world people who appear as characters in the show, or empty array [] if unknown
+- cities: An array of real-world cities where the show takes place, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
+- events: An array of real-world events where the show takes place, or empty array [] if unknown
+- overview: A concise 50-75 word overview of the show's plot, significance, and notable features"""
+
+# Enrichment of a TV show guess: which fields feed which enrichers
+TVSHOW_ENRICHMENT = [
+    Enrich('image_url', 'wikipedia_url', 'wiki_image'),
+    Enrich('cities_coordinates', 'cities', 'geocode', each=True)
+]
 
 class TVShowGuesser:
     def __init__(self):
@@ -21,31 +68,44 @@ class TVShowGuesser:
         
         genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        self.gmaps = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
-        self.current_session = None
+        self.sessions = SessionStore()
+        self.enrichment = EnrichmentGraph(TVSHOW_ENRICHMENT, {
+            'wiki_image': self._extract_image_from_url,
+            'geocode': self._get_location_coordinates
+        }, batch={'geocode': geocoder.get_coordinates_batch})
     
-    def start_new_session(self, user_input: str) -> Dict[str, Any]:
+    def start_new_session(self, user_input: str, known_entity: bool = False) -> Dict[str, Any]:
         """Start a new TV show guessing session with user input."""
-        self.current_session = {
+        session = {
             'user_input': user_input,
             'guesses': [],
-            'incorrect_shows': [],  # Track shows that were marked as incorrect
-            'session_id': len(str(hash(user_input + str(len(user_input)))))
+            'incorrect_shows': []  # Track shows that were marked as incorrect
         }
+        self.sessions.create(session)
         
         # Make the first guess
-        first_guess = self._make_guess(user_input)
-        self.current_session['guesses'].append(first_guess)
+        if known_entity:
+            # A name followed from another game's link is described directly instead of guessed
+            first_guess = entity_describer.describe('tvshow', user_input)
+        else:
+            # A paraphrase of a clue players already solved is answered with the confirmed entity
+            first_guess = solved_index.lookup('tvshow', user_input, session)
+        if first_guess is None:
+            first_guess = self._make_guess(user_input, session=session)
+        session['guesses'].append(first_guess)
+        if not known_entity:
+            self._prefetch_next_guess(session)
+        entity_warmer.schedule('tvshow', session, first_guess)
         
         return {
-            'session_id': self.current_session['session_id'],
+            'session_id': session['session_id'],
             'guess': first_guess,
             'is_correct': None,
             'game_over': False
         }
     
-    def _make_guess(self, context: str, incorrect_shows: List[str] = None) -> Dict[str, Any]:
-        """Make a TV show guess using Gemini API."""
+    def _make_guess(self, context: str, incorrect_shows: List[str] = None, session: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a TV show guess, using the next queued candidate before calling the Gemini API."""
         if incorrect_shows is None:
             incorrect_shows = []
         
@@ -59,79 +119,45 @@ class TVShowGuesser:
 {context}{exclusion_text}
 
 Please respond with a JSON object containing the following fields:
-- name: The TV show title
-- genre: An array of the show's genres
-- imdb_rating: The show's IMDB rating (if known, otherwise null)
-- rotten_tomatoes_rating: The show's Rotten Tomatoes rating (if known, otherwise null)
-- tv_parental_guidelines_rating: The show's TV Parental Guidelines rating (TV-Y, TV-Y7, TV-G, TV-PG, TV-14, TV-MA, Not Rated)
-- created_by: An array of creator names
-- written_by: An array of writer names
-- starring: An array of main cast member names
-- composers: An array of composer names
-- country_of_origin: An array of countries where the show was produced
-- original_language: An array of languages the show is originally in
-- number_of_seasons: The number of seasons
-- number_of_episodes: The total number of episodes
-- executive_producers: An array of executive producer names
-- producers: An array of producer names
-- cinematography: An array of cinematographer names
-- editors: An array of editor names
-- running_time: The average episode running time in minutes
-- production_companies: An array of production company names
-- network: An array of networks/channels that aired the show
-- release_date: The original air date or premiere date
-- imdb_url: IMDB URL for the show (if available, otherwise null)
-- rotten_tomatoes_url: Rotten Tomatoes URL for the show (if available, otherwise null)
-- wikipedia_url: Wikipedia URL for the show (if available, otherwise null)
-- people: An array of real-world people who appear as characters in the show, or empty array [] if unknown
-- cities: An array of real-world cities where the show takes place, entered with the administrative division and country, separated by commas (e.g., "Dallas, Texas, United States"), or empty array [] if unknown
-- events: An array of real-world events where the show takes place, or empty array [] if unknown
+{TVSHOW_FIELDS}
 - reasoning: Your reasoning for why you think this is the correct TV show
-- overview: A concise 50-75 word overview of the show's plot, significance, and notable features
 
-Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object."""
+Make sure to return ONLY valid JSON. Do not include any text before or after the JSON object.{candidates_instruction('TV shows')}"""
 
+        cache_key = guess_cache.key('tvshow', context, incorrect_shows, self.model.model_name)
         try:
-            response = self.model.generate_content(prompt)
+            # The same clue with the same exclusions was already answered
+            cached = guess_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached guess: {cached.get('name', 'N/A')}")
+                return cached
             
-            if not response.text:
-                raise ValueError("No response from Gemini API")
+            # A ranked candidate left over from an earlier call needs no new Gemini request
+            queued = next_candidate(session, incorrect_shows)
+            if queued is not None:
+                print(f"Using queued candidate: {queued.get('name', 'N/A')}")
+                guess = self._enrich_guess(queued)
+                guess_cache.put(cache_key, guess)
+                return guess
             
-            # Try to parse the JSON response
+            # Stream the response so the image scrape and geocodes start as soon as their fields arrive
+            early = EarlyTasks()
             try:
-                show_data = json.loads(response.text.strip())
-            except json.JSONDecodeError as e:
-                # If JSON parsing fails, try to extract JSON from the response
-                text = response.text.strip()
-                if text.startswith('```json'):
-                    text = text[7:]
-                if text.endswith('```'):
-                    text = text[:-3]
-                show_data = json.loads(text.strip())
-            
-            # If we have a Wikipedia URL, try to extract an image
-            if show_data.get('wikipedia_url'):
-                image_url = self._extract_image_from_url(show_data['wikipedia_url'])
-                show_data['image_url'] = image_url if image_url != "N/A" else None
-            else:
-                show_data['image_url'] = None
+                response_text = generate_json(self.model, prompt, partial(self._start_early_enrichment, early))
             
-            # Get coordinates for all cities
-            cities_coordinates = []
-            cities = show_data.get('cities', [])
-            if cities:
-                for city in cities:
-                    coords = self._get_location_coordinates(city)
-                    if coords:
-                        cities_coordinates.append({
-                            'city': city,
-                            'coordinates': coords
-                        })
+                if not response_text:
+                    raise ValueError("No response from Gemini API")
             
-            show_data['cities_coordinates'] = cities_coordinates
-            
-            return show_data
+                # Parse the JSON response (a single object or a ranked array of candidates)
+                candidates = parse_candidates(response_text)
+                queue_candidates(session, candidates)
             
+                guess = self._enrich_guess(candidates[0], early)
+                guess_cache.put(cache_key, guess)
+                return guess
+            finally:
+                # Steps started for a response that falls back to the old format or fails are not needed
+                early.cancel_rest()
         except Exception as e:
             return {
                 'error': f'Failed to generate TV show guess: {str(e)}',
@@ -139,132 +165,93 @@ Make sure to return ONLY valid JSON. Do not include any text before or after the
                 'reasoning': 'Unable to process the request due to an error.'
             }
     
+    def _start_early_enrichment(self, early: EarlyTasks, field: str, value: Any) -> None:
+        """Start the image scrape and city geocodes for the leading candidate while the rest of it streams in."""
+        self.enrichment.start_early(early, field, value)
+    
+    def _enrich_guess(self, show_data: Dict[str, Any], early: Optional[EarlyTasks] = None) -> Dict[str, Any]:
+        """Add the Wikipedia image and city coordinates to a parsed TV show candidate."""
+        # Stream the parsed guess before the slower enrichment steps
+        emit('guess', dict(show_data))
+        
+        enrichment, timings = self.enrichment.run(show_data, early)
+        print(f"Enrichment timings (ms): {timings}")
+        show_data.update(enrichment)
+        show_data['enrichment_timings'] = timings
+        
+        return show_data
+    
+    def _prefetch_next_guess(self, session: Dict[str, Any]) -> None:
+        """Start computing, in the background, the guess that follows if the latest TV show guess is marked incorrect."""
+        last_guess = session['guesses'][-1]
+        if not isinstance(last_guess, dict) or not last_guess.get('name'):
+            return
+        user_input = session['user_input']
+        incorrect_shows = session['incorrect_shows'] + [last_guess['name']]
+        guess_prefetcher.schedule(session, lambda scratch: self._make_guess(user_input, incorrect_shows, scratch))
+    
     def submit_feedback(self, session_id: int, is_correct: bool) -> Dict[str, Any]:
         """Submit feedback for a guess and get the next guess if incorrect."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
-            return {"error": "Session not found"}
+        with self.sessions.locked(session_id) as session:
+            if not session:
+                return {"error": "Session not found"}
         
-        if is_correct:
-            # Game is over, user confirmed the guess was correct
-            return {
-                'session_id': session_id,
-                'game_over': True,
-                'message': 'Congratulations! The TV show was guessed correctly.'
-            }
-        else:
-            # Add the incorrect show to the list and make another guess
-            last_guess = self.current_session['guesses'][-1]
-            if isinstance(last_guess, dict) and 'name' in last_guess:
-                self.current_session['incorrect_shows'].append(last_guess['name'])
+            # Score a reused answer and remember newly solved clues
+            solved_index.feedback('tvshow', session, is_correct)
+            if is_correct:
+                # Game is over, user confirmed the guess was correct
+                guess_prefetcher.discard(session)
+                return {
+                    'session_id': session_id,
+                    'game_over': True,
+                    'message': 'Congratulations! The TV show was guessed correctly.'
+                }
+            else:
+                # Add the incorrect show to the list and make another guess
+                last_guess = session['guesses'][-1]
+                if isinstance(last_guess, dict) and 'name' in last_guess:
+                    session['incorrect_shows'].append(last_guess['name'])
             
-            # Make another guess with the updated context
-            new_guess = self._make_guess(
-                self.current_session['user_input'], 
-                self.current_session['incorrect_shows']
-            )
-            self.current_session['guesses'].append(new_guess)
+                # Make another guess, reusing the one prefetched while the player was deciding
+                new_guess = guess_prefetcher.take(session)
+                if new_guess is None:
+                    new_guess = self._make_guess(
+                        session['user_input'], 
+                        session['incorrect_shows'],
+                        session
+                    )
+                session['guesses'].append(new_guess)
+                self._prefetch_next_guess(session)
+                entity_warmer.schedule('tvshow', session, new_guess)
             
-            return {
-                'session_id': session_id,
-                'guess': new_guess,
-                'game_over': False,
-                'incorrect_shows': self.current_session['incorrect_shows']
-            }
+                return {
+                    'session_id': session_id,
+                    'guess': new_guess,
+                    'game_over': False,
+                    'incorrect_shows': session['incorrect_shows']
+                }
     
     def get_session_status(self, session_id: int) -> Dict[str, Any]:
         """Get session information."""
-        if not self.current_session or self.current_session['session_id'] != session_id:
+        session = self.sessions.get(session_id)
+        if not session:
             return {"error": "Session not found"}
         
         return {
             'session_id': session_id,
-            'user_input': self.current_session['user_input'],
-            'guesses': self.current_session['guesses'],
-            'incorrect_shows': self.current_session['incorrect_shows']
+            'user_input': session['user_input'],
+            'guesses': session['guesses'],
+            'incorrect_shows': session['incorrect_shows']
         }
     
     def _extract_image_from_url(self, url: str) -> str:
         """Extract the best image URL from a given webpage URL."""
-        try:
-            # Add headers to mimic a real browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to find the main image (usually the first large image or infobox image)
-            image_url = None
-            
-            # For Wikipedia pages, look for infobox images first
-            if 'wikipedia.org' in url:
-                infobox = soup.find('table', class_='infobox')
-                if infobox:
-                    img = infobox.find('img')
-                    if img and img.get('src'):
-                        image_url = img.get('src')
-                        # Convert to full URL if it's a relative path
-                        if image_url.startswith('//'):
-                            image_url = 'https:' + image_url
-                        elif image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        return image_url
-            
-            # Look for the first large image in the content
-            images = soup.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Skip small images, icons, and decorative elements
-                    width = img.get('width')
-                    height = img.get('height')
-                    
-                    # Accept any image with size attributes as potentially valid
-                    if width and height:
-                        try:
-                            w, h = int(width), int(height)
-                            # Remove pixel limits - accept any reasonably sized image
-                            image_url = src
-                            break
-                        except ValueError:
-                            continue
-                    
-                    # If no size attributes, check the src for common patterns
-                    if not image_url and any(keyword in src.lower() for keyword in ['poster', 'show', 'series', 'tv', 'image', 'jpg', 'jpeg', 'png']):
-                        image_url = src
-                        break
-            
-            if image_url:
-                # Convert to full URL if it's a relative path
-                if image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-                elif image_url.startswith('/'):
-                    image_url = urljoin(url, image_url)
-                return image_url
-            
-            return "N/A"
-            
-        except Exception as e:
-            print(f"Error extracting image from {url}: {str(e)}")
-            return "N/A"
+        return image_extractor.extract(url, ['poster', 'show', 'series', 'tv', 'image', 'jpg', 'jpeg', 'png'])
     
     def _get_location_coordinates(self, location: str) -> Optional[Dict[str, float]]:
-        """Get coordinates for a location using Google Maps Geocoding API."""
-        try:
-            geocode_result = self.gmaps.geocode(location)
-            if geocode_result:
-                location_data = geocode_result[0]['geometry']['location']
-                return {
-                    'lat': location_data['lat'],
-                    'lng': location_data['lng']
-                }
-        except Exception as e:
-            print(f"Error getting coordinates for {location}: {e}")
-        
-        return None
+        """Get coordinates for a location using the shared geocode cache, falling back to Google Maps Geocoding API."""
+        return geocoder.get_coordinates(location)
 
 # Create a global instance
 tvshow_guesser = TVShowGuesser()
+entity_describer.register('tvshow', tvshow_guesser, 'TV show', TVSHOW_FIELDS)